@@ -193,7 +193,7 @@ class APRSISDriver:
             LOG.warning('No frame received to decode?!?!')
             return None
         # If args[0] is already a dict (already parsed), pass it directly to factory
-        if isinstance(args[0], dict):
+        if isinstance(args[0], dict) or CONF.enable_lazy_packet_decode:
             return core.factory(args[0])
         return core.factory(aprslib.parse(args[0]))
 
@@ -11,10 +11,12 @@ from typing import Any, Callable
 
 import aprslib
 from kiss import util as kissutil
+from oslo_config import cfg
 
 from aprsd.packets import core
 from aprsd.utils import trace
 
+CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
 
 
@@ -117,8 +119,15 @@ class KISSDriver(metaclass=trace.TraceWrapperMetaclass):
         frame = args[0]
 
         try:
-            aprslib_frame = aprslib.parse(str(frame))
-            packet = core.factory(aprslib_frame)
+            if CONF.enable_lazy_packet_decode:
+                packet = core.factory(str(frame))
+                if type(packet) is core.LazyPacket:
+                    # factory() never makes a lazy third party packet,
+                    # don't decode it with the isinstance() below.
+                    return packet
+            else:
+                aprslib_frame = aprslib.parse(str(frame))
+                packet = core.factory(aprslib_frame)
             if isinstance(packet, core.ThirdPartyPacket):
                 return packet.subpacket
             else:
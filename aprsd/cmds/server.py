@@ -15,6 +15,7 @@ from aprsd.packets import collector as packet_collector
 from aprsd.packets import seen_list
 from aprsd.threads import keepalive, registry, rx, service, tx
 from aprsd.threads import stats as stats_thread
+from aprsd.threads import watch_list as watch_list_thread
 from aprsd.threads.stats import StatsLogThread
 
 CONF = cfg.CONF
@@ -168,6 +169,9 @@ def server(ctx, flush, enable_packet_stats):
             LOG.info('Beacon Enabled.  Starting static Beacon thread.')
             service_threads.register(tx.BeaconSendThread())
 
+    if CONF.watch_list.enabled:
+        service_threads.register(watch_list_thread.WatchListExpiryThread())
+
     if CONF.push_stats.enabled:
         LOG.info('Push Stats Enabled.  Starting Push Stats thread.')
         service_threads.register(stats_thread.APRSDPushStatsThread())
@@ -44,6 +44,31 @@ aprsd_opts = [
         default=DEFAULT_CONFIG_DIR,
         help='Save location for packet tracking files.',
     ),
+    cfg.BoolOpt(
+        'enable_save_journal',
+        default=False,
+        help='Save the changes to the seen list and watch list by appending '
+        'them to a journal file, instead of writing the whole list every '
+        'time.  The journal is compacted into the save file once it has '
+        'grown to the size of the list.',
+    ),
+    cfg.StrOpt(
+        'save_backend',
+        default='json',
+        choices=['json', 'sqlite'],
+        help='Where the seen list, watch list and packet tracker are saved. '
+        'json saves each of them to a file and loads all of it at startup.  '
+        'sqlite saves the changes to them to an sqlite database in the '
+        'save_location, and only keeps the most recently seen callsigns of '
+        'the seen list in memory.',
+    ),
+    cfg.IntOpt(
+        'save_cache_size',
+        default=10000,
+        help='With the sqlite save_backend, the number of seen list '
+        'callsigns kept in memory.  The others are looked up in the '
+        'database when they are heard again.',
+    ),
     cfg.BoolOpt(
         'trace_enabled',
         default=False,
@@ -133,6 +158,56 @@ aprsd_opts = [
         help='Enable the Callsign seen list tracking feature.  This allows aprsd to keep track of '
         'callsigns that have been seen and when they were last seen.',
     ),
+    cfg.IntOpt(
+        'position_list_max_size',
+        default=5000,
+        help='The maximum number of stations to keep the last known position for. '
+        'Plugins use these positions before looking a station up on aprs.fi.',
+    ),
+    cfg.IntOpt(
+        'position_list_max_age',
+        default=3600,
+        help='The number of seconds a station position heard on the network is '
+        'used for, before looking the station up on aprs.fi again.',
+    ),
+    cfg.IntOpt(
+        'wx_list_max_size',
+        default=1000,
+        help='The maximum number of weather stations to keep the latest '
+        'weather report for.',
+    ),
+    cfg.IntOpt(
+        'wx_list_max_age',
+        default=1800,
+        help='The number of seconds a weather report heard on the network '
+        'is used by the weather plugins.',
+    ),
+    cfg.FloatOpt(
+        'wx_list_max_distance',
+        default=25.0,
+        help='The weather plugins answer from the nearest weather report '
+        'heard on the network, if the station is within this many km. '
+        '0 always fetches the weather from the web.',
+    ),
+    cfg.BoolOpt(
+        'enable_packet_archive',
+        default=False,
+        help='Keep a compact history of the packets rx and tx, for '
+        'analysis.  With enable_save, it is kept in a memory mapped file '
+        'in save_location.',
+    ),
+    cfg.IntOpt(
+        'packet_archive_size',
+        default=100000,
+        help='The number of packets to keep in the packet archive.  Each '
+        'packet takes about 60 bytes.',
+    ),
+    cfg.IntOpt(
+        'packet_archive_raw_size',
+        default=8 * 1024 * 1024,
+        help='The number of bytes of raw packet text to keep in the packet '
+        'archive.  The oldest raw text is dropped first.',
+    ),
     cfg.IntOpt(
         'stats_store_interval',
         default=10,
@@ -144,6 +219,30 @@ aprsd_opts = [
         default=True,
         help='Set this to False, to disable logging of packets to the log file.',
     ),
+    cfg.BoolOpt(
+        'enable_packet_raw_dict',
+        default=False,
+        help='Keep a copy of the aprslib parse dict in packet.raw_dict for '
+        'every received packet.  This uses a lot of memory.  When disabled, '
+        'packet.get_raw_dict() parses the raw packet again when it is needed.',
+    ),
+    cfg.IntOpt(
+        'packet_intern_max_size',
+        default=10000,
+        help='The maximum number of callsigns and path elements to share '
+        'between received packets.  The same callsigns are in many packets, '
+        'sharing them saves memory.  0 disables it.',
+    ),
+    cfg.BoolOpt(
+        'enable_lazy_packet_decode',
+        default=False,
+        help='Only parse the header of received packets up front, and decode '
+        'the rest of the packet the first time something needs it.  This '
+        'saves the decoding of packets that are filtered out, which are then '
+        'not logged, and of packets that are only counted.  A packet whose '
+        'body fails to decode becomes an UnknownPacket, instead of being '
+        'dropped.',
+    ),
     cfg.BoolOpt(
         'load_help_plugin',
         default=True,
@@ -155,6 +254,101 @@ aprsd_opts = [
         help='Set this to False, to disable sending of ack packets. This will entirely stop'
         'APRSD from sending ack packets.',
     ),
+    cfg.BoolOpt(
+        'enable_ack_fast_path',
+        default=False,
+        help='Set this to True to ack messages sent to us as soon as the raw line is read, '
+        'before the packet is decoded, filtered and run through the plugins. '
+        'This helps prevent the sender from retransmitting because our ack was late.',
+    ),
+    cfg.IntOpt(
+        'plugin_reply_cache_ttl',
+        default=600,
+        help='The number of seconds to keep the replies the plugins generated for a '
+        'message.  If the sender retransmits the same message (same text and msgNo), '
+        'the cached replies are sent again instead of running the plugins again. '
+        '0 disables the reply cache.',
+    ),
+    cfg.IntOpt(
+        'plugin_reply_cache_size',
+        default=256,
+        help='The maximum number of messages to keep plugin replies for.',
+    ),
+    cfg.IntOpt(
+        'packet_process_workers',
+        default=4,
+        help='The number of threads that process the packets for us through the '
+        'plugins.  Packets are sharded by the sending callsign, so the packets '
+        'from a station are processed in order, and packets from different '
+        'stations are processed in parallel.  0 processes every packet on the '
+        'ProcessPKT thread.',
+    ),
+    cfg.IntOpt(
+        'plugin_workers',
+        default=8,
+        help='The number of worker threads used to run the plugins for a packet. '
+        'The plugins for a packet run in parallel, so one slow plugin does not '
+        'hold up the others.',
+    ),
+    cfg.FloatOpt(
+        'plugin_timeout',
+        default=30.0,
+        help='The number of seconds to wait for a plugin to handle a packet. '
+        'If the plugin takes longer, its result is dropped.  0 waits forever.',
+    ),
+    cfg.DictOpt(
+        'plugin_timeouts',
+        default={},
+        help='Per plugin timeouts in seconds, which override plugin_timeout. '
+        'The key is the plugin class name or the fully qualified class path. '
+        'For example: USWeatherPlugin:60,aprsd.plugins.ping.PingPlugin:5',
+    ),
+    cfg.FloatOpt(
+        'plugin_http_timeout',
+        default=10.0,
+        help='The number of seconds to wait for the web APIs the plugins use '
+        '(aprs.fi, weather.gov, openweathermap).',
+    ),
+    cfg.IntOpt(
+        'plugin_http_cache_size',
+        default=256,
+        help='The maximum number of web API responses the plugins keep cached.',
+    ),
+    cfg.DictOpt(
+        'plugin_http_cache_ttls',
+        default={
+            'aprs_fi': '60',
+            'weather_gov': '600',
+            'metar': '300',
+            'openweathermap': '600',
+        },
+        help='The number of seconds to cache the responses from each web API the '
+        'plugins use.  0 disables caching for that API.',
+    ),
+    cfg.ListOpt(
+        'isolated_plugins',
+        default=[],
+        help='Plugins (fully qualified class paths from enabled_plugins) to run in '
+        'a pool of separate worker processes instead of in the aprsd process. '
+        'Use this for plugins that use a lot of CPU, leak memory or may crash.',
+    ),
+    cfg.IntOpt(
+        'isolated_plugin_workers',
+        default=2,
+        help='The number of worker processes for the isolated_plugins.',
+    ),
+    cfg.IntOpt(
+        'isolated_plugin_max_calls',
+        default=1000,
+        help='Restart an isolated plugin worker process after it has handled this '
+        'many packets.  0 never restarts it.',
+    ),
+    cfg.IntOpt(
+        'isolated_plugin_max_memory_mb',
+        default=256,
+        help='Restart an isolated plugin worker process when its resident memory '
+        'is over this many MB.  0 never restarts it.',
+    ),
     cfg.BoolOpt(
         'is_digipi',
         default=False,
@@ -189,6 +383,14 @@ watch_list_opts = [
         default=3600,
         help='Time to wait before alert is sent on new message for users in callsigns.',
     ),
+    cfg.IntOpt(
+        'max_wildcard_callsigns',
+        default=1000,
+        min=1,
+        help='The number of callsigns matched by a wildcard in callsigns, '
+        'like KM6*, to keep.  Once there are more, the ones not seen for '
+        'the longest are dropped.',
+    ),
 ]
 
 push_stats_opts = [
@@ -20,3 +20,11 @@ class APRSClientNotConfiguredException(Exception):
 
     def __init__(self):
         self.message = 'APRS client is not configured.'
+
+
+class IsolatedPluginError(Exception):
+    """An isolated plugin failed in its worker process."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
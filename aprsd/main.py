@@ -91,6 +91,7 @@ def signal_handler(sig, frame):
             packets.WatchList().save()
             packets.SeenList().save()
             packets.PacketList().save()
+            packets.PacketArchive().save()
             collector.Collector().collect()
         except Exception as e:
             LOG.error(f'Failed to save data: {e}')
@@ -0,0 +1,540 @@
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from oslo_config import cfg
+
+from aprsd.packets import core
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+MAGIC = b'APRSDARC'
+VERSION = 1
+# magic, version, capacity, raw_size, rows written, raw bytes written
+HEADER = struct.Struct('<8sIIQQQ')
+# Just the rows written and raw bytes written, updated for every row.
+COUNTERS = struct.Struct('<QQ')
+COUNTERS_OFFSET = HEADER.size - COUNTERS.size
+
+# The fixed size columns, (name, array type code).
+COLUMNS = (
+    ('timestamp', 'd'),
+    ('raw_offset', 'Q'),
+    ('from_id', 'I'),
+    ('to_id', 'I'),
+    ('latitude', 'f'),
+    ('longitude', 'f'),
+    ('raw_length', 'H'),
+    ('type', 'B'),
+    ('flags', 'B'),
+)
+# APRS msgNos are at most 5 characters.
+MSGNO_SIZE = 5
+# A callsign with its SSID is at most 9 characters.
+CALLSIGN_SIZE = 10
+MAX_RAW_LENGTH = 0xFFFF
+FLAG_TX = 0x1
+
+# The packet type codes stored in the type column.  These are saved
+# to disk, only ever add to the end of this.
+TYPE_NAMES = (
+    'Packet',
+    'AckPacket',
+    'BulletinPacket',
+    'RejectPacket',
+    'MessagePacket',
+    'StatusPacket',
+    'GPSPacket',
+    'BeaconPacket',
+    'MicEPacket',
+    'TelemetryPacket',
+    'ObjectPacket',
+    'WeatherPacket',
+    'ThirdPartyPacket',
+    'UnknownPacket',
+)
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# Only bother with numpy for this many rows or more.
+NUMPY_MIN_ROWS = 256
+
+
+class ArchivedPacket(NamedTuple):
+    timestamp: float
+    from_call: Optional[str]
+    to_call: Optional[str]
+    packet_type: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    msgNo: Optional[str]  # noqa: N815
+    tx: bool
+    # None if it's been overwritten in the raw arena.
+    raw: Optional[str]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _callsign_key(callsign: str) -> bytes:
+    """The callsign as it's stored in the callsign table."""
+    return callsign.upper().encode('utf-8', errors='replace')[:CALLSIGN_SIZE]
+
+
+class PacketArchive:
+    """A fixed size, columnar history of the packets we rx and tx.
+
+    Unlike the PacketList, this doesn't keep the packet objects.  Each
+    packet is a row in a ring of fixed size columns (timestamp,
+    from/to callsign ids, type code, lat/lon as float32, msgNo), and
+    its raw text goes in a ring of raw bytes.  So a row costs about
+    60 bytes, plus the raw text while it's still in the raw ring, and
+    the whole archive is one buffer of a size set by the
+    packet_archive_size and packet_archive_raw_size config options.
+
+    With enable_save, the buffer is a memory mapped file in
+    save_location, so the history survives restarts.
+
+    rows() and counts() query the archive, with numpy if it's
+    installed.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance.buffer = None
+            cls._instance.filename = None
+        return cls._instance
+
+    def _filename(self) -> str:
+        return os.path.join(CONF.save_location, 'packetarchive.bin')
+
+    def _layout(self, capacity: int, raw_size: int) -> dict:
+        """The offset of each part of the buffer, and the total size."""
+        offsets = {}
+        offset = _align(HEADER.size)
+        for name, code in COLUMNS:
+            offsets[name] = offset
+            offset = _align(offset + capacity * struct.calcsize(code))
+        offsets['msgno'] = offset
+        offset = _align(offset + capacity * MSGNO_SIZE)
+        # Every row has 2 callsigns at most, and id 0 is no callsign.
+        offsets['callsigns'] = offset
+        offset = _align(offset + (capacity * 2 + 1) * CALLSIGN_SIZE)
+        offsets['raw'] = offset
+        offsets['size'] = offset + raw_size
+        return offsets
+
+    def _map(self, size: int, capacity: int, raw_size: int):
+        """mmap the save file, or anonymous memory without enable_save.
+
+        Returns the buffer and whether it has our existing rows.
+        """
+        if not CONF.enable_save:
+            self.filename = None
+            return mmap.mmap(-1, size), False
+
+        filename = self._filename()
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        existing = False
+        mode = 'r+b' if os.path.exists(filename) else 'w+b'
+        with open(filename, mode) as fp:
+            if os.fstat(fp.fileno()).st_size == size:
+                header = fp.read(HEADER.size)
+                if len(header) == HEADER.size:
+                    magic, version, old_capacity, old_raw_size, _, _ = HEADER.unpack(
+                        header
+                    )
+                    existing = (magic, version, old_capacity, old_raw_size) == (
+                        MAGIC,
+                        VERSION,
+                        capacity,
+                        raw_size,
+                    )
+            if not existing:
+                if mode == 'r+b':
+                    LOG.warning(f'Starting a new packet archive {filename}')
+                fp.truncate(0)
+                fp.truncate(size)
+            buffer = mmap.mmap(fp.fileno(), size)
+        self.filename = filename
+        return buffer, existing
+
+    def open(self) -> bool:
+        """Open the archive, if it's enabled.  Returns True if it's open."""
+        with self.lock:
+            return self._open()
+
+    def _open(self) -> bool:
+        if self.buffer is not None:
+            return True
+        capacity = CONF.packet_archive_size
+        raw_size = max(0, CONF.packet_archive_raw_size)
+        if not CONF.enable_packet_archive or capacity <= 0:
+            return False
+
+        offsets = self._layout(capacity, raw_size)
+        buffer, existing = self._map(offsets['size'], capacity, raw_size)
+        self.buffer = buffer
+        self.capacity = capacity
+        self.raw_size = raw_size
+        self.offsets = offsets
+        self.view = memoryview(buffer)
+        self.columns = {
+            name: self.view[
+                offsets[name] : offsets[name] + capacity * struct.calcsize(code)
+            ].cast(code)
+            for name, code in COLUMNS
+        }
+        self.msgnos = self.view[
+            offsets['msgno'] : offsets['msgno'] + capacity * MSGNO_SIZE
+        ]
+        self.callsigns = self.view[offsets['callsigns'] : offsets['raw']]
+        self.raw = self.view[offsets['raw'] : offsets['size']]
+        if existing:
+            _, _, _, _, self.written, self.raw_written = HEADER.unpack_from(buffer)
+        else:
+            self.written = 0
+            self.raw_written = 0
+            HEADER.pack_into(buffer, 0, MAGIC, VERSION, capacity, raw_size, 0, 0)
+        self._load_callsigns()
+        LOG.info(
+            f'Packet archive of {capacity} packets ({offsets["size"]} bytes)'
+            f' {self.filename or "in memory"} has {len(self)} packets'
+        )
+        return True
+
+    def _load_callsigns(self):
+        """Rebuild the callsign ids from the rows in the archive."""
+        slots = self.capacity * 2 + 1
+        self.refcounts = [0] * slots
+        from_ids = self.columns['from_id']
+        to_ids = self.columns['to_id']
+        for row in range(min(self.written, self.capacity)):
+            self.refcounts[from_ids[row]] += 1
+            self.refcounts[to_ids[row]] += 1
+        self.callsign_ids = {}
+        self.free_ids = []
+        for callsign_id in range(slots - 1, 0, -1):
+            if self.refcounts[callsign_id]:
+                self.callsign_ids[self._callsign_bytes(callsign_id)] = callsign_id
+            else:
+                self.free_ids.append(callsign_id)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.buffer is None:
+                return
+            for column in self.columns.values():
+                column.release()
+            for view in (self.msgnos, self.callsigns, self.raw, self.view):
+                view.release()
+            self.buffer.close()
+            self.buffer = None
+
+    def __len__(self):
+        if self.buffer is None:
+            return 0
+        return min(self.written, self.capacity)
+
+    def _callsign_bytes(self, callsign_id: int) -> bytes:
+        start = callsign_id * CALLSIGN_SIZE
+        return bytes(self.callsigns[start : start + CALLSIGN_SIZE]).rstrip(b'\0')
+
+    def _callsign(self, callsign_id: int) -> Optional[str]:
+        if not callsign_id:
+            return None
+        return self._callsign_bytes(callsign_id).decode('utf-8', errors='replace')
+
+    def _acquire(self, callsign: Optional[str]) -> int:
+        if not callsign:
+            return 0
+        key = _callsign_key(callsign)
+        callsign_id = self.callsign_ids.get(key)
+        if callsign_id is None:
+            callsign_id = self.free_ids.pop()
+            self.callsign_ids[key] = callsign_id
+            start = callsign_id * CALLSIGN_SIZE
+            self.callsigns[start : start + CALLSIGN_SIZE] = key.ljust(
+                CALLSIGN_SIZE, b'\0'
+            )
+        self.refcounts[callsign_id] += 1
+        return callsign_id
+
+    def _release(self, callsign_id: int):
+        if not callsign_id:
+            return
+        self.refcounts[callsign_id] -= 1
+        if not self.refcounts[callsign_id]:
+            del self.callsign_ids[self._callsign_bytes(callsign_id)]
+            self.free_ids.append(callsign_id)
+
+    def _write_raw(self, raw: Optional[str]) -> tuple:
+        """Add raw to the raw ring.  Returns its (offset, length)."""
+        if not raw or not self.raw_size:
+            return self.raw_written, 0
+        data = raw.encode('utf-8', errors='replace')
+        data = data[: min(MAX_RAW_LENGTH, self.raw_size)]
+        offset = self.raw_written
+        start = offset % self.raw_size
+        end = start + len(data)
+        if end <= self.raw_size:
+            self.raw[start:end] = data
+        else:
+            split = self.raw_size - start
+            self.raw[start:] = data[:split]
+            self.raw[: end - self.raw_size] = data[split:]
+        self.raw_written += len(data)
+        return offset, len(data)
+
+    def _read_raw(self, offset: int, length: int) -> Optional[str]:
+        if not length or offset < self.raw_written - self.raw_size:
+            return None
+        start = offset % self.raw_size
+        end = start + length
+        if end <= self.raw_size:
+            data = bytes(self.raw[start:end])
+        else:
+            data = bytes(self.raw[start:]) + bytes(self.raw[: end - self.raw_size])
+        return data.decode('utf-8', errors='replace')
+
+    def _add(self, packet, flags: int) -> None:
+        cls = core.packet_class(packet)
+        packet_type = TYPE_CODES.get(cls.__name__, 0)
+        latitude = longitude = math.nan
+        if (
+            issubclass(cls, core.GPSPacket)
+            and isinstance(packet, core.GPSPacket)
+            and packet.latitude is not None
+        ):
+            latitude = packet.latitude
+            longitude = packet.longitude or 0.0
+        msg_no = str(packet.msgNo or '').encode('ascii', errors='replace')
+        with self.lock:
+            if not self._open():
+                return
+            columns = self.columns
+            row = self.written % self.capacity
+            if self.written >= self.capacity:
+                self._release(columns['from_id'][row])
+                self._release(columns['to_id'][row])
+            raw_offset, raw_length = self._write_raw(packet.raw)
+            columns['timestamp'][row] = packet.timestamp or time.time()
+            columns['raw_offset'][row] = raw_offset
+            columns['from_id'][row] = self._acquire(packet.from_call)
+            columns['to_id'][row] = self._acquire(packet.to_call)
+            columns['latitude'][row] = latitude
+            columns['longitude'][row] = longitude
+            columns['raw_length'][row] = raw_length
+            columns['type'][row] = packet_type
+            columns['flags'][row] = flags
+            start = row * MSGNO_SIZE
+            self.msgnos[start : start + MSGNO_SIZE] = msg_no[:MSGNO_SIZE].ljust(
+                MSGNO_SIZE, b'\0'
+            )
+            self.written += 1
+            COUNTERS.pack_into(
+                self.buffer, COUNTERS_OFFSET, self.written, self.raw_written
+            )
+
+    def rx(self, packet: type[core.Packet]) -> None:
+        if CONF.enable_packet_archive:
+            self._add(packet, 0)
+
+    def tx(self, packet: type[core.Packet]) -> None:
+        if CONF.enable_packet_archive:
+            self._add(packet, FLAG_TX)
+
+    def flush(self) -> None:
+        """Remove all of the packets."""
+        with self.lock:
+            if not self._open():
+                return
+            self.written = 0
+            self.raw_written = 0
+            COUNTERS.pack_into(self.buffer, COUNTERS_OFFSET, 0, 0)
+            self._load_callsigns()
+
+    def load(self) -> None:
+        """Open the archive, which has the saved packets."""
+        self.open()
+
+    def save(self) -> None:
+        """Write the archive out to the save file."""
+        with self.lock:
+            if self.buffer is not None and self.filename:
+                self.buffer.flush()
+
+    def _array(self, name: str, count: int):
+        code = dict(COLUMNS)[name]
+        return numpy.frombuffer(
+            self.buffer,
+            dtype=numpy.dtype(code),
+            count=count,
+            offset=self.offsets[name],
+        )
+
+    def _select(
+        self,
+        start=None,
+        end=None,
+        from_call=None,
+        to_call=None,
+        packet_type=None,
+    ) -> list:
+        """The rows that match, oldest first."""
+        count = len(self)
+        head = self.written % self.capacity if self.written > self.capacity else 0
+        conditions = []
+        if from_call is not None:
+            from_id = self.callsign_ids.get(_callsign_key(from_call))
+            if from_id is None:
+                return []
+            conditions.append(('from_id', '==', from_id))
+        if to_call is not None:
+            to_id = self.callsign_ids.get(_callsign_key(to_call))
+            if to_id is None:
+                return []
+            conditions.append(('to_id', '==', to_id))
+        if packet_type is not None:
+            conditions.append(('type', '==', TYPE_CODES[packet_type]))
+        if start is not None:
+            conditions.append(('timestamp', '>=', start))
+        if end is not None:
+            conditions.append(('timestamp', '<', end))
+
+        if numpy is not None and count >= NUMPY_MIN_ROWS:
+            mask = numpy.ones(count, dtype=bool)
+            for name, op, value in conditions:
+                column = self._array(name, count)
+                if op == '==':
+                    mask &= column == value
+                elif op == '>=':
+                    mask &= column >= value
+                else:
+                    mask &= column < value
+            rows = numpy.flatnonzero(mask)
+            if head:
+                rows = numpy.concatenate((rows[rows >= head], rows[rows < head]))
+            return rows.tolist()
+
+        rows = list(range(head, count)) + list(range(head))
+        for name, op, value in conditions:
+            column = self.columns[name]
+            if op == '==':
+                rows = [row for row in rows if column[row] == value]
+            elif op == '>=':
+                rows = [row for row in rows if column[row] >= value]
+            else:
+                rows = [row for row in rows if column[row] < value]
+        return rows
+
+    def _row(self, row: int) -> ArchivedPacket:
+        columns = self.columns
+        latitude = columns['latitude'][row]
+        longitude = columns['longitude'][row]
+        start = row * MSGNO_SIZE
+        msg_no = bytes(self.msgnos[start : start + MSGNO_SIZE]).rstrip(b'\0')
+        return ArchivedPacket(
+            timestamp=columns['timestamp'][row],
+            from_call=self._callsign(columns['from_id'][row]),
+            to_call=self._callsign(columns['to_id'][row]),
+            packet_type=TYPE_NAMES[columns['type'][row]],
+            latitude=None if math.isnan(latitude) else latitude,
+            longitude=None if math.isnan(longitude) else longitude,
+            msgNo=msg_no.decode('ascii', errors='replace') or None,
+            tx=bool(columns['flags'][row] & FLAG_TX),
+            raw=self._read_raw(columns['raw_offset'][row], columns['raw_length'][row]),
+        )
+
+    def rows(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        from_call: Optional[str] = None,
+        to_call: Optional[str] = None,
+        packet_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list:
+        """The archived packets that match, oldest first.
+
+        start and end are unix times, end isn't included.
+        packet_type is a packet class name like 'MessagePacket'.
+        limit only returns the newest limit packets.
+        """
+        with self.lock:
+            if self.buffer is None:
+                return []
+            rows = self._select(start, end, from_call, to_call, packet_type)
+            if limit is not None:
+                rows = rows[-limit:] if limit > 0 else []
+            return [self._row(row) for row in rows]
+
+    def counts(
+        self,
+        interval: int = 60,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> dict:
+        """The number of packets of each type in every interval.
+
+        Returns {interval start time: {packet type: count}}, for the
+        intervals that have packets.
+        """
+        with self.lock:
+            if self.buffer is None:
+                return {}
+            rows = self._select(start, end)
+            result = {}
+            if numpy is not None and len(rows) >= NUMPY_MIN_ROWS:
+                count = len(self)
+                rows = numpy.asarray(rows, dtype=numpy.int64)
+                buckets = numpy.floor_divide(
+                    self._array('timestamp', count)[rows], interval
+                ).astype(numpy.int64)
+                keys = buckets * len(TYPE_NAMES) + self._array('type', count)[rows]
+                keys, totals = numpy.unique(keys, return_counts=True)
+                for key, total in zip(keys.tolist(), totals.tolist(), strict=True):
+                    bucket, packet_type = divmod(key, len(TYPE_NAMES))
+                    result.setdefault(bucket * interval, {})[
+                        TYPE_NAMES[packet_type]
+                    ] = total
+                return result
+
+            timestamps = self.columns['timestamp']
+            types = self.columns['type']
+            for row in rows:
+                bucket = int(timestamps[row] // interval) * interval
+                counts = result.setdefault(bucket, {})
+                packet_type = TYPE_NAMES[types[row]]
+                counts[packet_type] = counts.get(packet_type, 0) + 1
+            return result
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            if self.buffer is None:
+                return {'enabled': CONF.enable_packet_archive, 'size': 0}
+            return {
+                'enabled': CONF.enable_packet_archive,
+                'size': len(self),
+                'max_size': self.capacity,
+                'written': self.written,
+                'callsigns': len(self.callsign_ids),
+                'bytes': self.offsets['size'],
+                'raw_bytes': min(self.raw_written, self.raw_size),
+                'file': self.filename,
+            }
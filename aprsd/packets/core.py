@@ -1,27 +1,44 @@
 import logging
 import re
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 
 # Due to a failure in python 3.8
-from typing import Any, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
+import aprslib
 from aprslib import util as aprslib_util
+from aprslib.exceptions import ParseError, UnknownFormat
 from dataclasses_json import (
     CatchAll,
     DataClassJsonMixin,
     Undefined,
+    config,
     dataclass_json,
 )
 from loguru import logger
+from oslo_config import cfg
 
-from aprsd.utils import counter
+from aprsd import conf  # noqa: F401
+from aprsd.utils import counter, interning
 
 # For mypy to be happy
 A = TypeVar('A', bound='DataClassJsonMixin')
 Json = Union[dict, list, str, int, float, bool, None]
 
+CONF = cfg.CONF
 LOG = logging.getLogger()
 LOGU = logger
 
@@ -42,6 +59,25 @@ PACKET_TYPE_UNCOMPRESSED = 'uncompressed'
 
 NO_DATE = datetime(1900, 10, 24)
 
+# Setting any other field clears the cached payload, raw, key and
+# human_info of a packet.  None of these are used to build them.
+_CACHE_SAFE_FIELDS = frozenset(
+    (
+        '_cache',
+        'payload',
+        'raw',
+        'raw_dict',
+        'send_count',
+        'retry_count',
+        'last_send_time',
+        'acked',
+        'processed',
+        'allow_delay',
+        'path',
+        'via',
+    )
+)
+
 
 def _init_timestamp():
     """Build a unix style timestamp integer"""
@@ -54,15 +90,63 @@ def _init_send_time():
     return NO_DATE
 
 
-def _init_msgNo():  # noqa: N802
+def _init_msgNo(peer: Optional[str] = None):  # noqa: N802
     """For some reason __post__init doesn't get called.
 
     So in order to initialize the msgNo field in the packet
     we use this workaround.
+
+    When peer is set, the msgNo comes from that peer's own
+    sequence, so msgNos only need to be unique per peer.
     """
-    c = counter.PacketCounter()
-    c.increment()
-    return c.value
+    return counter.PacketCounter().next_value(peer)
+
+
+def _get_raw_dict(packet) -> dict:
+    if packet.raw_dict is None:
+        packet.raw_dict = {}
+        if packet.raw:
+            try:
+                packet.raw_dict = aprslib.parse(packet.raw)
+            except (ParseError, UnknownFormat) as ex:
+                LOG.debug(f'Failed to parse raw packet {packet.raw}: {ex}')
+    return packet.raw_dict
+
+
+def _memoized(func):
+    """A read only property that is cached in the packet's _cache.
+
+    The cache is cleared when a field the value depends on is set.
+    """
+    name = func.__qualname__
+
+    def getter(self):
+        cache = self._cache
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, '_cache', cache)
+        elif name in cache:
+            return cache[name]
+        value = cache[name] = func(self)
+        return value
+
+    getter.__doc__ = func.__doc__
+    return property(getter)
+
+
+# The shared callsigns and path elements of received packets.
+_intern = interning.StringInterner().intern
+
+
+def _intern_fields(raw: dict) -> dict:
+    """Share the callsign and path strings with the other packets."""
+    for name in ('from_call', 'to_call', 'addresse', 'via'):
+        if name in raw:
+            raw[name] = _intern(raw[name])
+    path = raw.get('path')
+    if path:
+        raw['path'] = [_intern(hop) for hop in path]
+    return raw
 
 
 def _translate_fields(raw: dict) -> dict:
@@ -76,11 +160,14 @@ def _translate_fields(raw: dict) -> dict:
     if 'addresse' in raw:
         raw['to_call'] = raw['addresse']
 
-    return raw
+    return _intern_fields(raw)
 
 
+# The packet classes use __slots__ to save memory, so they can't have
+# attributes that aren't fields.  slots=True builds a new class, which
+# breaks the zero argument super() in methods, use super(Class, self).
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class Packet:
     _type: str = field(default='Packet', hash=False)
     from_call: Optional[str] = field(default=None)
@@ -94,8 +181,10 @@ class Packet:
     # Holds the raw text string to be sent over the wire
     # or holds the raw string from input packet
     raw: Optional[str] = field(default=None, compare=False, hash=False)
-    raw_dict: dict = field(
-        repr=False, default_factory=lambda: {}, compare=False, hash=False
+    # The aprslib parse dict, only kept with enable_packet_raw_dict.
+    # Use get_raw_dict() to get it either way.
+    raw_dict: Optional[dict] = field(
+        repr=False, default=None, compare=False, hash=False
     )
     # Built by calling prepare().  raw needs this built first.
     payload: Optional[str] = field(default=None)
@@ -113,11 +202,43 @@ class Packet:
     allow_delay: bool = field(repr=False, default=True, compare=False, hash=False)
     path: List[str] = field(default_factory=list, compare=False, hash=False)
     via: Optional[str] = field(default=None, compare=False, hash=False)
+    # The memoized payload, raw, key and human_info.
+    _cache: Optional[dict] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+        hash=False,
+        metadata=config(exclude=lambda _: True),
+    )
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name not in _CACHE_SAFE_FIELDS:
+            object.__setattr__(self, '_cache', None)
 
     def get(self, key: str, default: Optional[str] = None):
         return getattr(self, key, default)
 
-    @property
+    @classmethod
+    def _from_raw(cls, raw: dict):
+        """Create the packet from a translated aprslib parse dict.
+
+        This gives the same packet as from_dict(), without the
+        dataclasses_json type inspection on every call.
+        """
+        return _new_packet(cls, _decode_kwargs(cls, raw))
+
+    def get_raw_dict(self) -> dict:
+        """The aprslib parse dict of the packet.
+
+        Unless enable_packet_raw_dict is set, this isn't kept when
+        the packet is received.  It's parsed again from raw the first
+        time it's asked for.
+        """
+        return _get_raw_dict(self)
+
+    @_memoized
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
         return f'{self.from_call}:{self.addresse}:{self.msgNo}'
@@ -125,7 +246,7 @@ class Packet:
     def update_timestamp(self) -> None:
         self.timestamp = _init_timestamp()
 
-    @property
+    @_memoized
     def human_info(self) -> str:
         """Build a human readable string for this packet.
 
@@ -140,9 +261,17 @@ class Packet:
         """Do stuff here that is needed prior to sending over the air."""
         # now build the raw message for sending
         if not self.msgNo and create_msg_number:
-            self.msgNo = _init_msgNo()
+            self.msgNo = _init_msgNo(self.to_call)
+        cache = self._cache
+        if cache is not None and 'prepare' in cache:
+            # Nothing changed since the last time, reuse it.
+            self.payload, self.raw = cache['prepare']
+            return
         self._build_payload()
         self._build_raw()
+        if self._cache is None:
+            self._cache = {}
+        self._cache['prepare'] = (self.payload, self.raw)
 
     def _build_payload(self) -> None:
         """The payload is the non headers portion of the packet."""
@@ -194,7 +323,7 @@ class Packet:
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class AckPacket(Packet):
     _type: str = field(default='AckPacket', hash=False)
 
@@ -203,19 +332,19 @@ class AckPacket(Packet):
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class BulletinPacket(Packet):
     _type: str = 'BulletinPacket'
     # Holds the encapsulated packet
     bid: Optional[str] = field(default='1')
     message_text: Optional[str] = field(default=None)
 
-    @property
+    @_memoized
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
         return f'{self.from_call}:BLN{self.bid}'
 
-    @property
+    @_memoized
     def human_info(self) -> str:
         return f'BLN{self.bid} {self.message_text}'
 
@@ -224,7 +353,7 @@ class BulletinPacket(Packet):
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class RejectPacket(Packet):
     _type: str = field(default='RejectPacket', hash=False)
     response: Optional[str] = field(default=None)
@@ -238,12 +367,12 @@ class RejectPacket(Packet):
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class MessagePacket(Packet):
     _type: str = field(default='MessagePacket', hash=False)
     message_text: Optional[str] = field(default=None)
 
-    @property
+    @_memoized
     def human_info(self) -> str:
         self.prepare()
         return self._filter_for_send(self.message_text).rstrip('\n')
@@ -263,7 +392,7 @@ class MessagePacket(Packet):
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class StatusPacket(Packet):
     _type: str = field(default='StatusPacket', hash=False)
     status: Optional[str] = field(default=None)
@@ -278,14 +407,14 @@ class StatusPacket(Packet):
             str(self.msgNo),
         )
 
-    @property
+    @_memoized
     def human_info(self) -> str:
         self.prepare()
         return self.status
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class GPSPacket(Packet):
     _type: str = field(default='GPSPacket', hash=False)
     latitude: float = field(default=0.00)
@@ -340,7 +469,7 @@ class GPSPacket(Packet):
     def _build_raw(self):
         self.raw = f'{self.from_call}>{self.to_call},WIDE2-1:{self.payload}'
 
-    @property
+    @_memoized
     def human_info(self) -> str:
         h_str = []
         h_str.append(f'Lat:{self.latitude:03.3f}')
@@ -360,7 +489,7 @@ class GPSPacket(Packet):
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class BeaconPacket(GPSPacket):
     _type: str = field(default='BeaconPacket', hash=False)
 
@@ -381,7 +510,7 @@ class BeaconPacket(GPSPacket):
     def _build_raw(self):
         self.raw = f'{self.from_call}>APZ100:{self.payload}'
 
-    @property
+    @_memoized
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
         if self.raw_timestamp:
@@ -389,7 +518,7 @@ class BeaconPacket(GPSPacket):
         else:
             return f'{self.from_call}:{self.human_info.replace(" ", "")}'
 
-    @property
+    @_memoized
     def human_info(self) -> str:
         h_str = []
         h_str.append(f'Lat:{self.latitude:03.3f}')
@@ -399,7 +528,7 @@ class BeaconPacket(GPSPacket):
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class MicEPacket(GPSPacket):
     _type: str = field(default='MicEPacket', hash=False)
     messagecapable: bool = False
@@ -411,19 +540,19 @@ class MicEPacket(GPSPacket):
     # 0 to 360
     course: int = 0
 
-    @property
+    @_memoized
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
         return f'{self.from_call}:{self.human_info.replace(" ", "")}'
 
-    @property
+    @_memoized
     def human_info(self) -> str:
-        h_info = super().human_info
+        h_info = super(MicEPacket, self).human_info
         return f'{h_info} {self.mbits} mbits'
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class TelemetryPacket(GPSPacket):
     _type: str = field(default='TelemetryPacket', hash=False)
     messagecapable: bool = False
@@ -437,7 +566,7 @@ class TelemetryPacket(GPSPacket):
     # 0 to 360
     course: int = 0
 
-    @property
+    @_memoized
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
         if self.raw_timestamp:
@@ -445,14 +574,14 @@ class TelemetryPacket(GPSPacket):
         else:
             return f'{self.from_call}:{self.human_info.replace(" ", "")}'
 
-    @property
+    @_memoized
     def human_info(self) -> str:
-        h_info = super().human_info
+        h_info = super(TelemetryPacket, self).human_info
         return f'{h_info} {self.telemetry}'
 
 
 @dataclass_json
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class ObjectPacket(GPSPacket):
     _type: str = field(default='ObjectPacket', hash=False)
     alive: bool = True
@@ -487,26 +616,35 @@ class ObjectPacket(GPSPacket):
 
         self.raw = f'{self.from_call}>APZ100:;{self.to_call:9s}{self.payload}'
 
-    @property
+    @_memoized
     def human_info(self) -> str:
-        h_info = super().human_info
+        h_info = super(ObjectPacket, self).human_info
         return f'{h_info} {self.comment}'
 
 
-@dataclass(unsafe_hash=True)
-class WeatherPacket(GPSPacket, DataClassJsonMixin):
+def _wx_value(value: Optional[float], width: int) -> str:
+    """Format a weather payload value, dots if it wasn't reported."""
+    if value is None:
+        return '.' * width
+    return f'{value:0{width}.0f}'
+
+
+@dataclass(unsafe_hash=True, slots=True)
+class WeatherPacket(GPSPacket):
     _type: str = field(default='WeatherPacket', hash=False)
     symbol: str = '_'
-    wind_speed: float = 0.00
-    wind_direction: int = 0
-    wind_gust: float = 0.00
-    temperature: float = 0.00
+    # in mph.  None if the station didn't report it.
+    wind_speed: Optional[float] = 0.00
+    wind_direction: Optional[int] = 0
+    wind_gust: Optional[float] = 0.00
+    # in degrees C, as aprslib decodes it.
+    temperature: Optional[float] = 0.00
     # in inches.  1.04 means 1.04 inches
     rain_1h: float = 0.00
     rain_24h: float = 0.00
     rain_since_midnight: float = 0.00
-    humidity: int = 0
-    pressure: float = 0.00
+    humidity: Optional[int] = 0
+    pressure: Optional[float] = 0.00
     comment: Optional[str] = field(default=None)
     luminosity: Optional[int] = field(default=None)
     wx_raw_timestamp: Optional[str] = field(default=None)
@@ -517,10 +655,21 @@ class WeatherPacket(GPSPacket, DataClassJsonMixin):
         # aprslib returns the weather data in a 'weather' key
         # We need to move the data out of the 'weather' key
         # and into the root of the dictionary
+        reported = None
         if 'weather' in raw:
+            reported = set(raw['weather'])
             for key in raw['weather']:
                 raw[key] = raw['weather'][key]
             del raw['weather']
+            if 'wind_speed' in reported:
+                # aprslib decodes the wind in m/s and the rain in mm.
+                # The broken aprslib case below converts them too.
+                raw['wind_speed'] = round(raw['wind_speed'] / 0.44704, 3)
+                if 'wind_gust' in reported:
+                    raw['wind_gust'] = round(raw['wind_gust'] / 0.44704, 3)
+                for key in ('rain_1h', 'rain_24h', 'rain_since_midnight'):
+                    if key in reported:
+                        raw[key] = round((raw[key] / 0.254) * 0.01, 3)
 
         # If we have the broken aprslib, then we need to
         # Convert the course and speed to wind_speed and wind_direction
@@ -557,15 +706,28 @@ class WeatherPacket(GPSPacket, DataClassJsonMixin):
             if 'course' in raw:
                 del raw['course']
 
+        if reported is not None:
+            # What the station didn't report is None, rather than 0.
+            for key in ('temperature', 'humidity', 'pressure', 'wind_gust'):
+                if key not in reported:
+                    raw[key] = None
+            for key in ('wind_speed', 'wind_direction'):
+                raw.setdefault(key, None)
+
         return raw
 
     @classmethod
     def from_dict(cls: Type[A], kvs: Json, *, infer_missing=False) -> A:
         """Create from a dictionary that has come directly from aprslib parse"""
         raw = cls._translate(cls, kvs)  # type: ignore
-        return super().from_dict(raw)
+        return super(WeatherPacket, cls).from_dict(raw)
 
-    @property
+    @classmethod
+    def _from_raw(cls, raw: dict):
+        raw = cls._translate(cls, raw)
+        return super(WeatherPacket, cls)._from_raw(raw)
+
+    @_memoized
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
         if self.raw_timestamp:
@@ -574,12 +736,23 @@ class WeatherPacket(GPSPacket, DataClassJsonMixin):
             return f'{self.from_call}:{self.wx_raw_timestamp}'
 
     @property
+    def temperature_f(self) -> Optional[float]:
+        """The temperature in degrees F, or None."""
+        if self.temperature is None:
+            return None
+        return self.temperature * 9 / 5 + 32
+
+    @_memoized
     def human_info(self) -> str:
         h_str = []
-        h_str.append(f'Temp {self.temperature:03.0f}F')
-        h_str.append(f'Humidity {self.humidity}%')
-        h_str.append(f'Wind {self.wind_speed:03.0f}MPH@{self.wind_direction}')
-        h_str.append(f'Pressure {self.pressure}mb')
+        if self.temperature is not None:
+            h_str.append(f'Temp {self.temperature_f:03.0f}F')
+        if self.humidity is not None:
+            h_str.append(f'Humidity {self.humidity}%')
+        if self.wind_speed is not None:
+            h_str.append(f'Wind {self.wind_speed:03.0f}MPH@{self.wind_direction}')
+        if self.pressure is not None:
+            h_str.append(f'Pressure {self.pressure}mb')
         h_str.append(f'Rain {self.rain_24h}in/24hr')
 
         return ' '.join(h_str)
@@ -608,30 +781,36 @@ class WeatherPacket(GPSPacket, DataClassJsonMixin):
          % shows software type d=Dos, m=Mac, w=Win, etc
          type shows type of WX instrument
 
+         A value the station didn't report is sent as dots.
         """
         time_zulu = self._build_time_zulu()
+        humidity = pressure = None
+        if self.humidity is not None:
+            humidity = self.humidity % 100
+        if self.pressure is not None:
+            pressure = self.pressure * 10
 
         contents = [
             f'@{time_zulu}z{self.latitude}{self.symbol_table}',
             f'{self.longitude}{self.symbol}',
-            f'{self.wind_direction:03d}',
+            _wx_value(self.wind_direction, 3),
             # Speed = sustained 1 minute wind speed in mph
             f'{self.symbol_table}',
-            f'{self.wind_speed:03.0f}',
+            _wx_value(self.wind_speed, 3),
             # wind gust (peak wind speed in mph in the last 5 minutes)
-            f'g{self.wind_gust:03.0f}',
+            f'g{_wx_value(self.wind_gust, 3)}',
             # Temperature in degrees F
-            f't{self.temperature:03.0f}',
+            f't{_wx_value(self.temperature_f, 3)}',
             # Rainfall (in hundredths of an inch) in the last hour
             f'r{self.rain_1h * 100:03.0f}',
             # Rainfall (in hundredths of an inch) in last 24 hours
             f'p{self.rain_24h * 100:03.0f}',
             # Rainfall (in hundredths of an inch) since midnigt
             f'P{self.rain_since_midnight * 100:03.0f}',
-            # Humidity
-            f'h{self.humidity:02d}',
+            # Humidity, 00 is 100%
+            f'h{_wx_value(humidity, 2)}',
             # Barometric pressure (in tenths of millibars/tenths of hPascal)
-            f'b{self.pressure:05.0f}',
+            f'b{_wx_value(pressure, 5)}',
         ]
         if self.comment:
             comment = self._filter_for_send(self.comment)
@@ -642,8 +821,8 @@ class WeatherPacket(GPSPacket, DataClassJsonMixin):
         self.raw = f'{self.from_call}>{self.to_call},WIDE1-1,WIDE2-1:{self.payload}'
 
 
-@dataclass(unsafe_hash=True)
-class ThirdPartyPacket(Packet, DataClassJsonMixin):
+@dataclass(unsafe_hash=True, slots=True)
+class ThirdPartyPacket(Packet):
     _type: str = 'ThirdPartyPacket'
     # Holds the encapsulated packet
     subpacket: Optional[type[Packet]] = field(default=None, compare=True, hash=False)
@@ -661,10 +840,16 @@ class ThirdPartyPacket(Packet, DataClassJsonMixin):
 
     @classmethod
     def from_dict(cls: Type[A], kvs: Json, *, infer_missing=False) -> A:
-        obj = super().from_dict(kvs)
+        obj = super(ThirdPartyPacket, cls).from_dict(kvs)
         obj.subpacket = factory(obj.subpacket)  # type: ignore
         return obj
 
+    @classmethod
+    def _from_raw(cls, raw: dict):
+        obj = super(ThirdPartyPacket, cls)._from_raw(raw)
+        obj.subpacket = factory(obj.subpacket)
+        return obj
+
     @property
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
@@ -677,7 +862,7 @@ class ThirdPartyPacket(Packet, DataClassJsonMixin):
 
 
 @dataclass_json(undefined=Undefined.INCLUDE)
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class UnknownPacket:
     """Catchall Packet for things we don't know about.
 
@@ -692,8 +877,10 @@ class UnknownPacket:
     format: Optional[str] = field(default=None)
     timestamp: float = field(default_factory=_init_timestamp, compare=False, hash=False)
     raw: Optional[str] = field(default=None)
-    raw_dict: dict = field(
-        repr=False, default_factory=lambda: {}, compare=False, hash=False
+    # The aprslib parse dict, only kept with enable_packet_raw_dict.
+    # Use get_raw_dict() to get it either way.
+    raw_dict: Optional[dict] = field(
+        repr=False, default=None, compare=False, hash=False
     )
     path: List[str] = field(default_factory=list, compare=False, hash=False)
     packet_type: Optional[str] = field(default=None)
@@ -701,6 +888,15 @@ class UnknownPacket:
     # Was the packet previously processed (for dupe checking)
     processed: bool = field(repr=False, default=False, compare=False, hash=False)
 
+    @classmethod
+    def _from_raw(cls, raw: dict):
+        # The unknown_fields CatchAll needs the dataclasses_json decoder.
+        return cls.from_dict(raw)
+
+    def get_raw_dict(self) -> dict:
+        """The aprslib parse dict of the packet, see Packet.get_raw_dict()."""
+        return _get_raw_dict(self)
+
     @property
     def key(self) -> str:
         """Build a key for finding this packet in a dict."""
@@ -711,6 +907,284 @@ class UnknownPacket:
         return str(self.unknown_fields)
 
 
+# The header validation aprslib.parse() does, compiled.
+FROM_CALL_RE = re.compile(r'^[a-z0-9]{0,9}(-[a-z0-9]{1,8})?$', re.IGNORECASE)
+TO_CALL_RE = re.compile(r'^[A-Z0-9]{1,6}(-(\d{1,2}))?$')
+PATH_CALL_RE = re.compile(r'^[A-Z0-9\-]{1,9}\*?$', re.IGNORECASE)
+VIA_Q_RE = re.compile(r'^q..$')
+
+# The data type identifier of message, ack, reject, bulletin and
+# telemetry message packets.  Only these have an addresse and msgNo,
+# and their to_call is the addresse.
+DATA_TYPE_MESSAGE = ':'
+# The data type identifier of third party packets.
+DATA_TYPE_THIRDPARTY = '}'
+# Data type identifiers that always decode to the same packet class.
+DATA_TYPE_CLASSES = {
+    '>': StatusPacket,
+    '`': MicEPacket,
+    "'": MicEPacket,
+    '_': WeatherPacket,
+}
+# Position data type identifiers -> the length of the timestamp
+# before the position.
+DATA_TYPE_POSITIONS = {'!': 0, '=': 0, '/': 7, '@': 7}
+# An object has a 9 character name, its state and a timestamp.
+DATA_TYPE_OBJECT = ';'
+OBJECT_POSITION_OFFSET = 17
+
+
+def parse_header(line: Union[str, bytes]) -> dict:
+    """Parse the header and data type of a TNC2 line, like aprslib.parse().
+
+    Returns a dict with raw, from_call, to_call, path, via and
+    data_type.  Raises aprslib's ParseError for the same bad headers
+    aprslib.parse() does.
+    """
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    line = line.rstrip('\r\n')
+    head, sep, body = line.partition(':')
+    if not sep or not body:
+        raise ParseError('packet has no body', line)
+    from_call, sep, path = head.partition('>')
+    if not sep:
+        raise ParseError('invalid packet header', line)
+    if not 1 <= len(from_call) <= 9 or not FROM_CALL_RE.match(from_call):
+        raise ParseError('fromcallsign is invalid', line)
+    path = path.split(',')
+    to_call = path.pop(0)
+    to_match = TO_CALL_RE.match(to_call)
+    if not to_match or (to_match.group(2) and int(to_match.group(2)) > 15):
+        raise ParseError('tocallsign: invalid callsign', line)
+    for digi in path:
+        if not PATH_CALL_RE.match(digi):
+            raise ParseError('invalid callsign in path', line)
+    via = ''
+    if len(path) >= 2 and VIA_Q_RE.match(path[-2]):
+        via = path[-1]
+    return {
+        'raw': line,
+        'from_call': _intern(from_call),
+        'to_call': _intern(to_call),
+        'path': [_intern(hop) for hop in path],
+        'via': _intern(via),
+        'data_type': body[0],
+    }
+
+
+def _position_symbol(position: str) -> Optional[str]:
+    """The symbol code of an uncompressed or compressed position."""
+    if position[:1].isdigit():
+        return position[18:19]
+    return position[9:10]
+
+
+def header_packet_class(header: dict) -> Optional[type]:
+    """The packet class a line decodes to, from its parse_header() dict.
+
+    This only looks at the data type identifier, and the symbol of
+    position and object packets, so a line whose body doesn't decode
+    becomes an UnknownPacket instead.  Returns None for what can't be
+    worked out without decoding the body, like message packets.
+    """
+    data_type = header['data_type']
+    cls = DATA_TYPE_CLASSES.get(data_type)
+    if cls is not None:
+        return cls
+    body = header['raw'].partition(':')[2]
+    if data_type in DATA_TYPE_POSITIONS:
+        position = body[1 + DATA_TYPE_POSITIONS[data_type] :]
+        # Only aprslib's uncompressed positions are weather reports.
+        if position[:1].isdigit() and _position_symbol(position) == '_':
+            return WeatherPacket
+        return BeaconPacket
+    if data_type == DATA_TYPE_OBJECT:
+        position = body[1 + OBJECT_POSITION_OFFSET :]
+        if _position_symbol(position) == '_':
+            return WeatherPacket
+        return ObjectPacket
+    return None
+
+
+def _is_message(header: dict) -> bool:
+    return header['data_type'] == DATA_TYPE_MESSAGE
+
+
+# A status packet can start with a DDHHMMz timestamp.
+STATUS_TIMESTAMP_RE = re.compile(r'>\d{6}')
+
+
+def _has_timestamp(header: dict) -> bool:
+    """If the packet might carry its own timestamp, from the header."""
+    data_type = header['data_type']
+    if data_type in ('/', '@', DATA_TYPE_OBJECT, DATA_TYPE_THIRDPARTY):
+        return True
+    if data_type == '>':
+        return bool(STATUS_TIMESTAMP_RE.match(header['raw'].partition(':')[2]))
+    return False
+
+
+def _lazy_field(name: str, needs_decode: Optional[Callable[[dict], bool]] = None):
+    """A LazyPacket field that doesn't need the packet to be decoded.
+
+    Packets that needs_decode(header) is true for are decoded, for
+    fields that come from their body.
+    """
+
+    def getter(self):
+        packet = self._packet
+        if packet is not None:
+            return getattr(packet, name)
+        if name in self._updates:
+            return self._updates[name]
+        if needs_decode is not None and needs_decode(self._header):
+            return getattr(self.decode(), name)
+        return self._header.get(name)
+
+    return property(getter)
+
+
+class LazyPacket:
+    """A received packet that is only decoded when it's needed.
+
+    factory() creates these from raw lines when enable_lazy_packet_decode
+    is set.  Only the header is parsed up front, which is enough for
+    from_call, to_call, path, via and, for anything but a message
+    packet, addresse and msgNo.  The timestamp is when it was received,
+    unless the packet might carry its own.  Anything else decodes the packet,
+    and from then on the LazyPacket acts as the decoded packet.
+    isinstance() checks decode it, to find the real packet class, but
+    type() is always LazyPacket, so code that only needs the class
+    should use packet_class(), which works it out from the header.
+
+    The key of anything but a message packet is from_call and the
+    body, so adding it to the PacketList doesn't decode it either.
+
+    Fields that are set before the packet is decoded are kept, and
+    set on the packet when it's decoded.
+    """
+
+    __slots__ = ('_header', '_updates', '_packet')
+
+    raw = _lazy_field('raw')
+    from_call = _lazy_field('from_call')
+    to_call = _lazy_field('to_call', _is_message)
+    addresse = _lazy_field('addresse', _is_message)
+    msgNo = _lazy_field('msgNo', _is_message)  # noqa: N815
+    ackMsgNo = _lazy_field('ackMsgNo', _is_message)  # noqa: N815
+    path = _lazy_field('path')
+    via = _lazy_field('via')
+    timestamp = _lazy_field('timestamp', _has_timestamp)
+
+    def __init__(self, header: dict):
+        object.__setattr__(self, '_header', header)
+        object.__setattr__(self, '_updates', {})
+        object.__setattr__(self, '_packet', None)
+        # When it was received, for packets without a timestamp.
+        header.setdefault('timestamp', _init_timestamp())
+
+    @property
+    def data_type(self) -> str:
+        """The APRS data type identifier, the first character of the body."""
+        return self._header['data_type']
+
+    @property
+    def decoded(self) -> bool:
+        return self._packet is not None
+
+    @property
+    def header_class(self) -> type:
+        """The packet class, from the header if it hasn't been decoded."""
+        if self._packet is None:
+            cls = header_packet_class(self._header)
+            if cls is not None:
+                return cls
+        return type(self.decode())
+
+    @property
+    def key(self) -> str:
+        header = self._header
+        if header['data_type'] == DATA_TYPE_MESSAGE:
+            return self.decode().key
+        # The same before and after decoding.
+        return f'{header["from_call"]}:{header["raw"].partition(":")[2]}'
+
+    def decode(self):
+        """Decode the packet, if it hasn't been already, and return it."""
+        packet = self._packet
+        if packet is None:
+            header = self._header
+            try:
+                raw = aprslib.parse(header['raw'])
+                raw.setdefault('timestamp', header['timestamp'])
+                packet = factory(raw)
+            except (ParseError, UnknownFormat) as ex:
+                LOG.debug(f'Failed to decode packet {header["raw"]}: {ex}')
+                packet = UnknownPacket.from_dict(
+                    {
+                        'from_call': header['from_call'],
+                        'to_call': header['to_call'],
+                        'path': header['path'],
+                        'via': header['via'],
+                        'raw': header['raw'],
+                        'format': PACKET_TYPE_UNKNOWN,
+                        'packet_type': PACKET_TYPE_UNKNOWN,
+                        'timestamp': header['timestamp'],
+                    }
+                )
+            for name, value in self._updates.items():
+                setattr(packet, name, value)
+            object.__setattr__(self, '_packet', packet)
+        return packet
+
+    @property
+    def __class__(self):
+        return type(self.decode())
+
+    def __getattr__(self, name):
+        # Only called for what isn't a LazyPacket attribute.
+        if self._packet is None and name in self._updates:
+            return self._updates[name]
+        return getattr(self.decode(), name)
+
+    def __setattr__(self, name, value):
+        if self._packet is None:
+            self._updates[name] = value
+        else:
+            setattr(self._packet, name, value)
+
+    def __eq__(self, other):
+        if type(other) is LazyPacket:
+            other = other.decode()
+        return self.decode() == other
+
+    def __hash__(self):
+        return hash(self.decode())
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles are of the decoded packet.
+        return self.decode().__reduce_ex__(protocol)
+
+    def __str__(self) -> str:
+        return str(self.decode())
+
+    def __repr__(self) -> str:
+        if self._packet is not None:
+            return repr(self._packet)
+        return (
+            f'{type(self).__name__}: From: {self.from_call}     To: '
+            f'{self._header["to_call"]}'
+        )
+
+
+def packet_class(packet) -> type:
+    """The class of packet, without decoding a LazyPacket if it can."""
+    if type(packet) is LazyPacket:
+        return packet.header_class
+    return type(packet)
+
+
 TYPE_LOOKUP: dict[str, type[Packet]] = {
     PACKET_TYPE_BULLETIN: BulletinPacket,
     PACKET_TYPE_WX: WeatherPacket,
@@ -780,14 +1254,118 @@ def is_mice_packet(packet: dict[Any, Any]) -> bool:
     return get_packet_type(packet) == PACKET_TYPE_MICE
 
 
-def factory(raw_packet: dict[Any, Any]) -> type[Packet]:
-    """Factory method to create a packet from a raw packet string."""
+# These are converted the same way dataclasses_json does.
+_SCALAR_TYPES = (str, int, float, bool)
+
+# packet class -> {field name: decode function or None}
+_DECODERS: dict[type, dict] = {}
+# packet class -> the subclass _new_packet() builds it with
+_BUILDERS: dict[type, type] = {}
+
+
+def _scalar_decoder(field_type):
+    def decode(value):
+        return value if isinstance(value, field_type) else field_type(value)
+
+    return decode
+
+
+def _field_decoder(field_type):
+    """Build the function that converts a value for a field of field_type.
+
+    None means the value is used as is.
+    """
+    if field_type in _SCALAR_TYPES:
+        return _scalar_decoder(field_type)
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+    if origin is Union and len(args) == 2 and type(None) in args:
+        # Optional, None values are never converted.
+        return _field_decoder(args[0] if args[1] is type(None) else args[1])
+    if field_type is dict or origin is dict:
+        return dict
+    if origin is list:
+        item_decoder = _field_decoder(args[0]) if args else None
+        if item_decoder is None:
+            return list
+
+        def decode_list(value):
+            return [item_decoder(item) for item in value]
+
+        return decode_list
+    return None
+
+
+def _build_decoders(cls) -> dict:
+    types = get_type_hints(cls)
+    decoders = {f.name: _field_decoder(types[f.name]) for f in fields(cls) if f.init}
+    _DECODERS[cls] = decoders
+    return decoders
+
+
+def _decode_kwargs(cls, raw: dict) -> dict:
+    """Convert raw to the __init__ kwargs for cls, ignoring unknown keys."""
+    decoders = _DECODERS.get(cls) or _build_decoders(cls)
+    kwargs = {}
+    for key, value in raw.items():
+        if key in decoders:
+            decode = decoders[key]
+            if decode is None or value is None:
+                kwargs[key] = value
+            else:
+                kwargs[key] = decode(value)
+    return kwargs
+
+
+def _build_builder(cls) -> type:
+    # The same slots as cls, without the Packet.__setattr__ hook.
+    builder = type(
+        f'_{cls.__name__}Builder',
+        (cls,),
+        {'__slots__': (), '__setattr__': object.__setattr__},
+    )
+    _BUILDERS[cls] = builder
+    return builder
+
+
+def _new_packet(cls, kwargs: dict):
+    """Create the packet the same as cls(**kwargs).
+
+    Packet.__setattr__ makes every field assignment in the dataclass
+    __init__ a python call, which is most of the cost of creating a
+    packet.  So the packet is created as a subclass without the hook,
+    then turned into a cls.
+    """
+    builder = _BUILDERS.get(cls) or _build_builder(cls)
+    packet = builder(**kwargs)
+    packet.__class__ = cls
+    return packet
+
+
+def factory(raw_packet: Union[dict[Any, Any], str, bytes]) -> type[Packet]:
+    """Factory method to create a packet from a raw packet string.
+
+    raw_packet is either the aprslib.parse() dict of the packet, or
+    the raw TNC2 line.  A raw line is parsed here, or with
+    enable_lazy_packet_decode, only its header is and a LazyPacket
+    is returned.
+    """
+    if isinstance(raw_packet, (str, bytes)):
+        if CONF.enable_lazy_packet_decode:
+            header = parse_header(raw_packet)
+            # The header of a third party packet is the gateway's, the
+            # filters want the header of the packet inside it.
+            if header['data_type'] != DATA_TYPE_THIRDPARTY:
+                return LazyPacket(header)
+        raw_packet = aprslib.parse(raw_packet)
+
     raw = raw_packet
     if '_type' in raw:
         cls = globals()[raw['_type']]
-        return cls.from_dict(raw)
+        return cls.from_dict(_intern_fields(raw))
 
-    raw['raw_dict'] = raw.copy()
+    if CONF.enable_packet_raw_dict:
+        raw['raw_dict'] = raw.copy()
     raw = _translate_fields(raw)
 
     packet_type = get_packet_type(raw)
@@ -817,4 +1395,4 @@ def factory(raw_packet: dict[Any, Any]) -> type[Packet]:
     #     f"<light-blue>{raw.get('from_call'): <9}</light-blue> -> <cyan>{to: <9}</cyan>")
     # LOG.info(raw.get('msgNo'))
 
-    return packet_class().from_dict(raw)  # type: ignore
+    return packet_class._from_raw(raw)  # type: ignore
@@ -54,9 +54,11 @@ class PacketFilter:
         for packet_filter in self.filters:
             try:
                 if not self.filters[packet_filter].filter(packet):
-                    LOG.debug(
-                        f'{self.filters[packet_filter].__class__.__name__} dropped {packet.__class__.__name__}:{packet.human_info}'
-                    )
+                    # human_info would decode a LazyPacket.
+                    if LOG.isEnabledFor(logging.DEBUG):
+                        LOG.debug(
+                            f'{self.filters[packet_filter].__class__.__name__} dropped {core.packet_class(packet).__name__}:{packet.human_info}'
+                        )
                     return None
             except Exception as ex:
                 LOG.error(
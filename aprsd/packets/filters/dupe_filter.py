@@ -26,6 +26,14 @@ class DupePacketFilter:
     def filter(self, packet: type[core.Packet]) -> Union[type[core.Packet], None]:
         # LOG.debug(f"{self.__class__.__name__}.filter called for packet {packet}")
         """Filter a packet out if it's already been seen and processed."""
+        if not packet.msgNo:
+            # If the packet doesn't have a message id
+            # then there is no reliable way to detect
+            # if it's a dupe, so we just pass it on.
+            # it shouldn't get acked either.
+            # This is checked first, so a LazyPacket that isn't a
+            # message doesn't have to be decoded.
+            return packet
         if isinstance(packet, core.AckPacket):
             # We don't need to drop AckPackets, those should be
             # processed.
@@ -40,12 +48,6 @@ class DupePacketFilter:
                 # Find the packet in the list of already seen packets
                 # Based on the packet.key
                 found = self.pl.find(packet)
-                if not packet.msgNo:
-                    # If the packet doesn't have a message id
-                    # then there is no reliable way to detect
-                    # if it's a dupe, so we just pass it on.
-                    # it shouldn't get acked either.
-                    found = False
             except KeyError:
                 found = False
 
@@ -49,5 +49,5 @@ class PacketTypeFilter:
     def filter(self, packet: type[core.Packet]) -> Union[type[core.Packet], None]:
         """Only allow packets of certain types to filter through."""
         if self.allow_list:
-            if isinstance(packet, self.allow_list):
+            if issubclass(core.packet_class(packet), self.allow_list):
                 return packet
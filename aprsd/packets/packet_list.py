@@ -18,6 +18,7 @@ class PacketList(objectstore.ObjectStoreMixin):
     _instance = None
     _total_rx: int = 0
     _total_tx: int = 0
+    _snapshot = None
     maxlen: int = 100
 
     def __new__(cls, *args, **kwargs):
@@ -45,40 +46,44 @@ class PacketList(objectstore.ObjectStoreMixin):
 
     def rx(self, packet: type[core.Packet]):
         """Add a packet that was received."""
-        with self.lock:
-            self._total_rx += 1
-            self._add(packet)
-            ptype = packet.__class__.__name__
-            type_stats = self.data['types'].setdefault(
-                ptype,
-                {'tx': 0, 'rx': 0},
-            )
-            type_stats['rx'] += 1
+        self._count(packet, 'rx')
 
     def tx(self, packet: type[core.Packet]):
         """Add a packet that was received."""
+        self._count(packet, 'tx')
+
+    def _count(self, packet, direction):
+        ptype = core.packet_class(packet).__name__
+        key = packet.key
         with self.lock:
-            self._total_tx += 1
-            self._add(packet)
-            ptype = packet.__class__.__name__
+            if direction == 'rx':
+                self._total_rx += 1
+            else:
+                self._total_tx += 1
+            self._add(packet, key)
             type_stats = self.data['types'].setdefault(
                 ptype,
                 {'tx': 0, 'rx': 0},
             )
-            type_stats['tx'] += 1
+            type_stats[direction] += 1
 
     def add(self, packet):
+        key = packet.key
         with self.lock:
-            self._add(packet)
+            self._add(packet, key)
 
-    def _add(self, packet):
+    def _add(self, packet, key=None):
+        if key is None:
+            key = packet.key
         if not self.data.get('packets'):
             self._init_data()
-        if packet.key in self.data['packets']:
-            self.data['packets'].move_to_end(packet.key)
-        elif len(self.data['packets']) == self.maxlen:
-            self.data['packets'].popitem(last=False)
-        self.data['packets'][packet.key] = packet
+        packets = self.data['packets']
+        if key in packets:
+            packets.move_to_end(key)
+        elif len(packets) == self.maxlen:
+            packets.popitem(last=False)
+        packets[key] = packet
+        self._snapshot = None
 
     def find(self, packet):
         with self.lock:
@@ -96,26 +101,52 @@ class PacketList(objectstore.ObjectStoreMixin):
         with self.lock:
             return self._total_tx
 
+    def _take_snapshot(self):
+        """Copy what stats() needs, the caller must hold the lock.
+
+        Only the packet keys and values are copied here, which is a
+        quick copy of pointers, so the rx and tx threads are never
+        kept waiting on a stats collection.  Slicing and building the
+        stats dict is done after the lock is released.
+        """
+        packets = self.data.get('packets', {})
+        snapshot = (
+            packets,
+            tuple(packets),
+            tuple(packets.values()),
+            {
+                ptype: dict(counts)
+                for ptype, counts in self.data.get('types', {}).items()
+            },
+            self._total_rx,
+            self._total_tx,
+        )
+        self._snapshot = snapshot
+        return snapshot
+
     def stats(self, serializable=False) -> dict:
-        with self.lock:
-            # Get last N packets directly using list slicing
-            if CONF.packet_list_stats_maxlen >= 0:
-                packets_list = list(self.data.get('packets', {}).values())
-                pkts = packets_list[-CONF.packet_list_stats_maxlen :][::-1]
-            else:
-                # We have to copy here, because this get() results in a pointer
-                # to the packets internally here, which can change after this
-                # function returns, which would cause a problem trying to save
-                # the stats to disk.
-                pkts = self.data.get('packets', {}).copy()
-            stats = {
-                'total_tracked': self._total_rx
-                + self._total_tx,  # Fixed typo: was rx + rx
-                'rx': self._total_rx,
-                'tx': self._total_tx,
-                'types': self.data.get('types', {}),  # Changed default from [] to {}
-                'packet_count': len(self.data.get('packets', [])),
-                'maxlen': self.maxlen,
-                'packets': pkts,
-            }
-            return stats
+        # The snapshot is dropped by every packet added, so consecutive
+        # collections from the stats threads share a single copy.
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] is not self.data.get('packets'):
+            with self.lock:
+                snapshot = self._take_snapshot()
+        _, keys, values, types, total_rx, total_tx = snapshot
+
+        if CONF.packet_list_stats_maxlen >= 0:
+            # Get last N packets, newest first.
+            pkts = list(values[-CONF.packet_list_stats_maxlen :][::-1])
+        else:
+            # A copy, so the stats can be saved to disk while we
+            # keep adding packets.
+            pkts = OrderedDict(zip(keys, values, strict=True))
+        stats = {
+            'total_tracked': total_rx + total_tx,
+            'rx': total_rx,
+            'tx': total_tx,
+            'types': types,
+            'packet_count': len(values),
+            'maxlen': self.maxlen,
+            'packets': pkts,
+        }
+        return stats
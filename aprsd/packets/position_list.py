@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from oslo_config import cfg
+
+from aprsd.packets import core
+from aprsd.utils import spatial
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+
+class Position(NamedTuple):
+    latitude: float
+    longitude: float
+    timestamp: float
+    symbol: str
+
+
+class PositionList:
+    """The last known position of the stations we have heard.
+
+    Every position packet (GPS, beacon, Mic-E, weather) we receive
+    updates the position for the sending callsign.  Positions older
+    than position_list_max_age are ignored, and only the
+    position_list_max_size most recently heard stations are kept.
+
+    Plugins can use this to find a station's position, before asking
+    aprs.fi for it.  The positions are also in a GridIndex, so
+    plugins can find the stations near a point with within() and
+    nearest().
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            # callsign -> Position, the oldest first.
+            cls._instance.data = OrderedDict()
+            cls._instance.index = spatial.GridIndex()
+            cls._instance.hits = 0
+            cls._instance.misses = 0
+        return cls._instance
+
+    def __len__(self):
+        with self.lock:
+            return len(self.data)
+
+    def rx(self, packet: type[core.Packet]) -> None:
+        """Save the position of the station that sent the packet."""
+        # The header rules most packets out without decoding them, and
+        # isinstance() catches a LazyPacket whose body didn't decode.
+        cls = core.packet_class(packet)
+        if not issubclass(cls, core.GPSPacket) or issubclass(cls, core.ObjectPacket):
+            # An object's position isn't the position of the sender.
+            return
+        if not isinstance(packet, core.GPSPacket):
+            return
+        if not packet.from_call or not (packet.latitude or packet.longitude):
+            return
+        position = Position(
+            packet.latitude,
+            packet.longitude,
+            packet.timestamp or time.time(),
+            f'{packet.symbol_table}{packet.symbol}',
+        )
+        callsign = packet.from_call.upper()
+        with self.lock:
+            self.data[callsign] = position
+            self.data.move_to_end(callsign)
+            self.index.insert(callsign, position.latitude, position.longitude)
+            while len(self.data) > CONF.position_list_max_size:
+                oldest, _ = self.data.popitem(last=False)
+                self.index.remove(oldest)
+
+    def tx(self, packet: type[core.Packet]) -> None:
+        """We don't care about TX packets."""
+
+    def flush(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.index.clear()
+
+    def load(self) -> None:
+        """Positions are only kept in memory."""
+
+    def get(self, callsign: str) -> Optional[Position]:
+        """The last known position of callsign, or None."""
+        callsign = callsign.upper()
+        with self.lock:
+            position = self.data.get(callsign)
+            if position and (
+                time.time() - position.timestamp > CONF.position_list_max_age
+            ):
+                del self.data[callsign]
+                self.index.remove(callsign)
+                position = None
+            if position:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return position
+
+    def _filter(self, predicate):
+        """Build the GridIndex predicate that skips expired positions."""
+        oldest = time.time() - CONF.position_list_max_age
+
+        def check(callsign):
+            position = self.data[callsign]
+            if position.timestamp < oldest:
+                return False
+            return predicate is None or predicate(callsign, position)
+
+        return check
+
+    def within(self, latitude, longitude, radius_km, predicate=None) -> list:
+        """The stations within radius_km of a point, nearest first.
+
+        predicate(callsign, position) can filter out stations, for
+        example by position.symbol.
+        Returns a list of (callsign, Position, distance_km).
+        """
+        with self.lock:
+            found = self.index.within(
+                latitude,
+                longitude,
+                radius_km,
+                predicate=self._filter(predicate),
+            )
+            return [(callsign, self.data[callsign], km) for callsign, km in found]
+
+    def nearest(self, latitude, longitude, k=1, predicate=None) -> list:
+        """The k stations nearest to a point, nearest first.
+
+        Returns a list of (callsign, Position, distance_km).
+        """
+        with self.lock:
+            found = self.index.nearest(
+                latitude,
+                longitude,
+                k=k,
+                predicate=self._filter(predicate),
+            )
+            return [(callsign, self.data[callsign], km) for callsign, km in found]
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            return {
+                'size': len(self.data),
+                'max_size': CONF.position_list_max_size,
+                'max_age': CONF.position_list_max_age,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -15,6 +15,8 @@ class SeenList(objectstore.ObjectStoreMixin):
     """Global callsign seen list."""
 
     _instance = None
+    _track_changes = True
+    _lazy_load = True
     data: dict = {}
 
     def __new__(cls, *args, **kwargs):
@@ -51,13 +53,19 @@ class SeenList(objectstore.ObjectStoreMixin):
             else:
                 LOG.warning(f"Can't find FROM in packet {packet}")
                 return
-            if callsign not in self.data:
-                self.data[callsign] = {
+            entry = self.data.pop(callsign, None)
+            if entry is None:
+                entry = self._load_key(callsign) or {
                     'last': None,
                     'count': 0,
                 }
-            self.data[callsign]['last'] = datetime.datetime.now()
-            self.data[callsign]['count'] += 1
+            # Kept in the order they were last seen, so the callsigns
+            # not heard for the longest are dropped from memory first,
+            # with the sqlite save backend.
+            self.data[callsign] = entry
+            entry['last'] = datetime.datetime.now()
+            entry['count'] += 1
+            self._changed(callsign)
 
     def tx(self, packet: type[core.Packet]):
         """We don't care about TX packets."""
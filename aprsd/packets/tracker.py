@@ -22,10 +22,19 @@ class PacketTrack(objectstore.ObjectStoreMixin):
     automatically adds itself to this class.  When the ack is
     recieved from the radio, the message object is removed from
     this class.
+
+    msgNos are only unique per peer, so packets are tracked by
+    a (peer callsign, msgNo) key.  See tracking_key().  A secondary
+    index of msgNo -> keys allows looking up a packet by the bare
+    msgNo, as long as only one peer is using that msgNo.
     """
 
     _instance = None
     _start_time = None
+    _track_changes = True
+    # Every packet is saved each time, see save(), so a journal
+    # would only be the whole store over and over.
+    _journal = False
 
     data: dict = {}
     total_tracked: int = 0
@@ -35,12 +44,35 @@ class PacketTrack(objectstore.ObjectStoreMixin):
             cls._instance = super().__new__(cls)
             cls._instance.lock = threading.RLock()
             cls._instance._start_time = datetime.datetime.now()
+            cls._instance._msgno_index = {}
             cls._instance._init_store()
         return cls._instance
 
+    @staticmethod
+    def tracking_key(packet: type[core.Packet]) -> str:
+        """Build the (peer, msgNo) key a sent packet is tracked under.
+
+        The peer is the station the packet was sent to.  AckPackets
+        carry the peer's msgNo, not ours, so they get their own
+        namespace to not collide with our messages to the same peer.
+        """
+        peer = (packet.to_call or '').upper()
+        if isinstance(packet, core.AckPacket):
+            return f'{peer}:ack{packet.msgNo}'
+        return f'{peer}:{packet.msgNo}'
+
+    def _resolve(self, key):
+        """Find the tracking key for key, which may be a bare msgNo."""
+        if key in self.data:
+            return key
+        keys = self._msgno_index.get(key)
+        if keys and len(keys) == 1:
+            return next(iter(keys))
+        return key
+
     def __getitem__(self, name):
         with self.lock:
-            return self.data[name]
+            return self.data[self._resolve(name)]
 
     def __iter__(self):
         with self.lock:
@@ -77,15 +109,26 @@ class PacketTrack(objectstore.ObjectStoreMixin):
             stats['packets'] = pkts
         return stats
 
+    def get(self, key):
+        with self.lock:
+            return self.data.get(self._resolve(key))
+
     def rx(self, packet: type[core.Packet]) -> None:
-        """When we get a packet from the network, check if we should remove it."""
-        if isinstance(packet, core.AckPacket):
-            self._remove(packet.msgNo)
-        elif isinstance(packet, core.RejectPacket):
-            self._remove(packet.msgNo)
-        elif hasattr(packet, 'ackMsgNo'):
+        """When we get a packet from the network, check if we should remove it.
+
+        Acks are matched on the station that sent the ack and the
+        msgNo, so an ack from one station can't remove a message
+        that was sent to another.
+        """
+        peer = (packet.from_call or '').upper()
+        cls = core.packet_class(packet)
+        if issubclass(cls, core.AckPacket):
+            self._remove(f'{peer}:{packet.msgNo}')
+        elif issubclass(cls, core.RejectPacket):
+            self._remove(f'{peer}:{packet.msgNo}')
+        elif getattr(packet, 'ackMsgNo', None):
             # Got a piggyback ack, so remove the original message
-            self._remove(packet.ackMsgNo)
+            self._remove(f'{peer}:{packet.ackMsgNo}')
 
     def tx(self, packet: type[core.Packet]) -> None:
         """Add a packet that was sent.
@@ -101,7 +144,7 @@ class PacketTrack(objectstore.ObjectStoreMixin):
         if isinstance(packet, core.BeaconPacket):
             return
         with self.lock:
-            key = packet.msgNo
+            key = self.tracking_key(packet)
             if key in self.data and isinstance(packet, core.AckPacket):
                 # Already tracking this ack — don't reset send_count.
                 # This happens when the same message arrives via multiple
@@ -109,10 +152,13 @@ class PacketTrack(objectstore.ObjectStoreMixin):
                 return
             packet.send_count = 0
             self.data[key] = packet
+            self._changed(key)
+            self._msgno_index.setdefault(packet.msgNo, set()).add(key)
             self.total_tracked += 1
 
     def remove(self, key):
-        self._remove(key)
+        with self.lock:
+            self._remove(self._resolve(key))
 
     def load(self):
         """Load tracked packets from disk, filtering out stale BeaconPackets.
@@ -123,6 +169,7 @@ class PacketTrack(objectstore.ObjectStoreMixin):
         """
         super().load()
         with self.lock:
+            self._rebuild_index()
             stale = [
                 key
                 for key, pkt in self.data.items()
@@ -130,16 +177,56 @@ class PacketTrack(objectstore.ObjectStoreMixin):
                 or (isinstance(pkt, dict) and pkt.get('_type') == 'BeaconPacket')
             ]
             for key in stale:
-                del self.data[key]
+                self._remove(key)
             if stale:
                 LOG.info(
                     f'PacketTrack: removed {len(stale)} stale BeaconPacket(s) '
                     f'from persisted data.',
                 )
 
+    def save(self):
+        # The tx threads update the packets in place as they are sent,
+        # so they are all saved.  There are only ever a few.
+        with self.lock:
+            for key in self.data:
+                self._changed(key)
+        super().save()
+
+    def flush(self):
+        super().flush()
+        with self.lock:
+            self._msgno_index = {}
+
+    @staticmethod
+    def _msg_no(key, pkt):
+        if isinstance(pkt, dict):
+            return pkt.get('msgNo', key)
+        return pkt.msgNo
+
+    def _rebuild_index(self):
+        """Re-key the loaded data and rebuild the msgNo index.
+
+        Older versions saved packets keyed by the bare msgNo.
+        """
+        data = {}
+        for key, pkt in self.data.items():
+            if not isinstance(pkt, dict):
+                key = self.tracking_key(pkt)
+            data[key] = pkt
+        self.data = data
+        self._msgno_index = {}
+        for key, pkt in self.data.items():
+            self._msgno_index.setdefault(self._msg_no(key, pkt), set()).add(key)
+
     def _remove(self, key):
         with self.lock:
-            try:
-                del self.data[key]
-            except KeyError:
-                pass
+            pkt = self.data.pop(key, None)
+            if pkt is None:
+                return
+            self._changed(key)
+            msg_no = self._msg_no(key, pkt)
+            keys = self._msgno_index.get(msg_no)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._msgno_index[msg_no]
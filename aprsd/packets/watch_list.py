@@ -1,10 +1,12 @@
 import datetime
+import heapq
 import logging
 import threading
+import time
+from collections import OrderedDict
 
 from oslo_config import cfg
 
-from aprsd import utils
 from aprsd.packets import core
 from aprsd.utils import objectstore, trace
 
@@ -12,10 +14,76 @@ CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
 
 
+class CallsignMatcher:
+    """Match callsigns against the watch list callsigns.
+
+    Plain callsigns are kept in a set.  Callsigns with a * wildcard,
+    like KM6*, are kept in a prefix trie of the part before the *.
+    A lookup is O(len(callsign)), no matter how many callsigns are
+    in the watch list.  Matching is case insensitive.
+    """
+
+    def __init__(self, callsigns=None):
+        self.exact = set()
+        # char -> child node, a None key marks the end of a prefix.
+        self.trie = {}
+        for callsign in callsigns or []:
+            self.add(callsign)
+
+    def add(self, callsign: str) -> None:
+        callsign = callsign.strip().upper()
+        if '*' not in callsign:
+            self.exact.add(callsign)
+            return
+        node = self.trie
+        for char in callsign.split('*', 1)[0]:
+            node = node.setdefault(char, {})
+        node[None] = True
+
+    def match(self, callsign: str) -> bool:
+        if not callsign:
+            return False
+        callsign = callsign.upper()
+        if callsign in self.exact:
+            return True
+        node = self.trie
+        if None in node:
+            # A bare * matches everything.
+            return True
+        for char in callsign:
+            node = node.get(char)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+
+# The WatchList events, see WatchList.subscribe()
+EVENT_STALE = 'stale'
+EVENT_ONLINE = 'online'
+
+
 class WatchList(objectstore.ObjectStoreMixin):
-    """Global watch list and info for callsigns."""
+    """Global watch list and info for callsigns.
+
+    When a callsign was last seen is kept as a time.monotonic()
+    float, so checking if a callsign is old is one subtraction.
+    The time each callsign goes stale is kept on a min-heap, which
+    expire() pops to find the callsigns that have gone stale without
+    having to look at every callsign.
+
+    Anything can subscribe() to be told when a callsign goes stale
+    (EVENT_STALE, from expire()) or is seen again after it was
+    stale (EVENT_ONLINE, from rx()).
+
+    Callsigns matched by a wildcard get their own entry, up to
+    max_wildcard_callsigns of them.  After that the one not seen
+    for the longest is dropped.
+    """
 
     _instance = None
+    _track_changes = True
     data = {}
     initialized = False
 
@@ -23,6 +91,19 @@ class WatchList(objectstore.ObjectStoreMixin):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.lock = threading.RLock()
+            cls._instance.matcher = CallsignMatcher()
+            # callsign -> time.monotonic() it was last seen
+            cls._instance.seen = {}
+            # (monotonic deadline, callsign), may have outdated entries.
+            cls._instance.deadlines = []
+            # callsign -> the deadline it has in deadlines.
+            cls._instance.pending = {}
+            cls._instance.stale = set()
+            # The callsigns from the config, without their wildcards.
+            cls._instance.configured = set()
+            # The callsigns matched by a wildcard, least recently seen first.
+            cls._instance.wildcard = OrderedDict()
+            cls._instance.listeners = []
         return cls._instance
 
     @trace.no_trace
@@ -35,6 +116,12 @@ class WatchList(objectstore.ObjectStoreMixin):
     def _update_from_conf(self, config=None):
         with self.lock:
             if CONF.watch_list.enabled and CONF.watch_list.callsigns:
+                # Swapped in as a whole, so lookups don't need the lock.
+                self.matcher = CallsignMatcher(CONF.watch_list.callsigns)
+                self.configured = {
+                    callsign.replace('*', '').strip().upper()
+                    for callsign in CONF.watch_list.callsigns
+                }
                 for callsign in CONF.watch_list.callsigns:
                     call = callsign.replace('*', '')
                     # FIXME(waboring) - we should fetch the last time we saw
@@ -47,6 +134,97 @@ class WatchList(objectstore.ObjectStoreMixin):
                             'packet': None,
                             'was_old_before_update': False,
                         }
+                        self._changed(call)
+
+    def load(self):
+        """Load the saved data, and work out the monotonic times from it."""
+        super().load()
+        with self.lock:
+            self.seen.clear()
+            self.deadlines.clear()
+            self.pending.clear()
+            self.stale.clear()
+            self.wildcard.clear()
+            for callsign in self.data:
+                last = self._last_mono(callsign)
+                if last is not None:
+                    self._seen_at(callsign, last)
+            wildcard = [
+                callsign for callsign in self.data if not self._configured(callsign)
+            ]
+            wildcard.sort(key=lambda callsign: self.seen.get(callsign, 0))
+            for callsign in wildcard:
+                self._seen_wildcard(callsign)
+
+    def _configured(self, callsign):
+        """Is callsign in the callsigns option, not only matched by a wildcard."""
+        return callsign.upper() in self.configured
+
+    def _seen_wildcard(self, callsign):
+        """Move callsign to the end of the wildcard LRU, and trim it.
+
+        The caller must hold self.lock.
+        """
+        self.wildcard[callsign] = None
+        self.wildcard.move_to_end(callsign)
+        while len(self.wildcard) > CONF.watch_list.max_wildcard_callsigns:
+            oldest, _ = self.wildcard.popitem(last=False)
+            # Its deadline is dropped from the heap when it comes up.
+            self.data.pop(oldest, None)
+            self.seen.pop(oldest, None)
+            self.pending.pop(oldest, None)
+            self.stale.discard(oldest)
+            self._changed(oldest)
+
+    def _last_mono(self, callsign):
+        """The time.monotonic() callsign was last seen, or None."""
+        last = self.seen.get(callsign)
+        if last is None:
+            # Only the datetime is known, if the entry was set directly.
+            last_dt = self.data.get(callsign, {}).get('last')
+            if isinstance(last_dt, datetime.datetime):
+                age = (datetime.datetime.now() - last_dt).total_seconds()
+                last = time.monotonic() - age
+        return last
+
+    def _seen_at(self, callsign, mono):
+        self.seen[callsign] = mono
+        self._schedule(callsign, mono + CONF.watch_list.alert_time_seconds)
+
+    def _schedule(self, callsign, deadline):
+        """Push a deadline, unless callsign has one that comes first.
+
+        Being seen again only moves the deadline later, so a busy
+        callsign keeps one entry in the heap.  expire() pushes it
+        again for the later time when it comes up.
+        """
+        pending = self.pending.get(callsign)
+        if pending is not None and pending <= deadline:
+            return
+        self.pending[callsign] = deadline
+        heapq.heappush(self.deadlines, (deadline, callsign))
+
+    def subscribe(self, callback) -> None:
+        """Call callback(event, callsign, packet) for the watch list events.
+
+        The callback is called from the thread that found the event,
+        so it should be quick.
+        """
+        with self.lock:
+            if callback not in self.listeners:
+                self.listeners.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def _notify(self, event, callsign, packet):
+        for callback in list(self.listeners):
+            try:
+                callback(event, callsign, packet)
+            except Exception as ex:
+                LOG.error(f'WatchList {event} listener {callback} failed: {ex}')
 
     @trace.no_trace
     def stats(self, serializable=False) -> dict:
@@ -66,48 +244,94 @@ class WatchList(objectstore.ObjectStoreMixin):
         return CONF.watch_list.enabled
 
     def callsign_in_watchlist(self, callsign):
-        with self.lock:
-            return callsign in self.data
+        return self.matcher.match(callsign)
 
     def rx(self, packet: type[core.Packet]) -> None:
         """Track when we got a packet from the network."""
         callsign = packet.from_call
 
-        if self.callsign_in_watchlist(callsign):
-            with self.lock:
-                # Check if callsign was old BEFORE updating the timestamp
-                # This allows plugins to check if it was old before this update
-                # We check directly here to avoid nested locking
-                was_old = False
-                last_seen_time = self.data[callsign].get('last')
-                if last_seen_time:
-                    age_delta = datetime.datetime.now() - last_seen_time
-                    max_delta = self.max_delta()
-                    if age_delta > max_delta:
-                        was_old = True
-
-                # Now update the timestamp and packet
-                if last_seen_time:
-                    self.data[callsign]['age'] = str(
-                        datetime.datetime.now() - last_seen_time
-                    )
-                self.data[callsign]['last'] = datetime.datetime.now()
-                self.data[callsign]['packet'] = packet
-                self.data[callsign]['was_old_before_update'] = was_old
+        if not self.callsign_in_watchlist(callsign):
+            return
+
+        with self.lock:
+            # Callsigns matched by a wildcard get their own entry.
+            entry = self.data.setdefault(
+                callsign,
+                {
+                    'last': None,
+                    'packet': None,
+                    'was_old_before_update': False,
+                },
+            )
+            # Check if callsign was old BEFORE updating the timestamp
+            # This allows plugins to check if it was old before this update
+            mono_now = time.monotonic()
+            last = self._last_mono(callsign)
+            was_old = (
+                last is not None
+                and mono_now - last > CONF.watch_list.alert_time_seconds
+            )
+            came_back = was_old or callsign in self.stale
+            self.stale.discard(callsign)
+
+            # Now update the timestamp and packet
+            now = datetime.datetime.now()
+            if entry['last']:
+                entry['age'] = str(now - entry['last'])
+            entry['last'] = now
+            entry['packet'] = packet
+            entry['was_old_before_update'] = was_old
+            self._seen_at(callsign, mono_now)
+            self._changed(callsign)
+            if not self._configured(callsign):
+                self._seen_wildcard(callsign)
+
+        if came_back:
+            self._notify(EVENT_ONLINE, callsign, packet)
 
     def tx(self, packet: type[core.Packet]) -> None:
         """We don't care about TX packets."""
 
+    def expire(self) -> list:
+        """Find the callsigns that have gone stale since the last call.
+
+        Sends an EVENT_STALE for each one, and returns them.
+        """
+        events = []
+        with self.lock:
+            alert_time = CONF.watch_list.alert_time_seconds
+            mono_now = time.monotonic()
+            while self.deadlines and self.deadlines[0][0] <= mono_now:
+                deadline, callsign = heapq.heappop(self.deadlines)
+                if self.pending.get(callsign) != deadline:
+                    # Replaced by an earlier deadline.
+                    continue
+                del self.pending[callsign]
+                last = self.seen.get(callsign)
+                if last is None or callsign in self.stale:
+                    continue
+                if mono_now - last <= alert_time:
+                    # Seen again since this deadline was pushed.
+                    self._schedule(callsign, last + alert_time)
+                    continue
+                self.stale.add(callsign)
+                entry = self.data.get(callsign, {})
+                events.append((callsign, entry.get('packet')))
+
+        for callsign, packet in events:
+            LOG.info(f'WatchList {callsign} has gone stale')
+            self._notify(EVENT_STALE, callsign, packet)
+        return [callsign for callsign, _ in events]
+
     def last_seen(self, callsign):
         with self.lock:
             if self.callsign_in_watchlist(callsign):
-                return self.data[callsign]['last']
+                return self.data.get(callsign, {}).get('last')
 
     def age(self, callsign):
-        now = datetime.datetime.now()
-        last_seen_time = self.last_seen(callsign)
-        if last_seen_time:
-            return str(now - last_seen_time)
+        last = self._last_mono(callsign)
+        if last is not None and self.callsign_in_watchlist(callsign):
+            return str(datetime.timedelta(seconds=time.monotonic() - last))
         else:
             return None
 
@@ -128,7 +352,7 @@ class WatchList(objectstore.ObjectStoreMixin):
         with self.lock:
             if not self.callsign_in_watchlist(callsign):
                 return False
-            return self.data[callsign].get('was_old_before_update', False)
+            return self.data.get(callsign, {}).get('was_old_before_update', False)
 
     def mark_as_new(self, callsign):
         """Mark a callsign as new, resetting the was_old_before_update flag.
@@ -137,8 +361,9 @@ class WatchList(objectstore.ObjectStoreMixin):
         notifications until the callsign becomes old again.
         """
         with self.lock:
-            if self.callsign_in_watchlist(callsign):
+            if callsign in self.data:
                 self.data[callsign]['was_old_before_update'] = False
+                self._changed(callsign)
 
     def is_old(self, callsign, seconds=None):
         """Watch list callsign last seen is old compared to now?
@@ -149,19 +374,9 @@ class WatchList(objectstore.ObjectStoreMixin):
         We put this here so any notification plugin can use this
         same test.
         """
-        if not self.callsign_in_watchlist(callsign):
-            return False
-
-        age = self.age(callsign)
-        if age:
-            delta = utils.parse_delta_str(age)
-            d = datetime.timedelta(**delta)
-
-            max_delta = self.max_delta(seconds=seconds)
-
-            if d > max_delta:
-                return True
-            else:
-                return False
-        else:
+        last = self._last_mono(callsign)
+        if last is None or not self.callsign_in_watchlist(callsign):
             return False
+        if not seconds:
+            seconds = CONF.watch_list.alert_time_seconds
+        return time.monotonic() - last > seconds
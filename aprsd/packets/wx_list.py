@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from oslo_config import cfg
+
+from aprsd.packets import core
+from aprsd.utils import spatial
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+
+class WXList:
+    """The latest WeatherPacket from each WX station we have heard.
+
+    Reports older than wx_list_max_age are ignored, and only the
+    wx_list_max_size most recently heard stations are kept.  The
+    stations are in a GridIndex, so the weather plugins can answer
+    from the nearest recent report without going out to the web.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            # callsign -> WeatherPacket, the oldest first.
+            cls._instance.data = OrderedDict()
+            cls._instance.index = spatial.GridIndex()
+            cls._instance.hits = 0
+            cls._instance.misses = 0
+        return cls._instance
+
+    def __len__(self):
+        with self.lock:
+            return len(self.data)
+
+    def rx(self, packet: type[core.Packet]) -> None:
+        """Save the packet if it's a weather report with a position."""
+        # The header rules most packets out without decoding them, and
+        # isinstance() catches a LazyPacket whose body didn't decode.
+        if not issubclass(core.packet_class(packet), core.WeatherPacket):
+            return
+        if not isinstance(packet, core.WeatherPacket):
+            return
+        if not packet.from_call or not (packet.latitude or packet.longitude):
+            return
+        if not packet.timestamp:
+            packet.timestamp = time.time()
+        callsign = packet.from_call.upper()
+        with self.lock:
+            self.data[callsign] = packet
+            self.data.move_to_end(callsign)
+            self.index.insert(callsign, packet.latitude, packet.longitude)
+            while len(self.data) > CONF.wx_list_max_size:
+                oldest, _ = self.data.popitem(last=False)
+                self.index.remove(oldest)
+
+    def tx(self, packet: type[core.Packet]) -> None:
+        """We don't care about TX packets."""
+
+    def flush(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.index.clear()
+
+    def load(self) -> None:
+        """Weather reports are only kept in memory."""
+
+    def get(self, callsign: str) -> Optional[core.WeatherPacket]:
+        """The latest fresh report from callsign, or None."""
+        with self.lock:
+            packet = self.data.get(callsign.upper())
+            if packet and time.time() - packet.timestamp <= CONF.wx_list_max_age:
+                return packet
+            return None
+
+    def nearest(self, latitude, longitude, max_distance_km=None):
+        """The nearest fresh report to a point.
+
+        Only reports within max_distance_km (wx_list_max_distance by
+        default) are used.  Returns (WeatherPacket, distance_km) or None.
+        """
+        if max_distance_km is None:
+            max_distance_km = CONF.wx_list_max_distance
+        oldest = time.time() - CONF.wx_list_max_age
+        with self.lock:
+            found = None
+            if max_distance_km > 0:
+                found = self.index.within(
+                    latitude,
+                    longitude,
+                    max_distance_km,
+                    predicate=lambda callsign: self.data[callsign].timestamp >= oldest,
+                )
+            if not found:
+                self.misses += 1
+                return None
+            self.hits += 1
+            callsign, distance = found[0]
+            return self.data[callsign], distance
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            return {
+                'size': len(self.data),
+                'max_size': CONF.wx_list_max_size,
+                'max_age': CONF.wx_list_max_age,
+                'max_distance_km': CONF.wx_list_max_distance,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import concurrent.futures
+import copy
+import functools
 import importlib
 import inspect
 import logging
 import re
 import textwrap
 import threading
+import time
+from re import _constants, _parser
 
 import pluggy
 from oslo_config import cfg
@@ -15,6 +21,7 @@ import aprsd
 from aprsd import packets, threads
 from aprsd.client.client import APRSDClient
 from aprsd.packets import watch_list
+from aprsd.utils import ttl_cache
 
 # setup the global logger
 CONF = cfg.CONF
@@ -51,6 +58,10 @@ class APRSDPluginBase(metaclass=abc.ABCMeta):
     config = None
     rx_count = 0
     tx_count = 0
+    timeout_count = 0
+    latency_count = 0
+    latency_total = 0.0
+    latency_max = 0.0
     version = aprsd.__version__
 
     # Holds the list of APRSDThreads that the plugin creates
@@ -92,6 +103,22 @@ class APRSDPluginBase(metaclass=abc.ABCMeta):
     def message_count(self) -> int:
         return self.message_counter
 
+    @property
+    def is_async(self) -> bool:
+        """Is the plugin's process() a coroutine (async def)?"""
+        return inspect.iscoroutinefunction(self.process)
+
+    def _call_process(self, packet: type[packets.Packet]):
+        """Call process(), waiting for it if it's a coroutine.
+
+        This is the blocking path for async plugins, the coroutine
+        runs on the PluginManager's event loop.
+        """
+        result = self.process(packet)
+        if inspect.iscoroutine(result):
+            result = PluginManager().run_coroutine(result)
+        return result
+
     def help(self) -> str:
         return 'Help!'
 
@@ -112,6 +139,17 @@ class APRSDPluginBase(metaclass=abc.ABCMeta):
         with self._counter_lock:
             self.tx_count += 1
 
+    def timeout_inc(self):
+        with self._counter_lock:
+            self.timeout_count += 1
+
+    def latency_inc(self, latency: float):
+        """Record how long (in seconds) a call to the plugin took."""
+        with self._counter_lock:
+            self.latency_count += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
     def stop_threads(self):
         """Stop any threads this plugin might have created."""
         for thread in self.threads:
@@ -163,7 +201,7 @@ class APRSDWatchListPluginBase(APRSDPluginBase, metaclass=abc.ABCMeta):
                 # packet is from a callsign in the watch list
                 self.rx_inc()
                 try:
-                    result = self.process(packet)
+                    result = self._call_process(packet)
                 except Exception as ex:
                     LOG.error(
                         'Plugin {} failed to process packet {}'.format(
@@ -234,22 +272,51 @@ class APRSDRegexCommandPluginBase(APRSDPluginBase, metaclass=abc.ABCMeta):
             and message
         ):
             if re.search(self.command_regex, message, re.IGNORECASE):
-                self.rx_inc()
-                try:
-                    result = self.process(packet)
-                except Exception as ex:
-                    LOG.error(
-                        'Plugin {} failed to process packet {}'.format(
-                            self.__class__,
-                            ex,
-                        ),
-                    )
-                    LOG.exception(ex)
-                if result:
-                    self.tx_inc()
+                result = self.run_command(packet)
 
         return result
 
+    def run_command(self, packet: packets.MessagePacket) -> str | packets.MessagePacket:
+        """Process a packet whose message already matched command_regex."""
+        result = None
+        self.rx_inc()
+        try:
+            result = self._call_process(packet)
+        except Exception as ex:
+            LOG.error(
+                'Plugin {} failed to process packet {}'.format(
+                    self.__class__,
+                    ex,
+                ),
+            )
+            LOG.exception(ex)
+        if result:
+            self.tx_inc()
+        return result
+
+    async def run_command_async(
+        self,
+        packet: packets.MessagePacket,
+    ) -> str | packets.MessagePacket:
+        """Await an async process() for a message that matched command_regex."""
+        result = None
+        self.rx_inc()
+        try:
+            result = await self.process(packet)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            LOG.error(
+                'Plugin {} failed to process packet {}'.format(
+                    self.__class__,
+                    ex,
+                ),
+            )
+            LOG.exception(ex)
+        if result:
+            self.tx_inc()
+        return result
+
 
 class APRSFIKEYMixin:
     """Mixin class to enable checking the existence of the aprs.fi apiKey."""
@@ -322,6 +389,306 @@ class HelpPlugin(APRSDRegexCommandPluginBase):
         return replies
 
 
+def _is_anchored(pattern: str) -> bool:
+    """Is the regex pattern anchored to the start of the string?
+
+    It is anchored if it starts with ^ and has no top level
+    alternation like '^a|b'.
+    """
+    if not pattern.startswith('^'):
+        return False
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+    return True
+
+
+def _first_chars(items) -> frozenset | None:
+    """The lowercase characters a parsed regex can start matching with.
+
+    None if it isn't a short set of ASCII characters, or the regex can
+    match the empty string.
+    """
+    if not items:
+        return None
+    op, value = items[0]
+    if op is _constants.LITERAL:
+        chars = {chr(value)}
+    elif op is _constants.IN:
+        chars = set()
+        for in_op, in_value in value:
+            if in_op is _constants.LITERAL:
+                chars.add(chr(in_value))
+            elif in_op is _constants.RANGE and in_value[1] - in_value[0] < 128:
+                chars.update(map(chr, range(in_value[0], in_value[1] + 1)))
+            else:
+                # NEGATE, CATEGORY
+                return None
+    elif op is _constants.SUBPATTERN:
+        _group, add_flags, del_flags, subpattern = value
+        if add_flags or del_flags:
+            return None
+        return _first_chars(subpattern)
+    elif op is _constants.BRANCH:
+        chars = set()
+        for branch in value[1]:
+            branch_chars = _first_chars(branch)
+            if branch_chars is None:
+                return None
+            chars.update(branch_chars)
+        return frozenset(chars)
+    elif op in (_constants.MAX_REPEAT, _constants.MIN_REPEAT):
+        min_count, _max_count, subpattern = value
+        if not min_count:
+            return None
+        return _first_chars(subpattern)
+    else:
+        return None
+    chars = {char.lower() for char in chars}
+    if not chars or not all(char.isascii() for char in chars):
+        return None
+    return frozenset(chars)
+
+
+def _command_prefix(pattern: str) -> frozenset | None:
+    """The first characters of the messages an anchored pattern matches.
+
+    None if the pattern isn't anchored, or they can't be worked out.
+    """
+    if not _is_anchored(pattern):
+        return None
+    try:
+        items = _parser.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+    items = list(items)
+    if not items or items[0] != (_constants.AT, _constants.AT_BEGINNING):
+        return None
+    return _first_chars(items[1:])
+
+
+class CommandDispatcher:
+    """Dispatch a message to the regex command plugins it matches.
+
+    The command regexes are nearly all anchored commands like
+    '^([p]|[p]\\s|ping)', so the plugins are indexed by the first
+    characters of the messages their command_regex can match.  A
+    message only has the command_regex of the plugins indexed under its
+    first character, and the plugins without a fixed first character
+    (unanchored regexes), run against it.  The other plugins can't
+    match it, and don't have filter() called.
+
+    Plugins that override filter(), plugins that aren't regex command
+    plugins, and command regexes that don't compile still get their
+    filter() called, as do plugins that were disabled when the
+    dispatcher was built.
+    """
+
+    def __init__(self, plugins):
+        # index -> plugin, in plugin order.
+        self.indexed = {}
+        # plugins that always get filter() called.
+        self.unindexed = []
+        # indexes of the disabled plugins, which get filter() called.
+        self.disabled = []
+        # index -> compiled command_regex
+        self.regexes = {}
+        # first character -> indexes of the plugins it can match.
+        self.by_first_char = {}
+        # indexes of the plugins the regex is run for on every message.
+        self.scanned = frozenset()
+
+        scanned = set()
+        for plugin in plugins:
+            regex = self._compile(plugin)
+            if regex is None:
+                self.unindexed.append(plugin)
+                continue
+            index = len(self.indexed)
+            self.indexed[index] = plugin
+            if not plugin.enabled:
+                self.disabled.append(index)
+                continue
+            self.regexes[index] = regex
+            prefix = _command_prefix(regex.pattern)
+            if prefix is None:
+                scanned.add(index)
+                continue
+            for char in prefix:
+                self.by_first_char.setdefault(char, set()).add(index)
+        self.scanned = frozenset(scanned)
+
+    @staticmethod
+    def _compile(plugin):
+        if not isinstance(plugin, APRSDRegexCommandPluginBase):
+            return None
+        # Plugins with their own filter() need it called.
+        if type(plugin).filter is not APRSDRegexCommandPluginBase.filter:
+            return None
+        try:
+            pattern = plugin.command_regex
+        except Exception:
+            return None
+        if not isinstance(pattern, str):
+            return None
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except re.error as ex:
+            LOG.warning(
+                f"Can't add {plugin.__class__.__name__} command_regex "
+                f"'{pattern}' to the dispatch table: {ex}",
+            )
+            return None
+
+    def candidates(self, message: str) -> list:
+        """The indexes of the plugins that might match the message."""
+        first = self.by_first_char.get(message[:1].lower())
+        if not first:
+            return sorted(self.scanned)
+        return sorted(first.union(self.scanned))
+
+    def dispatch(self, packet: type[packets.Packet]):
+        """Find the plugins to run for the packet.
+
+        Returns:
+            list of (plugin, matched) tuples.  If matched is True,
+            the packet already matched the plugin's command_regex,
+            and only plugin.run_command() needs to be called.
+            Otherwise plugin.filter() has to be called.
+        """
+        targets = [(plugin, False) for plugin in self.unindexed]
+        if not self.indexed:
+            return targets
+
+        if not isinstance(packet, packets.MessagePacket):
+            # Let the plugins deal with it.
+            targets.extend((plugin, False) for plugin in self.indexed.values())
+            return targets
+
+        # The same checks APRSDRegexCommandPluginBase.filter() does,
+        # done once for all of the plugins.
+        message = packet.message_text
+        indexes = [(index, False) for index in self.disabled]
+        if packet.to_call == CONF.callsign and message:
+            for index in self.candidates(message):
+                if self.regexes[index].search(message):
+                    indexes.append((index, True))
+        # In plugin order.
+        indexes.sort()
+        targets.extend((self.indexed[index], matched) for index, matched in indexes)
+        return targets
+
+
+class ReplyCache:
+    """Cache of the plugin replies to a message.
+
+    When our ack is lost, the sender retransmits the same message.
+    Once that is outside of the dupe window, it would be run through
+    the plugins again, which means another backend call, and maybe
+    a different reply.  The replies are cached by
+    (from_call, message_text, msgNo) so the retransmitted message
+    gets the same replies without running the plugins.
+
+    Reply packets are sent, and tracked, under their own msgNo, so
+    the cache keeps a copy of them, and every hit gets new copies
+    with a new msgNo.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.cache = ttl_cache.TTLCache(
+                maxsize=CONF.plugin_reply_cache_size,
+                ttl=CONF.plugin_reply_cache_ttl,
+            )
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return CONF.plugin_reply_cache_ttl > 0
+
+    @staticmethod
+    def cache_key(packet: packets.MessagePacket):
+        """Build the key for packet, or None if it can't be cached.
+
+        Packets without a msgNo can't be told apart from a new
+        message with the same text, so they aren't cached.
+        """
+        if not isinstance(packet, packets.MessagePacket) or not packet.msgNo:
+            return None
+        text = ' '.join((packet.message_text or '').split()).lower()
+        return (packet.from_call, text, str(packet.msgNo))
+
+    @staticmethod
+    def _copy_reply(reply, new_msg_number=False):
+        """Copy the packets in a plugin result, leaving the strings."""
+        if isinstance(reply, list):
+            return [
+                ReplyCache._copy_reply(subreply, new_msg_number) for subreply in reply
+            ]
+        if not isinstance(reply, packets.Packet):
+            return reply
+        reply = copy.deepcopy(reply)
+        if new_msg_number:
+            reply.msgNo = None
+            reply.send_count = 0
+            reply.last_send_time = 0
+            reply.acked = False
+            reply.prepare(create_msg_number=True)
+        return reply
+
+    def get(self, packet: packets.MessagePacket):
+        """The cached (results, handled) for packet, or None.
+
+        The reply packets in the results are new copies.
+        """
+        key = self.cache_key(packet)
+        if not self.enabled or key is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        results, handled = cached
+        return (
+            [self._copy_reply(result, new_msg_number=True) for result in results],
+            handled,
+        )
+
+    def set(self, packet: packets.MessagePacket, replies) -> None:
+        """Cache the (results, handled) of running packet through the plugins.
+
+        The reply packets are copied before they are sent.
+        """
+        key = self.cache_key(packet)
+        if not self.enabled or key is None:
+            return
+        results, handled = replies
+        self.cache.set(key, ([self._copy_reply(result) for result in results], handled))
+
+    def stats(self, serializable=False) -> dict:
+        stats = self.cache.stats(serializable=serializable)
+        stats['enabled'] = self.enabled
+        return stats
+
+
 class PluginManager:
     # The singleton instance object for this class
     _instance = None
@@ -331,6 +698,16 @@ class PluginManager:
     # the pluggy PluginManager for all WatchList plugins
     _watchlist_pm = None
 
+    # The CommandDispatcher for the Message plugins.
+    _dispatcher = None
+
+    # The executor the plugins are run on.
+    _executor = None
+
+    # The event loop async plugins are run on, and its thread.
+    _loop = None
+    _loop_thread = None
+
     lock = None
 
     def __new__(cls, *args, **kwargs):
@@ -339,6 +716,7 @@ class PluginManager:
             cls._instance = super().__new__(cls)
             # Put any initialization here.
             cls._instance.lock = threading.Lock()
+            cls._instance._run_lock = threading.Lock()
             cls._instance._init()
         return cls._instance
 
@@ -353,6 +731,9 @@ class PluginManager:
         """Collect and return stats for all plugins."""
 
         def full_name_with_qualname(obj):
+            # Isolated plugins are proxies for plugin_name.
+            if getattr(obj, 'plugin_name', None):
+                return obj.plugin_name
             return '{}.{}'.format(
                 obj.__class__.__module__,
                 obj.__class__.__qualname__,
@@ -362,11 +743,21 @@ class PluginManager:
         plugins = self.get_plugins()
         if plugins:
             for p in plugins:
+                if p.latency_count:
+                    latency_avg = p.latency_total / p.latency_count
+                else:
+                    latency_avg = 0.0
                 plugin_stats[full_name_with_qualname(p)] = {
                     'enabled': p.enabled,
                     'rx': p.rx_count,
                     'tx': p.tx_count,
                     'version': p.version,
+                    'timeouts': p.timeout_count,
+                    'latency_ms': {
+                        'count': p.latency_count,
+                        'avg': round(latency_avg * 1000, 3),
+                        'max': round(p.latency_max * 1000, 3),
+                    },
                 }
 
         return plugin_stats
@@ -430,10 +821,16 @@ class PluginManager:
         """
         plugin_obj = None
         try:
-            plugin_obj = self._create_class(
-                plugin_name,
-                APRSDPluginBase,
-            )
+            if plugin_name in CONF.isolated_plugins:
+                # Imported here, plugin_isolation imports this module.
+                from aprsd import plugin_isolation
+
+                plugin_obj = plugin_isolation.IsolatedPluginPool().load(plugin_name)
+            else:
+                plugin_obj = self._create_class(
+                    plugin_name,
+                    APRSDPluginBase,
+                )
             if plugin_obj:
                 if isinstance(plugin_obj, APRSDWatchListPluginBase):
                     if plugin_obj.enabled:
@@ -482,6 +879,7 @@ class PluginManager:
     def reload_plugins(self):
         with self.lock:
             del self._pluggy_pm
+            self._dispatcher = None
             self.setup_plugins(load_help_plugin=CONF.load_help_plugin)
 
     def setup_plugins(
@@ -511,13 +909,180 @@ class PluginManager:
             for p_name in CORE_MESSAGE_PLUGINS:
                 self._load_plugin(p_name)
 
+        self._build_dispatcher()
         LOG.info('Completed Plugin Loading.')
 
+    def _build_dispatcher(self):
+        """Build the CommandDispatcher for the registered Message plugins."""
+        dispatcher = CommandDispatcher(self.get_message_plugins())
+        LOG.debug(
+            f'Command dispatch table has {len(dispatcher.indexed)} plugins, '
+            f'{len(dispatcher.unindexed)} plugins use filter()',
+        )
+        self._dispatcher = dispatcher
+        return dispatcher
+
+    def _get_executor(self):
+        with self._run_lock:
+            if not self._executor:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(1, CONF.plugin_workers),
+                    thread_name_prefix='PluginWorker',
+                )
+            return self._executor
+
+    def _get_loop(self):
+        """Get the event loop for async plugins, starting it if needed."""
+        with self._run_lock:
+            if not self._loop:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name='PluginAsyncLoop',
+                    daemon=True,
+                )
+                thread.start()
+                self._loop = loop
+                self._loop_thread = thread
+            return self._loop
+
+    def run_coroutine(self, coro, timeout: float = None):
+        """Run a coroutine on the plugin event loop and wait for the result.
+
+        This must not be called from the event loop itself.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        return future.result(timeout=timeout)
+
+    def _stop_loop(self):
+        with self._run_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            if not thread.is_alive():
+                loop.close()
+
+    @staticmethod
+    def _plugin_timeout(plugin) -> float:
+        """The number of seconds to wait for the plugin, 0 is forever."""
+        timeouts = CONF.plugin_timeouts or {}
+        cls = plugin.__class__
+        full_name = getattr(plugin, 'plugin_name', None)
+        if not full_name:
+            full_name = f'{cls.__module__}.{cls.__qualname__}'
+        for name in (full_name.rsplit('.', 1)[-1], full_name):
+            if name in timeouts:
+                try:
+                    return float(timeouts[name])
+                except ValueError:
+                    LOG.error(f"Invalid plugin_timeouts value for '{name}'")
+        return CONF.plugin_timeout
+
+    @staticmethod
+    def _timed_call(plugin, func):
+        start = time.monotonic()
+        try:
+            return func()
+        finally:
+            plugin.latency_inc(time.monotonic() - start)
+
+    @staticmethod
+    async def _timed_coro(plugin, func):
+        start = time.monotonic()
+        try:
+            return await func()
+        finally:
+            plugin.latency_inc(time.monotonic() - start)
+
+    def _run_plugins(self, calls, kind='Plugin'):
+        """Run the plugin calls in parallel and wait for them.
+
+        calls is a list of (plugin, func) where func is called with
+        no arguments.  A regular func is called on the executor, a
+        coroutine function is awaited on the plugin event loop, so the
+        async plugins share one thread while they wait.  Each call gets
+        the plugin's timeout, counted from when it was submitted.  A
+        call that doesn't finish in time is cancelled if it can be
+        (coroutines always can be), otherwise its result is dropped
+        when it does finish.
+
+        Returns:
+            tuple: (finished, timed_out) where:
+                - finished: list of (plugin, result) for the calls that
+                  finished in time, in the same order as calls.
+                - timed_out: bool indicating if any call timed out.
+        """
+        submitted = []
+        for plugin, func in calls:
+            timeout = self._plugin_timeout(plugin)
+            deadline = time.monotonic() + timeout if timeout > 0 else None
+            if inspect.iscoroutinefunction(func):
+                future = asyncio.run_coroutine_threadsafe(
+                    self._timed_coro(plugin, func),
+                    self._get_loop(),
+                )
+            else:
+                future = self._get_executor().submit(self._timed_call, plugin, func)
+            submitted.append((plugin, future, timeout, deadline))
+
+        finished = []
+        timed_out = False
+        for plugin, future, timeout, deadline in submitted:
+            name = plugin.__class__.__name__
+            if deadline is None:
+                wait = None
+            else:
+                wait = max(0, deadline - time.monotonic())
+            try:
+                result = future.result(timeout=wait)
+            except concurrent.futures.TimeoutError as ex:
+                if future.done():
+                    # The plugin itself raised a TimeoutError.
+                    LOG.error(f'{kind} {name} failed to process packet: {ex}')
+                    LOG.exception(ex)
+                    continue
+                timed_out = True
+                plugin.timeout_inc()
+                if future.cancel():
+                    LOG.warning(
+                        f'{kind} {name} timed out after {timeout}s, cancelled it.'
+                    )
+                else:
+                    LOG.warning(
+                        f'{kind} {name} timed out after {timeout}s, '
+                        'its result will be dropped.',
+                    )
+                    future.add_done_callback(
+                        lambda f, name=name: LOG.info(
+                            f'{kind} {name} finished late, dropped its result.',
+                        ),
+                    )
+                continue
+            except Exception as ex:
+                LOG.error(f'{kind} {name} failed to process packet: {ex}')
+                LOG.exception(ex)
+                continue
+            finished.append((plugin, result))
+
+        return finished, timed_out
+
     def run(self, packet: packets.MessagePacket):
-        """Execute all plugins sequentially.
+        """Execute all plugins in parallel.
+
+        The CommandDispatcher finds the regex command plugins the message
+        matches, and only those are run.  Any other plugins get their
+        filter() method called.  The plugins run on the plugin executor,
+        and matched async plugins are awaited on the plugin event loop,
+        each with its own timeout (plugin_timeout/plugin_timeouts), so a
+        slow plugin can't hold up the others.  Results are collected and
+        returned in plugin order; the results of plugins that timed out
+        are dropped.
 
-        Each plugin's filter() method is called in order. Results are
-        collected and returned.
+        If the same message (from_call, text and msgNo) was already run
+        through the plugins recently, the cached results are returned
+        instead.  See ReplyCache.
 
         Returns:
             tuple: (results, handled) where:
@@ -525,55 +1090,66 @@ class PluginManager:
                 - handled: bool indicating if any plugin processed the message
                           (even if it returned NULL_MESSAGE)
         """
-        plugins = list(self._pluggy_pm.get_plugins())
-        if not plugins:
+        if not self._pluggy_pm.get_plugins():
             return ([], False)
 
+        reply_cache = ReplyCache()
+        cached = reply_cache.get(packet)
+        if cached is not None:
+            LOG.info(
+                f'Replaying cached replies for {packet.from_call}:{packet.msgNo}',
+            )
+            return cached
+
+        dispatcher = self._dispatcher or self._build_dispatcher()
+        calls = []
+        for plugin, matched in dispatcher.dispatch(packet):
+            if matched and plugin.is_async:
+                func = functools.partial(plugin.run_command_async, packet)
+            elif matched:
+                func = functools.partial(plugin.run_command, packet)
+            else:
+                func = functools.partial(plugin.filter, packet=packet)
+            calls.append((plugin, func))
+
+        finished, timed_out = self._run_plugins(calls)
         results = []
         handled = False
-
-        for plugin in plugins:
-            try:
-                result = plugin.filter(packet=packet)
-                # Track if any plugin processed the message (even if NULL_MESSAGE)
-                if result is not None:
-                    handled = True
-                # Only include non-NULL results
-                if result and result is not packets.NULL_MESSAGE:
-                    results.append(result)
-            except Exception as ex:
-                LOG.error(
-                    'Plugin {} failed to process packet: {}'.format(
-                        plugin.__class__.__name__,
-                        ex,
-                    ),
-                )
-                LOG.exception(ex)
-
+        for _plugin, result in finished:
+            # Track if any plugin processed the message (even if NULL_MESSAGE)
+            if result is not None:
+                handled = True
+            # Only include non-NULL results
+            if result and result is not packets.NULL_MESSAGE:
+                results.append(result)
+
+        # Don't cache partial replies, so a retransmit gets another try.
+        if not timed_out:
+            reply_cache.set(packet, (results, handled))
         return (results, handled)
 
     def run_watchlist(self, packet: packets.Packet):
-        """Execute all watchlist plugins sequentially."""
+        """Execute all watchlist plugins in parallel.
+
+        The watch list is checked once here, the plugins only
+        get the packets from callsigns in the watch list.
+        """
         plugins = list(self._watchlist_pm.get_plugins())
         if not plugins:
             return []
+        if not watch_list.WatchList().callsign_in_watchlist(packet.from_call):
+            return []
 
+        calls = [
+            (plugin, functools.partial(plugin.filter, packet=packet))
+            for plugin in plugins
+        ]
+        finished, _ = self._run_plugins(calls, kind='Watchlist plugin')
         results = []
-
-        for plugin in plugins:
-            try:
-                result = plugin.filter(packet=packet)
-                # Only include non-NULL results
-                if result and result is not packets.NULL_MESSAGE:
-                    results.append(result)
-            except Exception as ex:
-                LOG.error(
-                    'Watchlist plugin {} failed to process packet: {}'.format(
-                        plugin.__class__.__name__,
-                        ex,
-                    ),
-                )
-                LOG.exception(ex)
+        for _plugin, result in finished:
+            # Only include non-NULL results
+            if result and result is not packets.NULL_MESSAGE:
+                results.append(result)
 
         return results
 
@@ -583,11 +1159,16 @@ class PluginManager:
             for p in self.get_plugins():
                 if hasattr(p, 'stop_threads'):
                     p.stop_threads()
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        self._stop_loop()
 
     def register_msg(self, obj):
         """Register the plugin."""
         with self.lock:
             self._pluggy_pm.register(obj)
+            self._dispatcher = None
 
     def get_plugins(self):
         plugin_list = []
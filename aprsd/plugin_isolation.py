@@ -0,0 +1,449 @@
+"""Run plugins in a pool of worker processes.
+
+Plugins listed in the isolated_plugins config option are loaded in
+long lived worker processes instead of the aprsd process.  The aprsd
+process registers a proxy plugin for each of them, which sends the
+packet (as a dict from to_dict()) to a worker and turns the reply
+back into strings/packets.  A plugin that hogs the CPU, leaks memory
+or crashes only takes down its worker, which is restarted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import threading
+import time
+
+from oslo_config import cfg
+
+import aprsd
+from aprsd import exception, packets, plugin
+from aprsd.packets import core
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+# How long to wait for a new worker to load its plugins.
+WORKER_START_TIMEOUT = 60
+
+
+def _rss_bytes() -> int:
+    """The resident memory of this process in bytes."""
+    try:
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak, in KB on linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _encode_result(result):
+    """Make a plugin result safe to send between processes."""
+    if isinstance(result, core.Packet):
+        return {'_packet': result.to_dict()}
+    if isinstance(result, list):
+        return [_encode_result(r) for r in result]
+    return result
+
+
+def _decode_result(value):
+    if isinstance(value, dict) and '_packet' in value:
+        return core.factory(value['_packet'])
+    if isinstance(value, list):
+        return [_decode_result(v) for v in value]
+    if value == packets.NULL_MESSAGE and not isinstance(value, bool):
+        return packets.NULL_MESSAGE
+    return value
+
+
+def _plugin_info(obj) -> dict:
+    """The details the parent needs to build the proxy for a plugin."""
+    info = {
+        'enabled': obj.enabled,
+        'version': obj.version,
+        'help': None,
+    }
+    try:
+        info['help'] = obj.help()
+    except Exception:
+        pass
+    if isinstance(obj, plugin.APRSDWatchListPluginBase):
+        info['kind'] = 'watchlist'
+    elif (
+        isinstance(obj, plugin.APRSDRegexCommandPluginBase)
+        and type(obj).filter is plugin.APRSDRegexCommandPluginBase.filter
+    ):
+        info['kind'] = 'regex'
+        info['command_regex'] = obj.command_regex
+        info['command_name'] = obj.command_name
+    else:
+        info['kind'] = 'base'
+    return info
+
+
+def _worker_main(conn, plugin_names, config_files):
+    """The main loop of a worker process."""
+    try:
+        CONF(
+            [],
+            project='aprsd',
+            version=aprsd.__version__,
+            default_config_files=config_files,
+        )
+    except cfg.Error as ex:
+        LOG.error(f'Isolated plugin worker failed to load the config: {ex}')
+    # The parent does the watch list filtering and sets the client
+    # filter, the worker must not create a client connection.
+    CONF.set_override('enabled', False, group='watch_list')
+
+    pm = plugin.PluginManager()
+    plugins = {}
+    infos = {}
+    for name in plugin_names:
+        try:
+            obj = pm._create_class(name, plugin.APRSDPluginBase)
+        except Exception as ex:
+            infos[name] = {'error': str(ex)}
+            continue
+        if obj is None:
+            infos[name] = {'error': f'Failed to load {name}'}
+            continue
+        plugins[name] = obj
+        infos[name] = _plugin_info(obj)
+    conn.send(('ready', infos))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if msg[0] == 'stop':
+            break
+        _, method, name, packet_dict = msg
+        start = time.monotonic()
+        try:
+            packet = core.factory(packet_dict)
+            obj = plugins[name]
+            if method == 'filter':
+                result = obj.filter(packet)
+            else:
+                result = obj.process(packet)
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+            reply = ('ok', _encode_result(result))
+        except Exception as ex:
+            reply = ('error', f'{ex.__class__.__name__}: {ex}')
+        conn.send(reply + (time.monotonic() - start, _rss_bytes()))
+
+    for obj in plugins.values():
+        obj.stop_threads()
+
+
+class IsolatedWorker:
+    """One worker process and the pipe to talk to it."""
+
+    def __init__(self, ctx, number, plugin_names, config_files):
+        self.ctx = ctx
+        self.number = number
+        self.plugin_names = plugin_names
+        self.config_files = config_files
+        self.process = None
+        self.conn = None
+        self.calls = 0
+        self.rss = 0
+        self.infos = {}
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.plugin_names, self.config_files),
+            name=f'IsolatedPlugin-{self.number}',
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.calls = 0
+        self.rss = 0
+        try:
+            if not self.conn.poll(WORKER_START_TIMEOUT):
+                raise TimeoutError('timed out')
+            _, self.infos = self.conn.recv()
+        except (TimeoutError, EOFError, OSError) as ex:
+            self.kill()
+            raise exception.IsolatedPluginError(
+                f'Worker {self.number} failed to start: {ex}',
+            ) from ex
+
+    def call(self, method, plugin_name, packet, timeout=None):
+        """Run the plugin in the worker.
+
+        Returns (result, worker_seconds).  Raises TimeoutError if
+        the worker didn't reply in time, EOFError if it died.
+        """
+        self.conn.send(('call', method, plugin_name, packet.to_dict()))
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f'{plugin_name} timed out after {timeout}s')
+        status, value, elapsed, rss = self.conn.recv()
+        self.calls += 1
+        self.rss = rss
+        if status == 'error':
+            raise exception.IsolatedPluginError(value)
+        return _decode_result(value), elapsed
+
+    def stop(self):
+        if not self.process:
+            return
+        try:
+            self.conn.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        self.kill()
+
+    def kill(self):
+        if self.process and self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=2)
+        if self.conn:
+            self.conn.close()
+
+
+class IsolatedPluginPool:
+    """The pool of worker processes for the isolated_plugins.
+
+    Each worker loads all of the isolated plugins.  A call takes an
+    idle worker, so up to isolated_plugin_workers calls run at once.
+    A worker is restarted in the background after it handles
+    isolated_plugin_max_calls packets, when it uses more than
+    isolated_plugin_max_memory_mb, or when it crashes or times out.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance._init_data()
+        return cls._instance
+
+    def _init_data(self):
+        self.workers = []
+        self.idle = queue.Queue()
+        self.plugin_names = []
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycles = 0
+        self.ipc_count = 0
+        self.ipc_total = 0.0
+        self.ipc_last = 0.0
+        self.ipc_max = 0.0
+
+    def _start(self):
+        """Start the workers, if they aren't already running."""
+        with self.lock:
+            if self.workers:
+                return
+            try:
+                config_files = list(CONF.config_file)
+            except cfg.NoSuchOptError:
+                config_files = []
+            # spawn, because forking a process with running threads
+            # can leave locks held in the child.
+            ctx = multiprocessing.get_context('spawn')
+            self.plugin_names = list(CONF.isolated_plugins)
+            for number in range(max(1, CONF.isolated_plugin_workers)):
+                worker = IsolatedWorker(ctx, number, self.plugin_names, config_files)
+                worker.start()
+                self.workers.append(worker)
+                self.idle.put(worker)
+
+    def load(self, plugin_name):
+        """Create the proxy plugin for an isolated plugin."""
+        self._start()
+        info = self.workers[0].infos.get(plugin_name)
+        if info is None:
+            LOG.error(f'Plugin {plugin_name} is not in isolated_plugins')
+            return None
+        if 'error' in info:
+            LOG.error(
+                f"Failed to load isolated plugin '{plugin_name}': {info['error']}"
+            )
+            return None
+        proxy_cls = {
+            'regex': IsolatedRegexCommandPlugin,
+            'watchlist': IsolatedWatchListPlugin,
+            'base': IsolatedPlugin,
+        }[info['kind']]
+        return proxy_cls(plugin_name, info)
+
+    def _restart(self, worker, reason):
+        LOG.info(f'Restarting isolated plugin worker {worker.number} ({reason})')
+        try:
+            worker.stop()
+            worker.start()
+        except Exception as ex:
+            LOG.error(f'Failed to restart isolated plugin worker: {ex}')
+        self.idle.put(worker)
+
+    def _release(self, worker, reason=None):
+        """Put the worker back, restarting it first if needed."""
+        max_calls = CONF.isolated_plugin_max_calls
+        max_memory = CONF.isolated_plugin_max_memory_mb * 1024 * 1024
+        if not reason:
+            if max_calls and worker.calls >= max_calls:
+                reason = f'{worker.calls} calls'
+            elif max_memory and worker.rss > max_memory:
+                reason = f'using {worker.rss // (1024 * 1024)}MB'
+            if reason:
+                self._inc('recycles')
+        if reason:
+            threading.Thread(
+                target=self._restart,
+                args=(worker, reason),
+                name=f'IsolatedPluginRestart-{worker.number}',
+                daemon=True,
+            ).start()
+        else:
+            self.idle.put(worker)
+
+    def call(self, proxy, method, packet):
+        """Run method ('process' or 'filter') of the plugin in a worker."""
+        self._start()
+        timeout = plugin.PluginManager._plugin_timeout(proxy) or None
+        try:
+            worker = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            self._inc('timeouts')
+            raise TimeoutError(
+                f'No isolated plugin worker free after {timeout}s',
+            ) from None
+
+        reason = None
+        start = time.monotonic()
+        try:
+            result, elapsed = worker.call(method, proxy.plugin_name, packet, timeout)
+            self._record_ipc(time.monotonic() - start - elapsed)
+            return result
+        except exception.IsolatedPluginError:
+            self._inc('errors')
+            raise
+        except TimeoutError:
+            self._inc('timeouts')
+            reason = 'timed out'
+            worker.kill()
+            raise
+        except (EOFError, OSError) as ex:
+            self._inc('crashes')
+            reason = 'crashed'
+            raise exception.IsolatedPluginError(
+                f'{proxy.plugin_name} worker crashed: {ex}',
+            ) from ex
+        finally:
+            self._inc('calls')
+            self._release(worker, reason)
+
+    def _inc(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _record_ipc(self, ipc):
+        with self.lock:
+            self.ipc_count += 1
+            self.ipc_total += ipc
+            self.ipc_last = ipc
+            self.ipc_max = max(self.ipc_max, ipc)
+
+    def stop(self):
+        with self.lock:
+            workers = self.workers
+            self._init_data()
+        for worker in workers:
+            worker.stop()
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            ipc_avg = self.ipc_total / self.ipc_count if self.ipc_count else 0.0
+            return {
+                'plugins': list(self.plugin_names),
+                'workers': {
+                    worker.number: {
+                        'pid': worker.pid,
+                        'calls': worker.calls,
+                        'rss_mb': round(worker.rss / (1024 * 1024), 1),
+                    }
+                    for worker in self.workers
+                },
+                'calls': self.calls,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'crashes': self.crashes,
+                'recycles': self.recycles,
+                'ipc_ms': {
+                    'count': self.ipc_count,
+                    'last': round(self.ipc_last * 1000, 3),
+                    'avg': round(ipc_avg * 1000, 3),
+                    'max': round(self.ipc_max * 1000, 3),
+                },
+            }
+
+
+class IsolatedPluginMixin:
+    """The proxy for a plugin that runs in the IsolatedPluginPool."""
+
+    def __init__(self, plugin_name, info):
+        self.plugin_name = plugin_name
+        self.info = info
+        self.version = info['version']
+        super().__init__()
+
+    def setup(self):
+        self.enabled = self.info['enabled']
+
+    def help(self):
+        return self.info['help']
+
+    def process(self, packet):
+        return IsolatedPluginPool().call(self, 'process', packet)
+
+    def stop_threads(self):
+        IsolatedPluginPool().stop()
+
+
+class IsolatedRegexCommandPlugin(
+    IsolatedPluginMixin,
+    plugin.APRSDRegexCommandPluginBase,
+):
+    @property
+    def command_regex(self):
+        return self.info['command_regex']
+
+    @property
+    def command_name(self):
+        return self.info['command_name']
+
+
+class IsolatedWatchListPlugin(IsolatedPluginMixin, plugin.APRSDWatchListPluginBase):
+    def setup(self):
+        # The watch list check is done here, only process() is isolated.
+        plugin.APRSDWatchListPluginBase.setup(self)
+
+
+class IsolatedPlugin(IsolatedPluginMixin, plugin.APRSDPluginBase):
+    @plugin.hookimpl
+    def filter(self, packet):
+        return IsolatedPluginPool().call(self, 'filter', packet)
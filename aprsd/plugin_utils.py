@@ -1,11 +1,196 @@
 #  Utilities for plugins to use
-import json
+import concurrent.futures
 import logging
+import queue
+import threading
+import time
+import urllib.parse
 
 import requests
+from oslo_config import cfg
 
+from aprsd.packets import position_list
+from aprsd.utils import ttl_cache
+
+CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
 
+# The cache TTL for an endpoint that isn't in plugin_http_cache_ttls
+DEFAULT_CACHE_TTL = 60
+
+_MISSING = object()
+
+
+class PluginHTTPClient:
+    """Shared HTTP client for the web APIs plugins use.
+
+    Requests go through a pool of requests.Session objects, so the
+    TCP/TLS connections are reused.  Successful responses are cached
+    by the normalized request URL, with a TTL per endpoint
+    (plugin_http_cache_ttls).  Concurrent requests for the same URL
+    are coalesced into one request.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance._init_data()
+        return cls._instance
+
+    def _init_data(self):
+        self.cache = ttl_cache.TTLCache(
+            maxsize=CONF.plugin_http_cache_size,
+            ttl=DEFAULT_CACHE_TTL,
+        )
+        # Idle sessions, the most recently used is reused first.
+        self.sessions = queue.LifoQueue()
+        self.session_count = 0
+        # cache key -> Future for the request in flight
+        self.inflight = {}
+        # endpoint -> counters
+        self.endpoints = {}
+
+    @staticmethod
+    def cache_key(url, params=None) -> str:
+        """Normalize the request url, so the same request has the same key."""
+        url = requests.Request('GET', url, params=params).prepare().url
+        parts = urllib.parse.urlsplit(url)
+        query = urllib.parse.urlencode(
+            sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)),
+        )
+        return urllib.parse.urlunsplit(
+            (
+                parts.scheme.lower(),
+                parts.netloc.lower(),
+                parts.path or '/',
+                query,
+                '',
+            ),
+        )
+
+    @staticmethod
+    def cache_ttl(endpoint) -> float:
+        ttls = CONF.plugin_http_cache_ttls or {}
+        try:
+            return float(ttls.get(endpoint, DEFAULT_CACHE_TTL))
+        except ValueError:
+            LOG.error(f"Invalid plugin_http_cache_ttls value for '{endpoint}'")
+            return DEFAULT_CACHE_TTL
+
+    def _count(self, endpoint, counter, latency=None):
+        with self.lock:
+            counters = self.endpoints.setdefault(
+                endpoint,
+                {
+                    'hits': 0,
+                    'misses': 0,
+                    'coalesced': 0,
+                    'errors': 0,
+                    'latency_total': 0.0,
+                    'latency_max': 0.0,
+                },
+            )
+            counters[counter] += 1
+            if latency is not None:
+                counters['latency_total'] += latency
+                counters['latency_max'] = max(counters['latency_max'], latency)
+
+    def _get_session(self) -> requests.Session:
+        try:
+            return self.sessions.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                self.session_count += 1
+            return requests.Session()
+
+    def _fetch(self, endpoint, url, params=None, headers=None):
+        session = self._get_session()
+        start = time.monotonic()
+        try:
+            response = session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=CONF.plugin_http_timeout,
+            )
+            response.raise_for_status()
+        except Exception:
+            self._count(endpoint, 'errors')
+            raise
+        finally:
+            self.sessions.put(session)
+        self._count(endpoint, 'misses', latency=time.monotonic() - start)
+        return response
+
+    def get(self, endpoint, url, params=None, headers=None) -> requests.Response:
+        """GET url, from the cache if we can.
+
+        endpoint names the API for the cache TTL and the stats.
+        Raises requests.HTTPError for an error response, and
+        requests.RequestException if the request failed.
+        The response may be shared with other callers.
+        """
+        key = self.cache_key(url, params)
+        ttl = self.cache_ttl(endpoint)
+        if ttl > 0:
+            response = self.cache.get(key, _MISSING)
+            if response is not _MISSING:
+                self._count(endpoint, 'hits')
+                return response
+
+        with self.lock:
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self.inflight[key] = future
+        if not owner:
+            self._count(endpoint, 'coalesced')
+            return future.result()
+
+        try:
+            response = self._fetch(endpoint, url, params=params, headers=headers)
+            if ttl > 0:
+                self.cache.set(key, response, ttl=ttl)
+            future.set_result(response)
+            return response
+        except Exception as ex:
+            future.set_exception(ex)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+    def get_json(self, endpoint, url, params=None, headers=None):
+        """GET url and return the decoded JSON response."""
+        return self.get(endpoint, url, params=params, headers=headers).json()
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            endpoints = {}
+            for endpoint, counters in self.endpoints.items():
+                misses = counters['misses']
+                avg = counters['latency_total'] / misses if misses else 0.0
+                endpoints[endpoint] = {
+                    'hits': counters['hits'],
+                    'misses': misses,
+                    'coalesced': counters['coalesced'],
+                    'errors': counters['errors'],
+                    'latency_ms': {
+                        'avg': round(avg * 1000, 3),
+                        'max': round(counters['latency_max'] * 1000, 3),
+                    },
+                }
+            sessions = self.session_count
+        return {
+            'sessions': sessions,
+            'cache': self.cache.stats(serializable=serializable),
+            'endpoints': endpoints,
+        }
+
 
 def get_aprs_fi(api_key, callsign):
     LOG.debug(f"Fetch aprs.fi location for '{callsign}'")
@@ -15,12 +200,29 @@ def get_aprs_fi(api_key, callsign):
                 api_key, callsign
             )
         )
-        response = requests.get(url)
+        return PluginHTTPClient().get_json('aprs_fi', url)
+    except requests.HTTPError:
+        raise
     except Exception as e:
         raise Exception('Failed to get aprs.fi location') from e
-    else:
-        response.raise_for_status()
-        return json.loads(response.text)
+
+
+def get_location(api_key, callsign):
+    """Find the last known (lat, lon) of a callsign.
+
+    Stations we have heard recently are in the PositionList, any
+    others are looked up on aprs.fi.  Returns None if aprs.fi
+    doesn't know the callsign either.
+    """
+    position = position_list.PositionList().get(callsign)
+    if position:
+        LOG.debug(f"Found '{callsign}' in the position list")
+        return (position.latitude, position.longitude)
+
+    aprs_data = get_aprs_fi(api_key, callsign)
+    if not len(aprs_data['entries']):
+        return None
+    return (aprs_data['entries'][0]['lat'], aprs_data['entries'][0]['lng'])
 
 
 def get_weather_gov_for_gps(lat, lon):
@@ -37,13 +239,12 @@ def get_weather_gov_for_gps(lat, lon):
             # f"https://api.weather.gov/points/{lat},{lon}"
         )
         LOG.debug(f"Fetching weather '{url2}'")
-        response = requests.get(url2, headers=headers)
+        return PluginHTTPClient().get_json('weather_gov', url2, headers=headers)
+    except requests.HTTPError:
+        raise
     except Exception as e:
         LOG.error(e)
         raise Exception('Failed to get weather') from e
-    else:
-        response.raise_for_status()
-        return json.loads(response.text)
 
 
 def get_weather_gov_metar(station):
@@ -52,12 +253,11 @@ def get_weather_gov_metar(station):
         url = 'https://api.weather.gov/stations/{}/observations/latest'.format(
             station,
         )
-        response = requests.get(url)
+        return PluginHTTPClient().get('metar', url)
+    except requests.HTTPError:
+        raise
     except Exception as e:
         raise Exception('Failed to fetch metar') from e
-    else:
-        response.raise_for_status()
-        return json.loads(response)
 
 
 def fetch_openweathermap(api_key, lat, lon, units='metric', exclude=None):
@@ -76,10 +276,9 @@ def fetch_openweathermap(api_key, lat, lon, units='metric', exclude=None):
             )
         )
         LOG.debug(f"Fetching OWM weather '{url}'")
-        response = requests.get(url)
+        return PluginHTTPClient().get_json('openweathermap', url)
+    except requests.HTTPError:
+        raise
     except Exception as e:
         LOG.error(e)
         raise Exception('Failed to get weather') from e
-    else:
-        response.raise_for_status()
-        return json.loads(response.text)
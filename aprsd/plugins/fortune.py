@@ -1,5 +1,9 @@
+import codecs
 import logging
+import os
+import random
 import shutil
+import struct
 import subprocess
 
 from aprsd import packets, plugin
@@ -12,17 +16,119 @@ FORTUNE_PATHS = [
     '/usr/bin/fortune',
 ]
 
+# Where the fortune data files are installed.  The offensive
+# fortunes live in an 'off' sub directory, which isn't searched.
+FORTUNE_DIRS = [
+    '/usr/share/games/fortunes',
+    '/usr/share/games/fortune',
+    '/usr/share/fortune',
+    '/usr/share/fortunes',
+    '/usr/local/share/games/fortunes',
+]
+
+# Only fortunes this short fit in an APRS message.  This is
+# the same as fortune -s -n 60
+FORTUNE_MAX_LENGTH = 60
+
+# The strfile .dat header, version, numstr, longlen, shortlen,
+# flags and the delimiter character.
+STRFILE_HEADER = struct.Struct('>IIIIIc3x')
+STRFILE_ROTATED = 0x4
+
+
+def _clean(fortune: str) -> str:
+    return (
+        fortune.replace('\r', '').replace('\n', '').replace('  ', '').replace('\t', ' ')
+    )
+
+
+def read_strfile(text_path: str, dat_path: str) -> list:
+    """Read the short fortunes using the strfile .dat offset table.
+
+    The offsets give the length of every fortune, so only the short
+    ones are decoded.
+    """
+    with open(dat_path, 'rb') as fp:
+        header = fp.read(STRFILE_HEADER.size)
+        _, numstr, _, _, flags, delim = STRFILE_HEADER.unpack(header)
+        offsets = struct.unpack(f'>{numstr + 1}I', fp.read(4 * (numstr + 1)))
+    with open(text_path, 'rb') as fp:
+        data = fp.read()
+
+    # Random or ordered strfiles don't have the offsets in file order.
+    offsets = sorted(set(offsets))
+    fortunes = []
+    # Each fortune is followed by a line with just the delimiter.
+    separator = len(delim) + 2
+    for start, end in zip(offsets[:-1], offsets[1:], strict=True):
+        if end - start - separator > FORTUNE_MAX_LENGTH:
+            continue
+        fortune = data[start:end].decode('utf-8', errors='replace')
+        fortune = fortune.rstrip('\n').removesuffix(delim.decode('latin-1'))
+        fortune = fortune.rstrip('\n')
+        if flags & STRFILE_ROTATED:
+            fortune = codecs.decode(fortune, 'rot13')
+        if fortune and len(fortune) <= FORTUNE_MAX_LENGTH:
+            fortunes.append(fortune)
+    return fortunes
+
+
+def read_text(text_path: str) -> list:
+    """Read the short fortunes from a fortune text file."""
+    with open(text_path, encoding='utf-8', errors='replace') as fp:
+        data = fp.read()
+    fortunes = []
+    for fortune in data.split('\n%\n'):
+        fortune = fortune.strip('\n').removesuffix('\n%').removeprefix('%\n')
+        if fortune and len(fortune) <= FORTUNE_MAX_LENGTH:
+            fortunes.append(fortune)
+    return fortunes
+
+
+def load_fortunes(dirs: list) -> list:
+    """Load all of the short fortunes from the data files in dirs."""
+    fortunes = []
+    for fortune_dir in dirs:
+        if not os.path.isdir(fortune_dir):
+            continue
+        for name in sorted(os.listdir(fortune_dir)):
+            text_path = os.path.join(fortune_dir, name)
+            if '.' in name or not os.path.isfile(text_path):
+                # Skip the .dat, .u8 and any other files
+                continue
+            dat_path = f'{text_path}.dat'
+            try:
+                if os.path.isfile(dat_path):
+                    fortunes.extend(read_strfile(text_path, dat_path))
+                else:
+                    fortunes.extend(read_text(text_path))
+            except (OSError, struct.error) as ex:
+                LOG.warning(f"Failed to read fortune file '{text_path}' {ex}")
+    return [_clean(fortune) for fortune in fortunes]
+
 
 class FortunePlugin(plugin.APRSDRegexCommandPluginBase):
-    """Fortune."""
+    """Fortune.
+
+    The short fortunes are loaded from the fortune data files
+    once at setup.  If there are no data files, the fortune
+    command is run for every request.
+    """
 
     command_regex = r'^([f]|[f]\s|fortune)'
     command_name = 'fortune'
     short_description = 'Give me a fortune'
 
     fortune_path = None
+    fortunes = None
 
     def setup(self):
+        self.fortunes = load_fortunes(FORTUNE_DIRS)
+        if self.fortunes:
+            LOG.info(f'Loaded {len(self.fortunes)} fortunes')
+            self.enabled = True
+            return
+
         for path in FORTUNE_PATHS:
             self.fortune_path = shutil.which(path)
             LOG.info(f'Fortune path {self.fortune_path}')
@@ -35,6 +141,9 @@ class FortunePlugin(plugin.APRSDRegexCommandPluginBase):
 
     def process(self, packet: packets.MessagePacket) -> str:
         LOG.info('FortunePlugin')
+        if self.fortunes:
+            return random.choice(self.fortunes)
+
         reply = packets.NULL_MESSAGE
         try:
             cmnd = [self.fortune_path, '-s', '-n 60']
@@ -45,12 +154,7 @@ class FortunePlugin(plugin.APRSDRegexCommandPluginBase):
                 timeout=3,
                 text=True,
             )
-            output = (
-                output.replace('\r', '')
-                .replace('\n', '')
-                .replace('  ', '')
-                .replace('\t', ' ')
-            )
+            output = _clean(output)
         except subprocess.CalledProcessError as ex:
             reply = f"Fortune command failed '{ex.output}'"
         else:
@@ -1,8 +1,10 @@
 import logging
+import threading
 
 from oslo_config import cfg
 
 from aprsd import packets, plugin
+from aprsd.packets import watch_list
 
 CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
@@ -15,10 +17,27 @@ class NotifySeenPlugin(plugin.APRSDWatchListPluginBase):
     This plugin will track callsigns in the watch list and report
     when a callsign has been seen when the last time they were
     seen was older than the configured age limit.
+
+    The WatchList tells the plugin when a callsign comes back online
+    (EVENT_ONLINE), from WatchList.rx(), before the packet that brought
+    it back gets to the plugin, which sends the notification for it.
     """
 
     short_description = 'Notify me when a CALLSIGN is recently seen on APRS-IS'
 
+    def setup(self):
+        # The callsigns that came back online, waiting to be notified.
+        self.came_online = set()
+        self.came_online_lock = threading.Lock()
+        super().setup()
+        if self.enabled:
+            packets.WatchList().subscribe(self.watch_list_event)
+
+    def watch_list_event(self, event, callsign, packet):
+        if event == watch_list.EVENT_ONLINE:
+            with self.came_online_lock:
+                self.came_online.add(callsign)
+
     def process(self, packet: packets.MessagePacket) -> packets.MessagePacket:
         LOG.info('NotifySeenPlugin')
 
@@ -28,10 +47,13 @@ class NotifySeenPlugin(plugin.APRSDWatchListPluginBase):
         wl = packets.WatchList()
         age = wl.age(fromcall)
 
+        # Only notify once each time the callsign comes back online.
+        with self.came_online_lock:
+            came_online = fromcall in self.came_online
+            self.came_online.discard(fromcall)
+
         if fromcall != notify_callsign:
-            # Check if the callsign was old BEFORE WatchList.rx() updated the timestamp
-            # This ensures we can detect when a previously old callsign is seen again
-            if wl.was_old_before_last_update(fromcall):
+            if came_online:
                 LOG.info(
                     'NOTIFY {} last seen {} max age={}'.format(
                         fromcall,
@@ -39,9 +61,6 @@ class NotifySeenPlugin(plugin.APRSDWatchListPluginBase):
                         wl.max_delta(),
                     ),
                 )
-                # Mark the callsign as new to prevent duplicate notifications
-                # until it becomes old again
-                wl.mark_as_new(fromcall)
                 packet_type = packet.__class__.__name__
                 # we shouldn't notify the alert user that they are online.
                 pkt = packets.MessagePacket(
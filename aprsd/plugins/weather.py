@@ -1,6 +1,7 @@
 import json
 import logging
 import re
+import time
 
 from oslo_config import cfg
 
@@ -10,12 +11,41 @@ CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
 
 
+def local_wx_reply(wx_packet: packets.WeatherPacket, distance: float) -> str:
+    """Build the weather reply from a WX station heard on the network.
+
+    aprslib decodes the temperature in degrees C, the WeatherPacket
+    already has the wind in mph and the rain in inches.  Anything the
+    station didn't report is left out.
+    """
+    age = max(0, int((time.time() - wx_packet.timestamp) / 60))
+    parts = []
+    if wx_packet.temperature is not None:
+        parts.append(f'{wx_packet.temperature * 9 / 5 + 32:.0f}F')
+    if wx_packet.humidity is not None:
+        parts.append(f'{wx_packet.humidity}%')
+    if wx_packet.wind_speed is not None:
+        wind = f'Wind {wx_packet.wind_speed:.0f}MPH'
+        if wx_packet.wind_direction is not None:
+            wind += f'@{wx_packet.wind_direction}'
+        if wx_packet.wind_gust:
+            wind += f' G{wx_packet.wind_gust:.0f}'
+        parts.append(wind)
+    if wx_packet.pressure:
+        parts.append(f'{wx_packet.pressure}mb')
+    if wx_packet.rain_24h:
+        parts.append(f'Rain {wx_packet.rain_24h}in/24hr')
+    parts.append(f'({wx_packet.from_call} {distance:.0f}km {age}m ago)')
+    return ' '.join(parts)
+
+
 class USWeatherPlugin(plugin.APRSDRegexCommandPluginBase, plugin.APRSFIKEYMixin):
     """USWeather Command
 
     Returns a weather report for the calling weather station
-    inside the United States only.  This uses the
-    forecast.weather.gov API to fetch the weather.
+    inside the United States only.  If a WX station near the
+    location has reported recently, that report is used, otherwise
+    this uses the forecast.weather.gov API to fetch the weather.
 
     This service does not require an apiKey.
 
@@ -43,18 +73,22 @@ class USWeatherPlugin(plugin.APRSDRegexCommandPluginBase, plugin.APRSFIKEYMixin)
             searchcall = fromcall
         api_key = CONF.aprs_fi.apiKey
         try:
-            aprs_data = plugin_utils.get_aprs_fi(api_key, searchcall)
+            location = plugin_utils.get_location(api_key, searchcall)
         except Exception as ex:
             LOG.error(f'Failed to fetch aprs.fi data {ex}')
             return 'Failed to fetch aprs.fi location'
 
-        LOG.debug(f'LocationPlugin: aprs_data = {aprs_data}')
-        if not len(aprs_data['entries']):
+        if not location:
             LOG.error("Didn't get any entries from aprs.fi")
             return 'Failed to fetch aprs.fi location'
 
-        lat = aprs_data['entries'][0]['lat']
-        lon = aprs_data['entries'][0]['lng']
+        lat, lon = location
+
+        local = packets.WXList().nearest(lat, lon)
+        if local:
+            wx_packet, distance = local
+            LOG.debug(f'Using WX report from {wx_packet.from_call} {distance:.1f}km')
+            return local_wx_reply(wx_packet, distance)
 
         try:
             wx_data = plugin_utils.get_weather_gov_for_gps(lat, lon)
@@ -126,18 +160,16 @@ class USMetarPlugin(plugin.APRSDRegexCommandPluginBase, plugin.APRSFIKEYMixin):
             api_key = CONF.aprs_fi.apiKey
 
             try:
-                aprs_data = plugin_utils.get_aprs_fi(api_key, fromcall)
+                location = plugin_utils.get_location(api_key, fromcall)
             except Exception as ex:
                 LOG.error(f'Failed to fetch aprs.fi data {ex}')
                 return 'Failed to fetch aprs.fi location'
 
-            # LOG.debug("LocationPlugin: aprs_data = {}".format(aprs_data))
-            if not len(aprs_data['entries']):
+            if not location:
                 LOG.error('Found no entries from aprs.fi!')
                 return 'Failed to fetch aprs.fi location'
 
-            lat = aprs_data['entries'][0]['lat']
-            lon = aprs_data['entries'][0]['lng']
+            lat, lon = location
 
             try:
                 wx_data = plugin_utils.get_weather_gov_for_gps(lat, lon)
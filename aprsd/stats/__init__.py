@@ -1,8 +1,17 @@
-from aprsd import plugin
+from aprsd import plugin, plugin_isolation, plugin_utils
 from aprsd.client import stats as client_stats
-from aprsd.packets import packet_list, seen_list, tracker, watch_list
+from aprsd.packets import (
+    archive,
+    packet_list,
+    position_list,
+    seen_list,
+    tracker,
+    watch_list,
+    wx_list,
+)
 from aprsd.stats import app, collector
-from aprsd.threads import aprsd
+from aprsd.threads import ack_fast_path, aprsd, keyed_pool
+from aprsd.utils import interning
 
 # Create the collector and register all the objects
 # that APRSD has that implement the stats protocol
@@ -12,6 +21,15 @@ stats_collector.register_producer(packet_list.PacketList)
 stats_collector.register_producer(watch_list.WatchList)
 stats_collector.register_producer(tracker.PacketTrack)
 stats_collector.register_producer(plugin.PluginManager)
+stats_collector.register_producer(plugin.ReplyCache)
 stats_collector.register_producer(aprsd.APRSDThreadList)
 stats_collector.register_producer(client_stats.APRSClientStats)
 stats_collector.register_producer(seen_list.SeenList)
+stats_collector.register_producer(ack_fast_path.AckFastPath)
+stats_collector.register_producer(keyed_pool.KeyedWorkerPool)
+stats_collector.register_producer(plugin_isolation.IsolatedPluginPool)
+stats_collector.register_producer(plugin_utils.PluginHTTPClient)
+stats_collector.register_producer(position_list.PositionList)
+stats_collector.register_producer(wx_list.WXList)
+stats_collector.register_producer(archive.PacketArchive)
+stats_collector.register_producer(interning.StringInterner)
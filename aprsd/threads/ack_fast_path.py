@@ -0,0 +1,140 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from oslo_config import cfg
+
+from aprsd.packets import core
+from aprsd.threads import tx
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+# A TNC2 formatted APRS message line with a message number.
+#   FROMCALL>TOCALL,PATH::ADDRESSEE:message text{msgNo
+# The msgNo may be followed by a reply-ack  {MM}AA
+MESSAGE_LINE_RE = re.compile(
+    r'^([^>\s]+)>[^:]*::([^:]{1,9}):[^{]*\{([A-Za-z0-9]{1,5})(?:\}[A-Za-z0-9]*)?\s*$',
+)
+
+# The maximum number of (from_call, msgNo) entries to keep
+# in the dedupe set.
+MAX_DEDUPE_ENTRIES = 1000
+
+
+class AckFastPath:
+    """Ack messages to us as soon as the raw line is read.
+
+    The normal path only acks a message after it has been
+    decoded, logged, filtered and collected.  The fast path
+    looks at the raw line from the APRSDRXThread, and if it's
+    a message to us with a msgNo, sends the ack right away.
+    The message itself still goes through the normal pipeline,
+    which skips the ack if the fast path already sent it.
+
+    This is enabled with the enable_ack_fast_path config option.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance._init_data()
+        return cls._instance
+
+    def _init_data(self):
+        # (from_call, msgNo) -> monotonic time we acked it
+        self._acked = OrderedDict()
+        self.acked_count = 0
+        self.dupe_count = 0
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+
+    def _expire(self, now):
+        timeout = CONF.packet_dupe_timeout
+        while self._acked:
+            key, acked_time = next(iter(self._acked.items()))
+            if now - acked_time < timeout and len(self._acked) <= MAX_DEDUPE_ENTRIES:
+                break
+            del self._acked[key]
+
+    def was_acked(self, from_call, msg_no) -> bool:
+        """Did the fast path already ack this message?"""
+        with self.lock:
+            key = (from_call.upper(), str(msg_no))
+            acked_time = self._acked.get(key)
+            if acked_time is None:
+                return False
+            return time.monotonic() - acked_time < CONF.packet_dupe_timeout
+
+    def check(self, data) -> bool:
+        """Check a raw line/frame and ack it if it's a message for us.
+
+        Returns True if an ack was sent for the line.
+        """
+        received = time.monotonic()
+        if isinstance(data, bytes):
+            data = data.decode('utf-8', errors='replace')
+        elif not isinstance(data, str):
+            # KISS frames render as a TNC2 line.
+            data = str(data)
+
+        match = MESSAGE_LINE_RE.match(data)
+        if not match:
+            return False
+        from_call, addresse, msg_no = match.groups()
+        if addresse.strip().upper() != CONF.callsign.upper():
+            return False
+
+        key = (from_call.upper(), msg_no)
+        with self.lock:
+            self._expire(received)
+            if key in self._acked:
+                self.dupe_count += 1
+                return False
+            self._acked[key] = received
+            self.acked_count += 1
+
+        future = tx.send_priority_ack(
+            core.AckPacket(
+                from_call=CONF.callsign,
+                to_call=from_call,
+                msgNo=msg_no,
+            ),
+        )
+        if future:
+            future.add_done_callback(
+                lambda f: self._record_latency(time.monotonic() - received),
+            )
+        return True
+
+    def _record_latency(self, latency):
+        with self.lock:
+            self.latency_count += 1
+            self.latency_total += latency
+            self.latency_last = latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            if self.latency_count:
+                latency_avg = self.latency_total / self.latency_count
+            else:
+                latency_avg = 0.0
+            return {
+                'enabled': CONF.enable_ack_fast_path,
+                'acked': self.acked_count,
+                'dupes': self.dupe_count,
+                'latency_ms': {
+                    'count': self.latency_count,
+                    'last': round(self.latency_last * 1000, 3),
+                    'avg': round(latency_avg * 1000, 3),
+                    'max': round(self.latency_max * 1000, 3),
+                },
+            }
@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+import time
+import zlib
+
+from oslo_config import cfg
+
+from aprsd.threads import APRSDThread
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+
+class KeyedWorker(APRSDThread):
+    """A worker thread that runs the jobs for one shard in order."""
+
+    period = 1
+
+    def __init__(self, shard: int):
+        super().__init__(f'ProcessPKT-{shard}')
+        self.shard = shard
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.latency_total = 0.0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self.wait_total = 0.0
+
+    def loop(self):
+        try:
+            func, args, queued = self.queue.get(timeout=self.period)
+        except queue.Empty:
+            return True
+
+        start = time.monotonic()
+        try:
+            func(*args)
+        except Exception as ex:
+            LOG.error(f'{self.name} job {func} failed: {ex}')
+            LOG.exception(ex)
+        finally:
+            latency = time.monotonic() - start
+            with self.lock:
+                self.processed += 1
+                self.wait_total += start - queued
+                self.latency_total += latency
+                self.latency_last = latency
+                self.latency_max = max(self.latency_max, latency)
+        return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            if self.processed:
+                latency_avg = self.latency_total / self.processed
+                wait_avg = self.wait_total / self.processed
+            else:
+                latency_avg = wait_avg = 0.0
+            return {
+                'queue': self.queue.qsize(),
+                'processed': self.processed,
+                'wait_ms_avg': round(wait_avg * 1000, 3),
+                'latency_ms': {
+                    'last': round(self.latency_last * 1000, 3),
+                    'avg': round(latency_avg * 1000, 3),
+                    'max': round(self.latency_max * 1000, 3),
+                },
+            }
+
+
+class KeyedWorkerPool:
+    """Run jobs in order per key, and in parallel across keys.
+
+    Every key (a station's callsign) always maps to the same shard,
+    and each shard has one KeyedWorker thread.  So the jobs for a
+    station run one at a time in the order they were submitted,
+    while jobs for stations on other shards run at the same time.
+
+    The number of shards is the packet_process_workers config option.
+    The worker threads are started on the first submit.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance.size = max(0, CONF.packet_process_workers)
+            cls._instance.workers = []
+        return cls._instance
+
+    def shard_for(self, key: str) -> int:
+        """The shard a key is processed on."""
+        return zlib.crc32(str(key).upper().encode()) % self.size
+
+    def _start(self):
+        with self.lock:
+            if not self.workers:
+                workers = [KeyedWorker(shard) for shard in range(self.size)]
+                for worker in workers:
+                    worker.start()
+                self.workers = workers
+            return self.workers
+
+    def submit(self, key: str, func, *args) -> None:
+        """Run func(*args) on the shard for key.
+
+        If the pool size is 0, func is run right away on the
+        calling thread.
+        """
+        if not self.size:
+            func(*args)
+            return
+        workers = self.workers or self._start()
+        workers[self.shard_for(key)].queue.put((func, args, time.monotonic()))
+
+    def stats(self, serializable=False) -> dict:
+        workers = self.workers
+        return {
+            'size': self.size,
+            'shards': {worker.name: worker.stats() for worker in workers},
+        }
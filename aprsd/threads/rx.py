@@ -9,7 +9,7 @@ from aprsd import packets, plugin
 from aprsd.client.client import APRSDClient
 from aprsd.packets import collector, core, filter
 from aprsd.packets import log as packet_log
-from aprsd.threads import APRSDThread, tx
+from aprsd.threads import APRSDThread, ack_fast_path, keyed_pool, tx
 
 CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
@@ -114,6 +114,13 @@ class APRSDRXThread(APRSDThread):
             return
 
         self.pkt_count += 1
+        if CONF.enable_ack_fast_path:
+            # Ack messages for us now, before the packet waits
+            # in the queue to be decoded and processed.
+            try:
+                ack_fast_path.AckFastPath().check(data)
+            except Exception as ex:
+                LOG.error(f'Ack fast path failed: {ex}')
         self.packet_queue.put(data)
 
 
@@ -165,9 +172,15 @@ class APRSDFilterThread(APRSDThread):
                 # want to spam the logs with this.
                 LOG.debug(f'Packet failed to parse. "{pkt}"')
                 return True
-            self.print_packet(packet)
+            # A LazyPacket is only logged once it's passed the filters,
+            # so the packets that are dropped are never decoded.
+            lazy = type(packet) is core.LazyPacket
+            if not lazy:
+                self.print_packet(packet)
             if packet:
                 if self.filter_packet(packet):
+                    if lazy:
+                        self.print_packet(packet)
                     # The packet has passed all filters, so we collect it.
                     # and process it.
                     collector.PacketCollector().rx(packet)
@@ -254,7 +267,10 @@ class APRSDProcessPacketThread(APRSDFilterThread):
                     # It's a MessagePacket and it's for us!
                     # let any threads do their thing, then ack
                     # send an ack last
-                    if msg_id:
+                    if msg_id and not (
+                        CONF.enable_ack_fast_path
+                        and ack_fast_path.AckFastPath().was_acked(from_call, msg_id)
+                    ):
                         tx.send(
                             packets.AckPacket(
                                 from_call=CONF.callsign,
@@ -291,11 +307,30 @@ class APRSDPluginProcessPacketThread(APRSDProcessPacketThread):
     """Process the packet through the plugin manager.
 
     This is the main aprsd server plugin processing thread.
+    The plugins are run on the KeyedWorkerPool shard for the
+    sending station, so a slow reply to one station doesn't hold
+    up the others.  Acks are still sent from this thread.
+
     Args:
         packet_queue: The queue to get the packets from.
     """
 
     def process_other_packet(self, packet, for_us=False):
+        keyed_pool.KeyedWorkerPool().submit(
+            packet.from_call,
+            self.handle_other_packet,
+            packet,
+        )
+
+    def process_our_message_packet(self, packet):
+        keyed_pool.KeyedWorkerPool().submit(
+            packet.from_call,
+            self.handle_our_message_packet,
+            packet,
+        )
+
+    def handle_other_packet(self, packet):
+        """Run the packet through the watchlist plugins."""
         pm = plugin.PluginManager()
         try:
             results = pm.run_watchlist(packet)
@@ -322,7 +357,7 @@ class APRSDPluginProcessPacketThread(APRSDProcessPacketThread):
             LOG.error('Plugin failed!!!')
             LOG.exception(ex)
 
-    def process_our_message_packet(self, packet):
+    def handle_our_message_packet(self, packet):
         """Send the packet through the plugins."""
         from_call = packet.from_call
         if packet.addresse:
@@ -333,7 +368,7 @@ class APRSDPluginProcessPacketThread(APRSDProcessPacketThread):
         pm = plugin.PluginManager()
         try:
             results, handled = pm.run(packet)
-            # Check if any plugin replied (results may be unordered due to parallel execution)
+            # Check if any plugin replied (results are in plugin order)
             replied = any(
                 result and result is not packets.NULL_MESSAGE for result in results
             )
@@ -65,6 +65,27 @@ def send(packet: core.Packet, direct=False, aprs_client=None):
         _send_packet(packet, direct=direct, aprs_client=aprs_client)
 
 
+def send_priority_ack(packet: core.AckPacket):
+    """Send an ack now instead of waiting for the ack scheduler to see it.
+
+    The ack is tracked like any other ack, so the AckSendSchedulerThread
+    still handles the retries.  It's submitted through the scheduler,
+    so the scheduler doesn't send it again while this send is in flight.
+
+    Returns:
+        The Future for the first send of the ack, or None if
+        sending ack packets is disabled, or the scheduler already
+        has a send of it in flight.
+    """
+    packet.prepare()
+    collector.PacketCollector().tx(packet)
+    if not CONF.enable_sending_ack_packets:
+        LOG.info('Sending ack packets is disabled. Not sending AckPacket.')
+        return None
+    scheduler = _get_ack_scheduler()
+    return scheduler.submit(tracker.PacketTrack.tracking_key(packet))
+
+
 @msg_throttle_decorator.sleep_and_retry
 def _send_packet(packet: core.Packet, direct=False, aprs_client=None):
     if not direct:
@@ -135,14 +156,16 @@ def _get_ack_scheduler():
         return _ack_scheduler
 
 
-def _send_packet_worker(msg_no: str):
+def _send_packet_worker(key: str):
     """Worker function for threadpool to send a packet.
 
     This function checks if the packet needs to be sent and sends it if conditions are met.
     Returns True if packet should continue to be tracked, False if done.
+
+    key is the (peer, msgNo) key the packet is tracked under in PacketTrack.
     """
     pkt_tracker = tracker.PacketTrack()
-    packet = pkt_tracker.get(msg_no)
+    packet = pkt_tracker.get(key)
 
     if not packet:
         # Packet was acked and removed from tracker
@@ -156,7 +179,7 @@ def _send_packet_worker(msg_no: str):
             'Message Send Complete. Max attempts reached'
             f' {packet.retry_count}',
         )
-        pkt_tracker.remove(packet.msgNo)
+        pkt_tracker.remove(key)
         return False
 
     # Check if it's time to send
@@ -185,14 +208,14 @@ def _send_packet_worker(msg_no: str):
     return True
 
 
-def _send_ack_worker(msg_no: str, max_retries: int):
+def _send_ack_worker(key: str, max_retries: int):
     """Worker function for threadpool to send an ack packet.
 
     This function checks if the ack needs to be sent and sends it if conditions are met.
     Returns True if ack should continue to be tracked, False if done.
     """
     pkt_tracker = tracker.PacketTrack()
-    packet = pkt_tracker.get(msg_no)
+    packet = pkt_tracker.get(key)
 
     if not packet:
         # Packet was removed from tracker
@@ -255,8 +278,8 @@ class PacketSendSchedulerThread(aprsd_threads.APRSDThread):
         pkt_tracker = tracker.PacketTrack()
 
         # Check all packets in the tracker
-        for msg_no in list(pkt_tracker.keys()):
-            packet = pkt_tracker.get(msg_no)
+        for key in list(pkt_tracker.keys()):
+            packet = pkt_tracker.get(key)
             if not packet:
                 # Packet was acked, skip it
                 continue
@@ -268,7 +291,7 @@ class PacketSendSchedulerThread(aprsd_threads.APRSDThread):
             # Check if packet is still being tracked (not acked)
             if packet.send_count >= packet.retry_count:
                 # Max retries reached, clean up
-                pkt_tracker.remove(msg_no)
+                pkt_tracker.remove(key)
                 continue
 
             # Don't submit if we sent recently (prevents threadpool race
@@ -281,7 +304,7 @@ class PacketSendSchedulerThread(aprsd_threads.APRSDThread):
 
             # Submit send task to threadpool
             # The worker will check timing and send if needed
-            self.executor.submit(_send_packet_worker, msg_no)
+            self.executor.submit(_send_packet_worker, key)
 
         self.wait()  # Check every period (default 1 second)
         return True
@@ -309,14 +332,42 @@ class AckSendSchedulerThread(aprsd_threads.APRSDThread):
         )
         self.max_workers = max_workers
         self.max_retries = CONF.default_ack_send_count
+        # Keys of the acks with a send task submitted and not done yet.
+        self.in_flight = set()
+        self.in_flight_lock = threading.Lock()
+
+    def submit(self, key: str):
+        """Submit a send task for the ack, unless one is already in flight.
+
+        last_send_time is only set once the worker has sent the ack, so
+        without this a loop() right after a submit sends it again.
+
+        Returns:
+            The Future of the send task, or None if one is in flight.
+        """
+        with self.in_flight_lock:
+            if key in self.in_flight:
+                return None
+            self.in_flight.add(key)
+        try:
+            future = self.executor.submit(_send_ack_worker, key, self.max_retries)
+        except Exception:
+            self._done(key)
+            raise
+        future.add_done_callback(lambda _future: self._done(key))
+        return future
+
+    def _done(self, key: str):
+        with self.in_flight_lock:
+            self.in_flight.discard(key)
 
     def loop(self):
         """Check all tracked ack packets and submit send tasks to threadpool."""
         pkt_tracker = tracker.PacketTrack()
 
         # Check all packets in the tracker that are acks
-        for msg_no in list(pkt_tracker.keys()):
-            packet = pkt_tracker.get(msg_no)
+        for key in list(pkt_tracker.keys()):
+            packet = pkt_tracker.get(key)
             if not packet:
                 # Packet was removed, skip it
                 continue
@@ -328,7 +379,7 @@ class AckSendSchedulerThread(aprsd_threads.APRSDThread):
             # Check if ack is still being tracked
             if packet.send_count >= self.max_retries:
                 # Max retries reached, clean up
-                pkt_tracker.remove(msg_no)
+                pkt_tracker.remove(key)
                 continue
 
             # Don't submit if we sent recently (prevents threadpool race
@@ -339,7 +390,7 @@ class AckSendSchedulerThread(aprsd_threads.APRSDThread):
                     continue
 
             # Submit send task to threadpool
-            self.executor.submit(_send_ack_worker, msg_no, self.max_retries)
+            self.submit(key)
 
         self.wait()  # Check every period (default 1 second)
         return True
@@ -353,6 +404,7 @@ class AckSendSchedulerThread(aprsd_threads.APRSDThread):
 class SendPacketThread(aprsd_threads.APRSDThread):
     def __init__(self, packet):
         self.packet = packet
+        self.key = tracker.PacketTrack.tracking_key(packet)
         super().__init__(f'TX-{packet.to_call}-{self.packet.msgNo}')
 
     def loop(self):
@@ -367,7 +419,7 @@ class SendPacketThread(aprsd_threads.APRSDThread):
         """
         pkt_tracker = tracker.PacketTrack()
         # lets see if the message is still in the tracking queue
-        packet = pkt_tracker.get(self.packet.msgNo)
+        packet = pkt_tracker.get(self.key)
         if not packet:
             # The message has been removed from the tracking queue
             # So it got acked and we are done.
@@ -388,7 +440,7 @@ class SendPacketThread(aprsd_threads.APRSDThread):
                     'Message Send Complete. Max attempts reached'
                     f' {packet.retry_count}',
                 )
-                pkt_tracker.remove(packet.msgNo)
+                pkt_tracker.remove(self.key)
                 return False
 
             # Message is still outstanding and needs to be acked.
@@ -0,0 +1,27 @@
+import logging
+
+from oslo_config import cfg
+
+from aprsd.packets import watch_list
+from aprsd.threads import APRSDThread
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+
+class WatchListExpiryThread(APRSDThread):
+    """Find the watch list callsigns that have gone stale.
+
+    WatchList.expire() only looks at the deadlines that have
+    passed, so this is cheap to run often.
+    """
+
+    period = 5
+
+    def __init__(self):
+        super().__init__('WatchListExpiry')
+
+    def loop(self):
+        watch_list.WatchList().expire()
+        self.wait()
+        return True
@@ -1,9 +1,14 @@
 import random
 import threading
+from collections import OrderedDict
 
 import wrapt
 
 MAX_PACKET_ID = 9999
+# The maximum number of peers that get their own msgNo sequence.
+# The least recently used peer is dropped when this is exceeded,
+# and starts over at a random msgNo the next time we talk to it.
+MAX_PEERS = 5000
 
 
 class PacketCounter:
@@ -16,6 +21,12 @@ class PacketCounter:
     message ID, which is the next number available
     from the PacketCounter.
 
+    Packets sent to a specific station should use
+    next_value(peer), which hands out msgNos from a
+    sequence for that peer alone.  The msgNo is only
+    unique per (peer, msgNo), so peers don't share
+    the MAX_PACKET_ID space.
+
     """
 
     _instance = None
@@ -26,15 +37,40 @@ class PacketCounter:
         if cls._instance is None:
             cls._instance = super().__new__(cls, *args, **kwargs)
             cls._instance._val = random.randint(1, MAX_PACKET_ID)  # Initialize counter
+            cls._instance._peers = OrderedDict()
         return cls._instance
 
+    @staticmethod
+    def _next(val):
+        if val == MAX_PACKET_ID:
+            return 1
+        return val + 1
+
     @wrapt.synchronized(lock)
     def increment(self):
         """Increment the counter, reset if it exceeds MAX_PACKET_ID."""
-        if self._val == MAX_PACKET_ID:
-            self._val = 1
+        self._val = self._next(self._val)
+
+    @wrapt.synchronized(lock)
+    def next_value(self, peer=None):
+        """Get the next msgNo for peer as a string.
+
+        If peer is not set, the global counter is used.
+        """
+        if not peer:
+            self._val = self._next(self._val)
+            return str(self._val)
+
+        peer = peer.upper()
+        val = self._peers.pop(peer, None)
+        if val is None:
+            val = random.randint(1, MAX_PACKET_ID)
         else:
-            self._val += 1
+            val = self._next(val)
+        self._peers[peer] = val
+        if len(self._peers) > MAX_PEERS:
+            self._peers.popitem(last=False)
+        return str(val)
 
     @property
     @wrapt.synchronized(lock)
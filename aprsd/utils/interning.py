@@ -0,0 +1,72 @@
+import threading
+
+from oslo_config import cfg
+
+CONF = cfg.CONF
+
+
+class StringInterner:
+    """Share one str object for each of the strings we see over and over.
+
+    Every decoded packet has new str objects for its callsigns and
+    path elements, but there are only a few thousand different ones.
+    Interning them means the packets we keep share them, and dict
+    lookups by them are quicker, as the hash is already computed and
+    the keys are usually the same object.
+
+    Unlike sys.intern(), the table is bounded by the
+    packet_intern_max_size config option.  When it's full it is
+    cleared, the strings that are still common are added back right
+    away.  That's cheaper than keeping track of the least recently
+    used string on every lookup.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance.table = {}
+            cls._instance.misses = 0
+            cls._instance.resets = 0
+        return cls._instance
+
+    def __len__(self):
+        return len(self.table)
+
+    def intern(self, value):
+        """Return the shared str equal to value.
+
+        Empty values and None are returned as is.
+        """
+        if not value:
+            return value
+        found = self.table.get(value)
+        if found is not None:
+            return found
+        return self._add(value)
+
+    def _add(self, value):
+        max_size = CONF.packet_intern_max_size
+        if max_size <= 0:
+            return value
+        with self.lock:
+            self.misses += 1
+            if len(self.table) >= max_size:
+                self.table.clear()
+                self.resets += 1
+            return self.table.setdefault(value, value)
+
+    def flush(self) -> None:
+        with self.lock:
+            self.table.clear()
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            return {
+                'size': len(self.table),
+                'max_size': CONF.packet_intern_max_size,
+                'misses': self.misses,
+                'resets': self.resets,
+            }
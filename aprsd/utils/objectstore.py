@@ -1,15 +1,25 @@
+import itertools
 import json
 import logging
 import os
 import pathlib
+import threading
 
 from oslo_config import cfg
 
+from aprsd.utils import sqlitestore
 from aprsd.utils.json import PacketJSONDecoder, SimpleJSONEncoder
 
 CONF = cfg.CONF
 LOG = logging.getLogger('APRSD')
 
+# The journal is compacted once it has at least this many records
+# and more records than the store has entries.
+JOURNAL_MIN_RECORDS = 1000
+# Held while a store is written to disk, so two saves can't write
+# their journal records out of order.
+_save_lock = threading.Lock()
+
 
 class ObjectStoreMixin:
     """Class 'MIXIN' intended to save/load object data.
@@ -24,10 +34,32 @@ class ObjectStoreMixin:
     When APRSD quits, it calls save()
     When APRSD Starts, it calls load()
     aprsd server -f (flush) will wipe all saved objects.
+
+    With the enable_save_journal option, a store that sets _track_changes
+    and calls _changed() for every key it sets or deletes in self.data
+    is saved by appending just the changed entries to a journal file,
+    unless it also sets _journal to False.
+    The journal is compacted into the save file once it's grown to the
+    size of the store, and load() replays it on top of the save file.
+
+    With the save_backend option set to 'sqlite', those stores are
+    saved to a table in an sqlite database instead, see SQLiteStore.
+    save() writes the changed entries in one transaction.  A store
+    that also sets _lazy_load only loads the save_cache_size most
+    recently changed entries, drops the oldest saved entries from
+    memory after each save, and looks up the others with _load_key().
     """
 
     # Child class must create the lock.
     lock = None
+    _track_changes = False
+    # False for a store that only tracks its changes for sqlite.
+    _journal = True
+    # The keys changed since the last save.  None until the whole
+    # store has been saved, by a journal compaction or to sqlite.
+    _dirty = None
+    _journal_records = 0
+    _lazy_load = False
 
     def __len__(self):
         with self.lock:
@@ -68,6 +100,30 @@ class ObjectStoreMixin:
             self.__class__.__name__.lower(),
         )
 
+    def _journal_filename(self):
+        return '{}/{}.journal'.format(
+            CONF.save_location,
+            self.__class__.__name__.lower(),
+        )
+
+    def _table(self):
+        return self.__class__.__name__.lower()
+
+    def _use_sqlite(self):
+        return self._track_changes and CONF.save_backend == 'sqlite'
+
+    def _use_journal(self):
+        return self._track_changes and self._journal and CONF.enable_save_journal
+
+    def _changed(self, key):
+        """Note that key was set or deleted in self.data.
+
+        The caller must hold self.lock.
+        """
+        dirty = self._dirty
+        if dirty is not None:
+            dirty.add(key)
+
     def _old_save_filename(self):
         """Return the old pickle filename for migration detection."""
         save_location = CONF.save_location
@@ -80,6 +136,12 @@ class ObjectStoreMixin:
         """Save any queued to disk as JSON."""
         if not CONF.enable_save:
             return
+        if self._use_sqlite():
+            self._save_sqlite()
+            return
+        if self._use_journal():
+            self._save_journal()
+            return
         self._init_store()
         save_filename = self._save_filename()
         if len(self) > 0:
@@ -100,6 +162,184 @@ class ObjectStoreMixin:
             )
             self.flush()
 
+    def _save_sqlite(self):
+        """Write the entries changed since the last save to the database."""
+        with _save_lock:
+            with self.lock:
+                dirty = self._dirty
+                self._dirty = set()
+                if dirty is None:
+                    dirty = list(self.data)
+                records = [
+                    (
+                        key,
+                        json.dumps(self.data[key], cls=SimpleJSONEncoder)
+                        if key in self.data
+                        else None,
+                    )
+                    for key in dirty
+                ]
+            try:
+                sqlitestore.SQLiteStore().write(self._table(), records)
+            except Exception:
+                # Try them again with the next save.
+                with self.lock:
+                    self._dirty.update(dirty)
+                raise
+        if self._lazy_load:
+            self._trim()
+
+    def _trim(self):
+        """Drop the oldest saved entries over save_cache_size from memory."""
+        with self.lock:
+            extra = len(self.data) - CONF.save_cache_size
+            if extra <= 0:
+                return
+            # The entries changed since the save have to stay.
+            oldest = list(itertools.islice(self.data, extra + len(self._dirty)))
+            for key in oldest:
+                if key not in self._dirty:
+                    del self.data[key]
+                    extra -= 1
+                    if not extra:
+                        break
+
+    def _load_key(self, key):
+        """Look up an entry that isn't in memory in the database.
+
+        Returns None if the store isn't lazy loaded, or the entry was
+        never saved.  The caller must hold self.lock.
+        """
+        if not (self._lazy_load and CONF.enable_save and self._use_sqlite()):
+            return None
+        value = sqlitestore.SQLiteStore().get(self._table(), key)
+        if value is not None:
+            return json.loads(value, cls=PacketJSONDecoder)
+
+    def _load_sqlite(self):
+        """Load the saved entries from the database.
+
+        Returns False if nothing has been saved to it yet.  The caller
+        must hold self.lock.
+        """
+        limit = CONF.save_cache_size if self._lazy_load else None
+        rows = sqlitestore.SQLiteStore().items(self._table(), limit)
+        if not rows:
+            return False
+        self.data = {
+            key: json.loads(value, cls=PacketJSONDecoder) for key, value in rows
+        }
+        self._dirty = set()
+        LOG.debug(
+            f'{self.__class__.__name__}::Loaded {len(self.data)} entries '
+            'from the database.'
+        )
+        return True
+
+    def _save_journal(self):
+        """Append the entries changed since the last save to the journal.
+
+        Only the changed entries are encoded while holding the lock, the
+        file is written after it's released.
+        """
+        self._init_store()
+        with _save_lock:
+            with self.lock:
+                dirty = self._dirty
+                self._dirty = set()
+                compact = dirty is None or self._journal_records >= max(
+                    len(self.data),
+                    JOURNAL_MIN_RECORDS,
+                )
+                if compact:
+                    self._journal_records = 0
+                    snapshot = json.dumps(self.data, cls=SimpleJSONEncoder)
+                else:
+                    self._journal_records += len(dirty)
+                    records = [
+                        json.dumps(
+                            [key, self.data[key]] if key in self.data else [key],
+                            cls=SimpleJSONEncoder,
+                        )
+                        for key in dirty
+                    ]
+            try:
+                if compact:
+                    self._compact(snapshot)
+                elif records:
+                    with open(self._journal_filename(), 'a') as fp:
+                        fp.write(''.join(f'{record}\n' for record in records))
+            except Exception:
+                # The changes are lost from the journal, so start over.
+                with self.lock:
+                    self._dirty = None
+                raise
+
+    def _compact(self, snapshot):
+        """Write snapshot to the save file and start a new journal.
+
+        The journal starts with the size and mtime of the save file it
+        follows, so a crash between writing the two can't replay an old
+        journal on top of a newer save file.
+        """
+        save_filename = self._save_filename()
+        LOG.debug(f'{self.__class__.__name__}::Compacting journal into {save_filename}')
+        tmp_filename = f'{save_filename}.tmp'
+        with open(tmp_filename, 'w') as fp:
+            fp.write(snapshot)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_filename, save_filename)
+        stat = os.stat(save_filename)
+        with open(self._journal_filename(), 'w') as fp:
+            header = {'snapshot': [stat.st_size, stat.st_mtime_ns]}
+            fp.write(f'{json.dumps(header)}\n')
+
+    def _replay_journal(self):
+        """Apply the journal on top of the loaded save file.
+
+        The caller must hold self.lock.
+        """
+        # The next save compacts, and starts a new journal.
+        self._dirty = None
+        journal_file = self._journal_filename()
+        if not os.path.exists(journal_file):
+            return
+        try:
+            stat = os.stat(self._save_filename())
+            snapshot = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            snapshot = None
+
+        count = 0
+        with open(journal_file, 'r') as fp:
+            try:
+                header = json.loads(fp.readline())
+            except json.JSONDecodeError:
+                header = {}
+            if snapshot is None or header.get('snapshot') != snapshot:
+                LOG.warning(
+                    f'{self.__class__.__name__}::Ignoring {journal_file}, '
+                    'it was not written after the save file.'
+                )
+                return
+            for line in fp:
+                try:
+                    record = json.loads(line, cls=PacketJSONDecoder)
+                except json.JSONDecodeError:
+                    # Cut short by a crash while it was being written.
+                    LOG.warning(
+                        f'{self.__class__.__name__}::Skipping the incomplete '
+                        f'end of {journal_file}'
+                    )
+                    break
+                key = record[0]
+                self.data.pop(key, None)
+                if len(record) > 1:
+                    self.data[key] = record[1]
+                count += 1
+        LOG.debug(f'{self.__class__.__name__}::Replayed {count} journal entries.')
+
     def load(self):
         """Load data from JSON file."""
         if not CONF.enable_save:
@@ -109,6 +349,11 @@ class ObjectStoreMixin:
         pickle_file = self._old_save_filename()
 
         with self.lock:
+            # The JSON save file is only loaded if nothing is in the
+            # database yet, and all of it is written with the next save.
+            if self._use_sqlite() and self._load_sqlite():
+                return
+
             # Check if old pickle file exists but JSON doesn't
             if not os.path.exists(json_file) and os.path.exists(pickle_file):
                 LOG.warning(
@@ -139,11 +384,19 @@ class ObjectStoreMixin:
             else:
                 LOG.debug(f'{self.__class__.__name__}::No save file found.')
 
+            if self._use_journal():
+                self._replay_journal()
+
     def flush(self):
         """Remove the JSON save file and clear data."""
         if not CONF.enable_save:
             return
         with self.lock:
+            if self._use_sqlite():
+                sqlitestore.SQLiteStore().clear(self._table())
             if os.path.exists(self._save_filename()):
                 pathlib.Path(self._save_filename()).unlink()
+            if os.path.exists(self._journal_filename()):
+                pathlib.Path(self._journal_filename()).unlink()
             self.data = {}
+            self._dirty = None
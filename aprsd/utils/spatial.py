@@ -0,0 +1,195 @@
+"""A lat/lon grid index for radius and nearest neighbour queries."""
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The mean earth radius in km
+EARTH_RADIUS_KM = 6371.0088
+# Half way around the earth, nothing is further away than this.
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+# Only bother with numpy for this many points or more.
+NUMPY_MIN_POINTS = 32
+
+
+def haversine_km(lat, lon, lats, lons) -> list:
+    """The distances in km from (lat, lon) to each of (lats, lons).
+
+    Uses numpy to do all of the points at once if it's installed.
+    """
+    if numpy is not None and len(lats) >= NUMPY_MIN_POINTS:
+        lat1 = math.radians(lat)
+        lat2 = numpy.radians(numpy.asarray(lats, dtype=float))
+        dlat = lat2 - lat1
+        dlon = numpy.radians(numpy.asarray(lons, dtype=float) - lon)
+        a = (
+            numpy.sin(dlat / 2) ** 2
+            + math.cos(lat1) * numpy.cos(lat2) * numpy.sin(dlon / 2) ** 2
+        )
+        return (
+            2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))
+        ).tolist()
+
+    lat1 = math.radians(lat)
+    cos_lat1 = math.cos(lat1)
+    distances = []
+    for lat2, lon2 in zip(lats, lons, strict=True):
+        lat2 = math.radians(lat2)
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + cos_lat1 * math.cos(lat2) * math.sin(math.radians(lon2 - lon) / 2) ** 2
+        )
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
+
+
+class GridIndex:
+    """Index points by a uniform grid of cell_size degree cells.
+
+    A query only looks at the points in the cells that overlap the
+    bounding box of the search circle, then works out the exact
+    distances for those.  This is not thread safe, the owner
+    needs to lock around it.
+    """
+
+    def __init__(self, cell_size: float = 0.5):
+        self.cell_size = cell_size
+        self.rows = math.ceil(180 / cell_size)
+        self.cols = math.ceil(360 / cell_size)
+        # (row, col) -> set of keys
+        self.cells = {}
+        # key -> (lat, lon, (row, col))
+        self.points = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, key):
+        return key in self.points
+
+    def _row(self, lat: float) -> int:
+        return min(self.rows - 1, max(0, int((lat + 90) // self.cell_size)))
+
+    def _col(self, lon: float) -> int:
+        return int((lon + 180) // self.cell_size) % self.cols
+
+    def insert(self, key, lat: float, lon: float) -> None:
+        """Add the point for key, or move it if it's already indexed."""
+        cell = (self._row(lat), self._col(lon))
+        old = self.points.get(key)
+        if old and old[2] != cell:
+            self._remove_from_cell(key, old[2])
+        self.points[key] = (lat, lon, cell)
+        self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key) -> None:
+        old = self.points.pop(key, None)
+        if old:
+            self._remove_from_cell(key, old[2])
+
+    def _remove_from_cell(self, key, cell):
+        keys = self.cells.get(cell)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.cells[cell]
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.points.clear()
+
+    def _cells_for(self, lat: float, lon: float, radius_km: float):
+        """The populated cells that may have points within radius_km."""
+        angle = radius_km / EARTH_RADIUS_KM
+        dlat = math.degrees(angle)
+        row_lo = self._row(lat - dlat)
+        row_hi = self._row(lat + dlat)
+
+        all_cols = lat - dlat <= -90 or lat + dlat >= 90
+        if not all_cols:
+            ratio = math.sin(angle) / math.cos(math.radians(lat))
+            all_cols = angle >= math.pi / 2 or ratio >= 1
+        if all_cols:
+            col_lo, col_hi = 0, self.cols - 1
+        else:
+            dlon = math.degrees(math.asin(ratio))
+            if dlon * 2 >= 360 - self.cell_size:
+                col_lo, col_hi = 0, self.cols - 1
+                all_cols = True
+            else:
+                col_lo = self._col(lon - dlon)
+                col_hi = self._col(lon + dlon)
+
+        def col_in_range(col):
+            if all_cols:
+                return True
+            if col_lo <= col_hi:
+                return col_lo <= col <= col_hi
+            # The range wraps around the date line.
+            return col >= col_lo or col <= col_hi
+
+        if col_lo <= col_hi:
+            ncols = col_hi - col_lo + 1
+        else:
+            ncols = self.cols - col_lo + col_hi + 1
+        if (row_hi - row_lo + 1) * ncols > len(self.cells):
+            # Fewer populated cells than cells in range.
+            return [
+                keys
+                for (row, col), keys in self.cells.items()
+                if row_lo <= row <= row_hi and col_in_range(col)
+            ]
+
+        cells = []
+        for row in range(row_lo, row_hi + 1):
+            col = col_lo
+            for _ in range(ncols):
+                keys = self.cells.get((row, col))
+                if keys:
+                    cells.append(keys)
+                col = (col + 1) % self.cols
+        return cells
+
+    def within(self, lat: float, lon: float, radius_km: float, predicate=None):
+        """The points within radius_km of (lat, lon), nearest first.
+
+        predicate(key) can filter out points.
+        Returns a list of (key, distance_km).
+        """
+        keys = []
+        lats = []
+        lons = []
+        for cell_keys in self._cells_for(lat, lon, radius_km):
+            for key in cell_keys:
+                if predicate and not predicate(key):
+                    continue
+                point = self.points[key]
+                keys.append(key)
+                lats.append(point[0])
+                lons.append(point[1])
+        distances = haversine_km(lat, lon, lats, lons)
+        found = [
+            (key, distance)
+            for key, distance in zip(keys, distances, strict=True)
+            if distance <= radius_km
+        ]
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(self, lat: float, lon: float, k: int = 1, predicate=None):
+        """The k points nearest to (lat, lon), nearest first.
+
+        Searches a radius of one cell, doubling it until k points
+        are found.  Returns a list of (key, distance_km).
+        """
+        if not self.points or k < 1:
+            return []
+        radius_km = self.cell_size * 111.0
+        while True:
+            found = self.within(lat, lon, radius_km, predicate=predicate)
+            if len(found) >= k or radius_km >= MAX_DISTANCE_KM:
+                return found[:k]
+            radius_km = min(radius_km * 2, MAX_DISTANCE_KM)
@@ -0,0 +1,142 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from oslo_config import cfg
+
+CONF = cfg.CONF
+LOG = logging.getLogger('APRSD')
+
+DB_FILENAME = 'aprsd.db'
+
+
+class SQLiteStore:
+    """The sqlite database the object stores are saved to.
+
+    Used by ObjectStoreMixin when the save_backend option is 'sqlite'.
+    Every store gets a table of key, JSON encoded value and the time
+    it was last updated, in <save_location>/aprsd.db.
+
+    The database is in WAL mode, so the stats thread writing a batch
+    of changes doesn't block the rx thread looking up an entry.  Each
+    thread gets its own connection, as sqlite connections can't be
+    shared between threads.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.local = threading.local()
+            cls._instance.tables = set()
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    @property
+    def filename(self):
+        return os.path.join(CONF.save_location, DB_FILENAME)
+
+    def _connection(self):
+        filename = self.filename
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.filename != filename:
+            if conn is not None:
+                conn.close()
+            os.makedirs(CONF.save_location, exist_ok=True)
+            conn = sqlite3.connect(filename, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Durable enough with WAL, and much quicker commits.
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+            self.local.filename = filename
+            with self.lock:
+                self.tables = set()
+        return conn
+
+    def _table(self, conn, table):
+        """Create the table for a store if it doesn't exist yet."""
+        if table in self.tables:
+            return
+        with self.lock:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, updated REAL NOT NULL)'
+            )
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{table}_updated" ON "{table}" (updated)'
+            )
+            self.tables.add(table)
+
+    def write(self, table, records):
+        """Save a batch of changes in a single transaction.
+
+        records is a list of (key, JSON value) pairs, a value of None
+        deletes the key.
+        """
+        if not records:
+            return
+        conn = self._connection()
+        self._table(conn, table)
+        now = time.time()
+        upserts = [(key, value, now) for key, value in records if value is not None]
+        deletes = [(key,) for key, value in records if value is None]
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if upserts:
+                conn.executemany(
+                    f'INSERT OR REPLACE INTO "{table}" (key, value, updated) '
+                    'VALUES (?, ?, ?)',
+                    upserts,
+                )
+            if deletes:
+                conn.executemany(f'DELETE FROM "{table}" WHERE key = ?', deletes)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def get(self, table, key):
+        """The JSON value saved for key, or None."""
+        conn = self._connection()
+        self._table(conn, table)
+        row = conn.execute(
+            f'SELECT value FROM "{table}" WHERE key = ?',
+            (key,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def items(self, table, limit=None):
+        """(key, JSON value) pairs, the most recently updated last.
+
+        With limit, only the limit most recently updated.
+        """
+        conn = self._connection()
+        self._table(conn, table)
+        if limit is None:
+            limit = -1
+        rows = conn.execute(
+            f'SELECT key, value FROM "{table}" ORDER BY updated DESC, rowid DESC LIMIT ?',
+            (limit,),
+        ).fetchall()
+        rows.reverse()
+        return rows
+
+    def count(self, table):
+        conn = self._connection()
+        self._table(conn, table)
+        return conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+    def clear(self, table):
+        conn = self._connection()
+        self._table(conn, table)
+        conn.execute(f'DELETE FROM "{table}"')
+
+    def close(self):
+        """Close the calling thread's connection."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
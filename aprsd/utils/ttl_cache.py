@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread safe, size bounded cache with expiring entries.
+
+    Entries expire ttl seconds after they were set.  When the cache
+    is full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key -> (expires, value)
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.data)
+
+    def __contains__(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key, default=None):
+        """Get the value for key, or default if it's missing or expired."""
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[0] <= time.monotonic():
+                del self.data[key]
+                self.misses += 1
+                return default
+            self.data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float = None) -> None:
+        """Set the value for key.
+
+        ttl overrides the cache's ttl for this entry.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        with self.lock:
+            self.data[key] = (time.monotonic() + ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def remove(self, key) -> None:
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+
+    def expire(self) -> None:
+        """Remove all the expired entries."""
+        now = time.monotonic()
+        with self.lock:
+            expired = [key for key, entry in self.data.items() if entry[0] <= now]
+            for key in expired:
+                del self.data[key]
+
+    def stats(self, serializable=False) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,237 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from oslo_config import cfg
+
+from aprsd.packets import archive, core
+
+CONF = cfg.CONF
+
+
+def message(from_call='KM6LYW', to_call='WB4BOR', msg_no='1', timestamp=1000):
+    packet = core.MessagePacket(
+        from_call=from_call,
+        to_call=to_call,
+        message_text='Hello',
+        msgNo=msg_no,
+        timestamp=timestamp,
+    )
+    packet.prepare()
+    return packet
+
+
+def beacon(from_call='KM6LYW', timestamp=1000):
+    packet = core.BeaconPacket(
+        from_call=from_call,
+        to_call='APZ100',
+        latitude=37.5,
+        longitude=-122.25,
+        comment='Hello',
+        timestamp=timestamp,
+    )
+    packet.prepare()
+    return packet
+
+
+class TestPacketArchive(unittest.TestCase):
+    def setUp(self):
+        archive.PacketArchive._instance = None
+        self.save_location = tempfile.mkdtemp()
+        CONF.set_override('enable_packet_archive', True)
+        CONF.set_override('packet_archive_size', 8)
+        CONF.set_override('packet_archive_raw_size', 1024)
+        # Other tests set these as attributes, which hides an override.
+        self.addCleanup(setattr, CONF, 'enable_save', CONF.enable_save)
+        self.addCleanup(setattr, CONF, 'save_location', CONF.save_location)
+        CONF.enable_save = False
+        CONF.save_location = self.save_location
+        self.archive = archive.PacketArchive()
+
+    def tearDown(self):
+        self.archive.close()
+        archive.PacketArchive._instance = None
+        for name in (
+            'enable_packet_archive',
+            'packet_archive_size',
+            'packet_archive_raw_size',
+        ):
+            CONF.clear_override(name)
+        shutil.rmtree(self.save_location)
+
+    def test_disabled(self):
+        CONF.set_override('enable_packet_archive', False)
+        self.archive.rx(message())
+        self.assertEqual(0, len(self.archive))
+        self.assertEqual([], self.archive.rows())
+        self.assertEqual({'enabled': False, 'size': 0}, self.archive.stats())
+
+    def test_rx_and_tx(self):
+        rx_packet = message()
+        tx_packet = beacon(from_call='N0CALL', timestamp=1001)
+        self.archive.rx(rx_packet)
+        self.archive.tx(tx_packet)
+        self.assertEqual(2, len(self.archive))
+        first, second = self.archive.rows()
+        self.assertEqual(
+            archive.ArchivedPacket(
+                timestamp=1000,
+                from_call='KM6LYW',
+                to_call='WB4BOR',
+                packet_type='MessagePacket',
+                latitude=None,
+                longitude=None,
+                msgNo='1',
+                tx=False,
+                raw=rx_packet.raw,
+            ),
+            first,
+        )
+        self.assertEqual('N0CALL', second.from_call)
+        self.assertEqual('BeaconPacket', second.packet_type)
+        self.assertEqual(37.5, second.latitude)
+        self.assertEqual(-122.25, second.longitude)
+        self.assertIsNone(second.msgNo)
+        self.assertTrue(second.tx)
+        self.assertEqual(tx_packet.raw, second.raw)
+
+    def test_lazy_packet_isnt_decoded(self):
+        CONF.set_override('enable_lazy_packet_decode', True)
+        self.addCleanup(CONF.clear_override, 'enable_lazy_packet_decode')
+        packet = core.factory('KM6LYW>APZ100:>status')
+        self.archive.rx(packet)
+        self.assertFalse(packet.decoded)
+        (row,) = self.archive.rows()
+        self.assertEqual('StatusPacket', row.packet_type)
+        self.assertEqual(int(packet.timestamp), int(row.timestamp))
+
+    def test_ring(self):
+        for i in range(20):
+            self.archive.rx(message(from_call=f'CALL{i}', timestamp=1000 + i))
+        self.assertEqual(8, len(self.archive))
+        rows = self.archive.rows()
+        self.assertEqual(
+            [f'CALL{i}' for i in range(12, 20)], [r.from_call for r in rows]
+        )
+        self.assertEqual(sorted(r.timestamp for r in rows), [r.timestamp for r in rows])
+        # The callsigns of the overwritten rows were freed.
+        self.assertEqual(9, self.archive.stats()['callsigns'])
+        self.assertEqual(20, self.archive.stats()['written'])
+
+    def test_raw_ring(self):
+        CONF.set_override('packet_archive_raw_size', 100)
+        packets = [message(msg_no=str(i), timestamp=1000 + i) for i in range(8)]
+        for packet in packets:
+            self.archive.rx(packet)
+        rows = self.archive.rows()
+        # Only the newest raw text fits in 100 bytes.
+        self.assertIsNone(rows[0].raw)
+        self.assertEqual(packets[-1].raw, rows[-1].raw)
+        kept = [row.raw for row in rows if row.raw]
+        self.assertLessEqual(sum(len(raw) for raw in kept), 100)
+        self.assertEqual([p.raw for p in packets[-len(kept) :]], kept)
+
+    def test_rows_filters(self):
+        self.archive.rx(message(from_call='KM6LYW', timestamp=1000))
+        self.archive.rx(beacon(from_call='KM6LYW', timestamp=1060))
+        self.archive.rx(message(from_call='N0CALL', timestamp=1120))
+        self.archive.tx(message(from_call='WB4BOR', to_call='KM6LYW', timestamp=1180))
+
+        self.assertEqual(2, len(self.archive.rows(from_call='km6lyw')))
+        self.assertEqual([], self.archive.rows(from_call='NOBODY'))
+        self.assertEqual(
+            ['KM6LYW', 'N0CALL'],
+            [r.from_call for r in self.archive.rows(to_call='WB4BOR')],
+        )
+        self.assertEqual(
+            [1060, 1120],
+            [r.timestamp for r in self.archive.rows(start=1060, end=1180)],
+        )
+        self.assertEqual(
+            ['BeaconPacket'],
+            [r.packet_type for r in self.archive.rows(packet_type='BeaconPacket')],
+        )
+        self.assertEqual([1180], [r.timestamp for r in self.archive.rows(limit=1)])
+        self.assertEqual([], self.archive.rows(limit=0))
+
+    def test_counts(self):
+        self.archive.rx(message(timestamp=1000))
+        self.archive.rx(message(timestamp=1010))
+        self.archive.rx(beacon(timestamp=1030))
+        self.archive.rx(beacon(timestamp=1090))
+        self.assertEqual(
+            {
+                960: {'MessagePacket': 2},
+                1020: {'BeaconPacket': 1},
+                1080: {'BeaconPacket': 1},
+            },
+            self.archive.counts(),
+        )
+        self.assertEqual(
+            {1020: {'BeaconPacket': 1}},
+            self.archive.counts(interval=60, start=1020, end=1080),
+        )
+
+    def test_flush(self):
+        self.archive.rx(message())
+        self.archive.flush()
+        self.assertEqual(0, len(self.archive))
+        self.assertEqual(0, self.archive.stats()['callsigns'])
+        self.archive.rx(message(from_call='N0CALL'))
+        self.assertEqual(['N0CALL'], [r.from_call for r in self.archive.rows()])
+
+    def test_persistence(self):
+        CONF.enable_save = True
+        for i in range(10):
+            self.archive.rx(message(from_call=f'CALL{i % 3}', timestamp=1000 + i))
+        expected = self.archive.rows()
+        self.archive.save()
+        self.archive.close()
+        filename = os.path.join(self.save_location, 'packetarchive.bin')
+        self.assertEqual(self.archive.filename, filename)
+
+        archive.PacketArchive._instance = None
+        self.archive = archive.PacketArchive()
+        self.archive.load()
+        self.assertEqual(expected, self.archive.rows())
+        # CALL0, CALL1, CALL2 and WB4BOR.
+        self.assertEqual(4, self.archive.stats()['callsigns'])
+        self.archive.rx(message(from_call='CALL1', timestamp=2000))
+        self.assertEqual(3, len(self.archive.rows(from_call='CALL1')))
+
+    def test_persistence_size_changed(self):
+        CONF.enable_save = True
+        self.archive.rx(message())
+        self.archive.close()
+
+        CONF.set_override('packet_archive_size', 16)
+        archive.PacketArchive._instance = None
+        self.archive = archive.PacketArchive()
+        self.archive.load()
+        self.assertEqual(0, len(self.archive))
+        self.assertEqual(16, self.archive.stats()['max_size'])
+
+    def test_bounded_footprint(self):
+        CONF.set_override('packet_archive_size', 1000)
+        CONF.set_override('packet_archive_raw_size', 10000)
+        for i in range(3000):
+            self.archive.rx(beacon(from_call=f'CALL{i}', timestamp=1000 + i))
+        stats = self.archive.stats()
+        self.assertEqual(1000, stats['size'])
+        # The beacons' callsigns and their shared APZ100 to_call.
+        self.assertEqual(1001, stats['callsigns'])
+        self.assertLess(stats['bytes'], 1000 * 65 + 10000)
+        self.assertEqual(1000, len(self.archive.rows(start=3000)))
+
+    def test_no_numpy(self):
+        CONF.set_override('packet_archive_size', 1000)
+        for i in range(600):
+            self.archive.rx(message(from_call=f'CALL{i % 7}', timestamp=1000 + i))
+        rows = self.archive.rows(from_call='CALL3', start=1100)
+        counts = self.archive.counts()
+        with mock.patch.object(archive, 'numpy', None):
+            self.assertEqual(rows, self.archive.rows(from_call='CALL3', start=1100))
+            self.assertEqual(counts, self.archive.counts())
+        self.assertEqual(600, sum(c['MessagePacket'] for c in counts.values()))
@@ -0,0 +1,283 @@
+import copy
+import dataclasses
+import json
+import pickle
+import time
+import unittest
+from unittest import mock
+
+import aprslib
+from aprslib.exceptions import ParseError
+from oslo_config import cfg
+
+from aprsd import packets
+from aprsd.client.drivers import kiss_common
+from aprsd.packets import core
+from aprsd.packets.filters import dupe_filter, packet_type
+from aprsd.utils.json import SimpleJSONEncoder
+
+CONF = cfg.CONF
+
+BEACON = (
+    'KM6LYW-9>APDR16,TCPIP*,qAC,T2TEXAS:=3728.52N/12201.34W>326/000/A=000106 '
+    'https://aprsdroid.org/'
+)
+MESSAGE = 'KM6LYW>APZ100,WIDE2-1::WB4BOR   :Hello there{12'
+MICE = 'N0CALL>S32U6T,WIDE1-1:`(_fn"Oj/]Test'
+WEATHER = (
+    'KD6ABC>APRS,TCPIP*,qAC,T2:@092345z4903.50N/07201.75W_220/004g005t077r000'
+    'p000P000h50b09900wRSW'
+)
+THIRDPARTY = 'KM6LYW>APZ100:}WB4BOR>APZ100,TCPIP,KM6LYW*::KM6LYW   :hello{1'
+# The header is fine, but aprslib can't decode the body.
+BAD_BODY = 'KM6LYW>APZ100:!not a position'
+
+
+class TestParseHeader(unittest.TestCase):
+    def test_same_as_aprslib(self):
+        for line in (BEACON, MESSAGE, MICE, WEATHER, THIRDPARTY):
+            with self.subTest(line=line):
+                parsed = aprslib.parse(line)
+                header = core.parse_header(line)
+                self.assertEqual(parsed['from'], header['from_call'])
+                self.assertEqual(parsed['to'], header['to_call'])
+                self.assertEqual(parsed['path'], header['path'])
+                self.assertEqual(parsed['via'], header['via'])
+                self.assertEqual(parsed['raw'], header['raw'])
+                self.assertEqual(line.split(':', 1)[1][0], header['data_type'])
+
+    def test_bytes(self):
+        header = core.parse_header(f'{BEACON}\r\n'.encode())
+        self.assertEqual(BEACON, header['raw'])
+
+    def test_bad_headers(self):
+        for line in (
+            'KM6LYW>APZ100',
+            'KM6LYW>APZ100:',
+            'KM6LYWAPZ100:>hi',
+            'KM6LYW-TOOLONG1>APZ100:>hi',
+            'KM6LYW>apz100:>hi',
+            'KM6LYW>APZ100-16:>hi',
+            'KM6LYW>APZ100,WIDE2_1:>hi',
+        ):
+            with self.subTest(line=line):
+                self.assertRaises(ParseError, aprslib.parse, line)
+                self.assertRaises(ParseError, core.parse_header, line)
+
+
+class TestLazyPacket(unittest.TestCase):
+    def setUp(self):
+        CONF.set_override('enable_lazy_packet_decode', True)
+
+    def tearDown(self):
+        CONF.clear_override('enable_lazy_packet_decode')
+
+    def test_disabled(self):
+        CONF.set_override('enable_lazy_packet_decode', False)
+        packet = core.factory(BEACON)
+        self.assertIs(core.BeaconPacket, type(packet))
+
+    def test_header_fields_dont_decode(self):
+        packet = core.factory(MICE)
+        self.assertIs(core.LazyPacket, type(packet))
+        self.assertEqual('N0CALL', packet.from_call)
+        self.assertEqual('S32U6T', packet.to_call)
+        self.assertEqual(['WIDE1-1'], packet.path)
+        self.assertEqual('', packet.via)
+        self.assertEqual('`', packet.data_type)
+        self.assertEqual(MICE, packet.raw)
+        self.assertIsNone(packet.addresse)
+        self.assertIsNone(packet.msgNo)
+        self.assertIsNone(packet.ackMsgNo)
+        self.assertIn('N0CALL', repr(packet))
+        self.assertFalse(packet.decoded)
+
+    def test_decodes_the_same_packet(self):
+        for line in (BEACON, MESSAGE, MICE, WEATHER):
+            with self.subTest(line=line):
+                lazy = core.factory(line)
+                expected = core.factory(aprslib.parse(line))
+                self.assertIsInstance(lazy, type(expected))
+                self.assertTrue(lazy.decoded)
+                self.assertIs(type(expected), lazy.__class__)
+                self.assertEqual(expected, lazy)
+                self.assertEqual(lazy, expected)
+                self.assertEqual(hash(expected), hash(lazy))
+                self.assertEqual(expected.human_info, lazy.human_info)
+                self.assertEqual(expected.to_call, lazy.to_call)
+                self.assertEqual(str(expected), str(lazy))
+
+    def test_key(self):
+        packet = core.factory(MESSAGE)
+        self.assertEqual(core.factory(aprslib.parse(MESSAGE)).key, packet.key)
+        for line in (BEACON, MICE, WEATHER):
+            with self.subTest(line=line):
+                packet = core.factory(line)
+                key = f'{packet.from_call}:{line.split(":", 1)[1]}'
+                self.assertEqual(key, packet.key)
+                self.assertFalse(packet.decoded)
+                packet.decode()
+                self.assertEqual(key, packet.key)
+
+    def test_header_class(self):
+        for line in (
+            BEACON,
+            MICE,
+            WEATHER,
+            'KM6LYW>APZ100:!/5L!!<*e7_7P[',
+            'KM6LYW>APZ100:=4903.50N/07201.75W_220/004g005t077',
+            'KM6LYW>APZ100:_10090556c220s004g005t077r000p000h50b09900',
+            'KM6LYW>APZ100:>status',
+            'KM6LYW>APZ100:;LEADER   *092345z4903.50N/07201.75W>088/036',
+            'KM6LYW>APZ100:;LEADER   *092345z/5L!!<*e7_ sT',
+        ):
+            with self.subTest(line=line):
+                packet = core.factory(line)
+                expected = type(core.factory(aprslib.parse(line)))
+                self.assertIs(expected, packet.header_class)
+                self.assertIs(expected, core.packet_class(packet))
+                self.assertFalse(packet.decoded)
+        # Messages have to be decoded.
+        packet = core.factory(MESSAGE)
+        self.assertIs(core.MessagePacket, core.packet_class(packet))
+        self.assertTrue(packet.decoded)
+        # The header says beacon, but it didn't decode.
+        packet = core.factory(BAD_BODY)
+        self.assertIs(core.BeaconPacket, core.packet_class(packet))
+        packet.decode()
+        self.assertIs(core.UnknownPacket, core.packet_class(packet))
+        self.assertIs(core.MessagePacket, core.packet_class(core.MessagePacket()))
+
+    def test_class_consumers(self):
+        """type() is always LazyPacket, __class__ is the decoded class."""
+        packet = core.factory(BEACON)
+        self.assertIs(core.LazyPacket, type(packet))
+        self.assertIs(core.BeaconPacket, core.packet_class(packet))
+        self.assertFalse(packet.decoded)
+        # Any isinstance() check decodes it, even for an unrelated class.
+        self.assertNotIsInstance(packet, int)
+        self.assertTrue(packet.decoded)
+        self.assertIs(core.BeaconPacket, packet.__class__)
+        self.assertIs(core.LazyPacket, type(packet))
+        self.assertEqual('BeaconPacket', packet.__class__.__name__)
+        self.assertIsInstance(packet, core.GPSPacket)
+        self.assertIsInstance(packet, core.LazyPacket)
+        # dataclasses go by type(), but the JSON encoder checks for a
+        # Packet first, so a LazyPacket is encoded as the decoded packet.
+        self.assertFalse(dataclasses.is_dataclass(packet))
+        self.assertEqual(
+            json.dumps(packet.decode(), cls=SimpleJSONEncoder),
+            json.dumps(packet, cls=SimpleJSONEncoder),
+        )
+
+    def test_message_fields_decode(self):
+        packet = core.factory(MESSAGE)
+        self.assertFalse(packet.decoded)
+        self.assertEqual('12', packet.msgNo)
+        self.assertTrue(packet.decoded)
+        self.assertEqual('WB4BOR', packet.to_call)
+        self.assertEqual('Hello there', packet.message_text)
+
+    def test_timestamp(self):
+        # When it was received, for packets without their own timestamp.
+        for line in (BEACON, MICE, 'KM6LYW>APZ100:>status'):
+            with self.subTest(line=line):
+                packet = core.factory(line)
+                timestamp = packet.timestamp
+                self.assertFalse(packet.decoded)
+                self.assertEqual(timestamp, packet.decode().timestamp)
+        # Otherwise the packet is decoded for its timestamp.
+        for line in (WEATHER, 'KM6LYW>APZ100:>092345zstatus'):
+            with self.subTest(line=line):
+                packet = core.factory(line)
+                self.assertEqual(aprslib.parse(line)['timestamp'], packet.timestamp)
+                self.assertTrue(packet.decoded)
+
+    def test_set_before_decode(self):
+        packet = core.factory(BEACON)
+        packet.processed = True
+        packet.path = ['WIDE1-1']
+        self.assertTrue(packet.processed)
+        self.assertEqual(['WIDE1-1'], packet.path)
+        self.assertFalse(packet.decoded)
+        decoded = packet.decode()
+        self.assertTrue(decoded.processed)
+        self.assertEqual(['WIDE1-1'], decoded.path)
+        self.assertEqual(packet._header['timestamp'], decoded.timestamp)
+        packet.comment = 'changed'
+        self.assertEqual('changed', decoded.comment)
+
+    def test_thirdparty_isnt_lazy(self):
+        packet = core.factory(THIRDPARTY)
+        self.assertIs(core.ThirdPartyPacket, type(packet))
+
+    def test_bad_body(self):
+        self.assertRaises(ParseError, core.factory, 'KM6LYW>APZ100')
+        packet = core.factory(BAD_BODY)
+        self.assertEqual('KM6LYW', packet.from_call)
+        self.assertIsInstance(packet, core.UnknownPacket)
+        self.assertEqual(BAD_BODY, packet.raw)
+
+    def test_copy_and_pickle(self):
+        packet = core.factory(BEACON)
+        for other in (copy.copy(packet), pickle.loads(pickle.dumps(packet))):
+            self.assertIs(core.BeaconPacket, type(other))
+            self.assertEqual(packet, other)
+
+    def test_dupe_filter_doesnt_decode(self):
+        with mock.patch.object(packets, 'PacketList'):
+            dupes = dupe_filter.DupePacketFilter()
+        packet = core.factory(MICE)
+        self.assertIs(packet, dupes.filter(packet))
+        self.assertFalse(packet.decoded)
+        dupes.pl.find.assert_not_called()
+
+    def test_packet_type_filter(self):
+        type_filter = packet_type.PacketTypeFilter()
+        self.addCleanup(setattr, type_filter, 'allow_list', ())
+        type_filter.set_allow_list(['MessagePacket', 'GPSPacket'])
+        packet = core.factory(MICE)
+        self.assertIs(packet, type_filter.filter(packet))
+        packet = core.factory('KM6LYW>APZ100:>status')
+        self.assertIsNone(type_filter.filter(packet))
+        self.assertFalse(packet.decoded)
+
+    def test_collectors_dont_decode(self):
+        packet = core.factory('KM6LYW>APZ100:>status')
+        for monitor in (
+            packets.SeenList,
+            packets.PacketTrack,
+            packets.WatchList,
+            packets.PositionList,
+            packets.WXList,
+        ):
+            with self.subTest(monitor=monitor):
+                monitor().rx(packet)
+                self.assertFalse(packet.decoded)
+
+        pl = packets.PacketList()
+        before = pl.data['types'].get('StatusPacket', {}).get('rx', 0)
+        pl.rx(packet)
+        self.assertFalse(packet.decoded)
+        self.assertEqual(before + 1, pl.data['types']['StatusPacket']['rx'])
+        self.assertIs(packet, pl.find(packet))
+
+    def test_kiss_driver(self):
+        driver = kiss_common.KISSDriver()
+        packet = driver.decode_packet(MICE)
+        self.assertIs(core.LazyPacket, type(packet))
+        self.assertFalse(packet.decoded)
+        packet = driver.decode_packet(THIRDPARTY)
+        self.assertIs(core.MessagePacket, type(packet))
+
+    def test_header_is_faster(self):
+        count = 500
+        start = time.perf_counter()
+        for _ in range(count):
+            core.factory(aprslib.parse(MICE))
+        decode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(count):
+            self.assertTrue(core.factory(MICE).from_call)
+        lazy_time = time.perf_counter() - start
+        self.assertLess(lazy_time * 3, decode_time)
@@ -0,0 +1,124 @@
+import unittest
+from unittest import mock
+
+import aprslib
+
+from aprsd.packets import core
+
+BEACON = (
+    'KM6LYW-9>APDR16,TCPIP*,qAC,T2TEXAS:=3728.52N/12201.34W>326/000/A=000106 '
+    'https://aprsdroid.org/'
+)
+
+
+class TestPacketCache(unittest.TestCase):
+    def _message(self):
+        return core.MessagePacket(
+            from_call='KM6LYW',
+            to_call='WB4BOR',
+            message_text='Hello',
+            msgNo='12',
+        )
+
+    def test_prepare_is_cached(self):
+        packet = self._message()
+        with mock.patch.object(
+            core.MessagePacket,
+            '_build_payload',
+            autospec=True,
+            side_effect=core.MessagePacket._build_payload,
+        ) as build:
+            packet.prepare()
+            packet.prepare()
+            str(packet)
+            self.assertEqual(1, build.call_count)
+        self.assertEqual('KM6LYW>APZ100::WB4BOR   :Hello{12', packet.raw)
+
+    def test_prepare_restores_raw(self):
+        packet = self._message()
+        packet.prepare()
+        packet.raw = None
+        packet.prepare()
+        self.assertEqual('KM6LYW>APZ100::WB4BOR   :Hello{12', packet.raw)
+
+    def test_human_info_and_key_are_cached(self):
+        packet = core.factory(aprslib.parse(BEACON))
+        self.assertIs(core.BeaconPacket, type(packet))
+        human_info = packet.human_info
+        key = packet.key
+        self.assertIs(human_info, packet.human_info)
+        self.assertIs(key, packet.key)
+
+    def test_subclass_human_info_isnt_mixed_up(self):
+        # MicEPacket.human_info uses GPSPacket.human_info.
+        packet = core.MicEPacket(
+            from_call='KM6LYW',
+            latitude=37.0,
+            longitude=-122.0,
+            mbits='110',
+        )
+        self.assertTrue(packet.human_info.endswith(' 110 mbits'))
+        self.assertEqual(packet.human_info, packet.human_info)
+        self.assertTrue(packet.key.endswith('110mbits'))
+
+    def test_field_change_clears_cache(self):
+        packet = self._message()
+        self.assertEqual('Hello', packet.human_info)
+        self.assertEqual('KM6LYW:None:12', packet.key)
+        packet.message_text = 'Goodbye'
+        packet.addresse = 'WB4BOR'
+        self.assertEqual('Goodbye', packet.human_info)
+        self.assertEqual('KM6LYW:WB4BOR:12', packet.key)
+        self.assertEqual('KM6LYW>APZ100::WB4BOR   :Goodbye{12', str(packet))
+
+    def test_received_packet_change_clears_cache(self):
+        packet = core.factory(aprslib.parse(BEACON))
+        key = packet.key
+        packet.comment = 'new comment'
+        self.assertNotEqual(key, packet.key)
+        self.assertIn('new comment', packet.human_info)
+
+    def test_timestamp_change_clears_cache(self):
+        packet = core.GPSPacket(
+            from_call='KM6LYW',
+            to_call='APZ100',
+            latitude=37.0,
+            longitude=-122.0,
+            timestamp=1700000000,
+        )
+        packet.prepare()
+        self.assertTrue(packet.payload.startswith('@142213'))
+        packet.timestamp = 1700100000
+        packet.prepare()
+        self.assertTrue(packet.payload.startswith('@160200'))
+
+    def test_create_msg_number(self):
+        packet = self._message()
+        packet.msgNo = None
+        packet.prepare()
+        self.assertEqual('KM6LYW>APZ100::WB4BOR   :Hello', packet.raw)
+        packet.prepare(create_msg_number=True)
+        self.assertIsNotNone(packet.msgNo)
+        self.assertTrue(packet.raw.endswith(f'{{{packet.msgNo}'))
+
+    def test_send_fields_keep_cache(self):
+        packet = self._message()
+        packet.prepare()
+        cache = packet._cache
+        packet.send_count += 1
+        packet.last_send_time = 10
+        packet.acked = True
+        packet.path = ['WIDE1-1']
+        self.assertIs(cache, packet._cache)
+
+    def test_cache_isnt_serialized_or_compared(self):
+        packet = self._message()
+        other = self._message()
+        packet.prepare()
+        other.prepare()
+        self.assertNotIn('_cache', packet.to_dict())
+        self.assertEqual(packet, other)
+        self.assertEqual(hash(packet), hash(other))
+        loaded = core.MessagePacket.from_dict(packet.to_dict())
+        self.assertIsNone(loaded._cache)
+        self.assertEqual(packet.raw, loaded.raw)
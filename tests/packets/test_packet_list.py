@@ -1,3 +1,4 @@
+import threading
 import unittest
 from collections import OrderedDict
 
@@ -191,3 +192,70 @@ class TestPacketList(unittest.TestCase):
         self.assertIn(packet_type, stats['types'])
         self.assertEqual(stats['types'][packet_type]['rx'], 2)
         self.assertEqual(stats['types'][packet_type]['tx'], 1)
+
+    def test_stats_snapshot(self):
+        """Test stats() reuses its snapshot until a packet is added."""
+        pl = packet_list.PacketList()
+        packet = fake.fake_packet(message='test1', msg_number='1')
+        pl.rx(packet)
+
+        stats = pl.stats()
+        self.assertIs(stats['types'], pl.stats()['types'])
+        pl.rx(fake.fake_packet(message='test2', msg_number='2'))
+        new_stats = pl.stats()
+        # The earlier stats don't change under the caller.
+        packet_type = packet.__class__.__name__
+        self.assertEqual(stats['types'][packet_type]['rx'], 1)
+        self.assertEqual(new_stats['types'][packet_type]['rx'], 2)
+        self.assertEqual(new_stats['packet_count'], 2)
+
+        # The data being replaced, like by load(), drops the snapshot.
+        pl.data = {'types': {}, 'packets': OrderedDict()}
+        self.assertEqual(pl.stats()['packet_count'], 0)
+
+    def test_stats_packets(self):
+        """Test the packets in stats() honor packet_list_stats_maxlen."""
+        pl = packet_list.PacketList()
+        added = [
+            fake.fake_packet(message=f'test{i}', msg_number=str(i)) for i in range(5)
+        ]
+        for packet in added:
+            pl.rx(packet)
+
+        CONF.packet_list_stats_maxlen = 2
+        self.assertEqual(pl.stats()['packets'], [added[4], added[3]])
+        CONF.packet_list_stats_maxlen = -1
+        pkts = pl.stats()['packets']
+        self.assertIsInstance(pkts, OrderedDict)
+        self.assertEqual(list(pkts.values()), added)
+        self.assertIsNot(pkts, pl.data['packets'])
+        CONF.packet_list_stats_maxlen = 20
+
+    def test_stats_while_adding(self):
+        """Test stats() from other threads while packets are added."""
+        pl = packet_list.PacketList()
+        done = threading.Event()
+        errors = []
+
+        def collect():
+            while not done.is_set():
+                try:
+                    stats = pl.stats()
+                    self.assertLessEqual(len(stats['packets']), 20)
+                    self.assertEqual(stats['total_tracked'], stats['rx'])
+                except Exception as ex:
+                    errors.append(ex)
+                    return
+
+        threads = [threading.Thread(target=collect) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for i in range(2000):
+            pl.rx(fake.fake_packet(message=f'test{i}', msg_number=str(i)))
+        done.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(pl.stats()['rx'], 2000)
+        self.assertEqual(pl.stats()['packet_count'], 100)
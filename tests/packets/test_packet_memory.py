@@ -0,0 +1,139 @@
+import dataclasses
+import itertools
+import tracemalloc
+import unittest
+
+import aprslib
+from oslo_config import cfg
+
+from aprsd.packets import core
+
+CONF = cfg.CONF
+
+# How many packets to build for each measurement.
+COUNT = 1000
+
+PACKET_CLASSES = [
+    core.Packet,
+    core.AckPacket,
+    core.BulletinPacket,
+    core.RejectPacket,
+    core.MessagePacket,
+    core.StatusPacket,
+    core.GPSPacket,
+    core.BeaconPacket,
+    core.MicEPacket,
+    core.TelemetryPacket,
+    core.ObjectPacket,
+    core.WeatherPacket,
+    core.ThirdPartyPacket,
+]
+
+# A mix of the packets seen on an APRS-IS feed.
+FEED = [
+    'KM6LYW-9>APDR16,TCPIP*,qAC,T2TEXAS:=3728.52N/12201.34W>326/000/A=000106 '
+    'https://aprsdroid.org/',
+    'KM6LYW>APZ100,WIDE2-1::WB4BOR   :Hello there{12',
+    'KD6ABC>APRS,TCPIP*,qAC,T2:@092345z4903.50N/07201.75W_220/004g005t077r000'
+    'p000P000h50b09900wRSW',
+    'N0CALL>S32U6T,WIDE1-1:`(_fn"Oj/]Test',
+    'KM6LYW>APZ100:>I am here',
+    'WB4BOR>APZ100::BLN1     :Net tonight at 8pm',
+]
+
+
+def bytes_per_object(build, count=COUNT) -> float:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        keep = [build() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(keep) == count
+    return (after - before) / count
+
+
+class TestPacketMemory(unittest.TestCase):
+    """The packet classes use __slots__, there is no per packet __dict__."""
+
+    def test_no_instance_dict(self):
+        for cls in PACKET_CLASSES:
+            with self.subTest(cls=cls.__name__):
+                packet = cls(from_call='KM6LYW', to_call='APZ100', msgNo='1')
+                self.assertFalse(hasattr(packet, '__dict__'))
+                with self.assertRaises(AttributeError):
+                    packet.not_a_field = True
+
+    def test_memory_per_packet_type(self):
+        """Compare each packet class against the same fields in a __dict__."""
+        for cls in PACKET_CLASSES:
+            with self.subTest(cls=cls.__name__):
+                packet = cls(from_call='KM6LYW', to_call='APZ100', msgNo='1')
+                values = {
+                    f.name: getattr(packet, f.name)
+                    for f in dataclasses.fields(packet)
+                    if f.init
+                }
+                twin = dataclasses.make_dataclass(f'Dict{cls.__name__}', list(values))
+                slots_size = bytes_per_object(lambda: cls(**values))  # noqa: B023
+                dict_size = bytes_per_object(lambda: twin(**values))  # noqa: B023
+                if issubclass(cls, core.GPSPacket):
+                    # Too many fields for a key sharing __dict__.
+                    self.assertLess(slots_size * 2, dict_size)
+                else:
+                    self.assertLess(slots_size, dict_size)
+
+    def test_dict_round_trip(self):
+        packet = core.WeatherPacket(
+            from_call='KM6LYW',
+            to_call='APRS',
+            latitude=37.4,
+            longitude=-122.0,
+            temperature=72.0,
+            humidity=40,
+        )
+        copy = core.factory(packet.to_dict())
+        self.assertIsInstance(copy, core.WeatherPacket)
+        self.assertEqual(packet.to_dict(), copy.to_dict())
+
+
+class TestRawDict(unittest.TestCase):
+    """raw_dict is only kept with enable_packet_raw_dict."""
+
+    def tearDown(self):
+        CONF.clear_override('enable_packet_raw_dict')
+
+    def test_not_kept_by_default(self):
+        packet = core.factory(aprslib.parse(FEED[0]))
+        self.assertIsNone(packet.raw_dict)
+        raw_dict = packet.get_raw_dict()
+        self.assertEqual(aprslib.parse(FEED[0]), raw_dict)
+        # Only parsed the first time.
+        self.assertIs(raw_dict, packet.get_raw_dict())
+
+    def test_enabled(self):
+        CONF.set_override('enable_packet_raw_dict', True)
+        raw = aprslib.parse(FEED[2])
+        packet = core.factory(dict(raw))
+        self.assertEqual(raw, packet.raw_dict)
+        self.assertIs(packet.raw_dict, packet.get_raw_dict())
+
+    def test_no_raw(self):
+        packet = core.MessagePacket(from_call='KM6LYW', to_call='WB4BOR')
+        self.assertEqual({}, packet.get_raw_dict())
+        packet = core.UnknownPacket(unknown_fields={}, raw='garbage')
+        self.assertEqual({}, packet.get_raw_dict())
+
+    def test_feed_memory(self):
+        """The packets from a feed use a lot less memory without raw_dict."""
+
+        sizes = {}
+        for enabled in (True, False):
+            CONF.set_override('enable_packet_raw_dict', enabled)
+            lines = itertools.cycle(FEED)
+            sizes[enabled] = bytes_per_object(
+                lambda: core.factory(aprslib.parse(next(lines))),  # noqa: B023
+                count=len(FEED) * 50,
+            )
+        self.assertLess(sizes[False] * 1.5, sizes[True])
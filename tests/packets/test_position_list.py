@@ -0,0 +1,167 @@
+import time
+import unittest
+from unittest import mock
+
+from oslo_config import cfg
+
+from aprsd import plugin_utils
+from aprsd.packets import core, position_list
+from tests import fake
+
+CONF = cfg.CONF
+
+
+class TestPositionList(unittest.TestCase):
+    """Unit tests for the PositionList class."""
+
+    def setUp(self):
+        position_list.PositionList._instance = None
+        CONF.position_list_max_size = 5000
+        CONF.position_list_max_age = 3600
+
+    def tearDown(self):
+        position_list.PositionList._instance = None
+        CONF.position_list_max_size = 5000
+        CONF.position_list_max_age = 3600
+
+    def test_singleton_pattern(self):
+        self.assertIs(position_list.PositionList(), position_list.PositionList())
+
+    def test_rx_gps_packet(self):
+        pl = position_list.PositionList()
+        packet = fake.fake_gps_packet()
+        pl.rx(packet)
+
+        position = pl.get(fake.FAKE_FROM_CALLSIGN.lower())
+        self.assertEqual(37.7749, position.latitude)
+        self.assertEqual(-122.4194, position.longitude)
+        self.assertEqual('/>', position.symbol)
+        self.assertEqual(packet.timestamp, position.timestamp)
+
+    def test_rx_ignored_packets(self):
+        pl = position_list.PositionList()
+        pl.rx(fake.fake_packet())
+        pl.rx(core.GPSPacket(from_call='KNOPOS', to_call='APZ100'))
+        pl.rx(
+            core.ObjectPacket(
+                from_call='KOBJ',
+                to_call='APZ100',
+                latitude=10.0,
+                longitude=10.0,
+            ),
+        )
+        self.assertEqual(0, len(pl))
+
+    def test_get_miss_and_stats(self):
+        pl = position_list.PositionList()
+        self.assertIsNone(pl.get('KNOTHERE'))
+        pl.rx(fake.fake_gps_packet())
+        pl.get(fake.FAKE_FROM_CALLSIGN)
+        stats = pl.stats()
+        self.assertEqual(1, stats['size'])
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    def test_expired(self):
+        pl = position_list.PositionList()
+        packet = fake.fake_gps_packet()
+        packet.timestamp = time.time() - 100
+        pl.rx(packet)
+        CONF.position_list_max_age = 50
+        self.assertIsNone(pl.get(fake.FAKE_FROM_CALLSIGN))
+        self.assertEqual(0, len(pl))
+
+    def test_max_size(self):
+        CONF.position_list_max_size = 2
+        pl = position_list.PositionList()
+        for callsign in ('K1', 'K2', 'K3'):
+            pl.rx(
+                core.GPSPacket(
+                    from_call=callsign,
+                    to_call='APZ100',
+                    latitude=1.0,
+                    longitude=2.0,
+                ),
+            )
+        self.assertIsNone(pl.get('K1'))
+        self.assertIsNotNone(pl.get('K3'))
+
+    def test_flush(self):
+        pl = position_list.PositionList()
+        pl.rx(fake.fake_gps_packet())
+        pl.flush()
+        self.assertEqual(0, len(pl))
+
+
+class TestGetLocation(unittest.TestCase):
+    def setUp(self):
+        position_list.PositionList._instance = None
+
+    def tearDown(self):
+        position_list.PositionList._instance = None
+
+    @mock.patch('aprsd.plugin_utils.get_aprs_fi')
+    def test_position_list_first(self, mock_aprs_fi):
+        position_list.PositionList().rx(fake.fake_gps_packet())
+        location = plugin_utils.get_location('key', fake.FAKE_FROM_CALLSIGN)
+        self.assertEqual((37.7749, -122.4194), location)
+        mock_aprs_fi.assert_not_called()
+
+    @mock.patch('aprsd.plugin_utils.get_aprs_fi')
+    def test_fall_back_to_aprs_fi(self, mock_aprs_fi):
+        mock_aprs_fi.return_value = {'entries': [{'lat': 1.5, 'lng': 2.5}]}
+        self.assertEqual((1.5, 2.5), plugin_utils.get_location('key', 'KFAKE'))
+
+        mock_aprs_fi.return_value = {'entries': []}
+        self.assertIsNone(plugin_utils.get_location('key', 'KFAKE'))
+
+
+class TestPositionListQueries(unittest.TestCase):
+    def setUp(self):
+        position_list.PositionList._instance = None
+        CONF.position_list_max_age = 3600
+        pl = position_list.PositionList()
+        stations = [
+            ('KNEAR', 37.78, -122.42, '/'),
+            ('KWX', 37.80, -122.40, '_'),
+            ('KFAR', 40.0, -100.0, '/'),
+        ]
+        for callsign, lat, lon, symbol in stations:
+            pl.rx(
+                core.GPSPacket(
+                    from_call=callsign,
+                    to_call='APZ100',
+                    latitude=lat,
+                    longitude=lon,
+                    symbol=symbol,
+                ),
+            )
+
+    def tearDown(self):
+        position_list.PositionList._instance = None
+        CONF.position_list_max_age = 3600
+
+    def test_within(self):
+        found = position_list.PositionList().within(37.77, -122.42, 20)
+        self.assertEqual(['KNEAR', 'KWX'], [callsign for callsign, _, _ in found])
+        self.assertLess(found[0][2], found[1][2])
+
+    def test_nearest_with_predicate(self):
+        found = position_list.PositionList().nearest(
+            37.77,
+            -122.42,
+            predicate=lambda callsign, position: position.symbol == '/_',
+        )
+        self.assertEqual('KWX', found[0][0])
+
+    def test_skips_expired(self):
+        pl = position_list.PositionList()
+        CONF.position_list_max_age = -1
+        self.assertEqual([], pl.within(37.77, -122.42, 20))
+
+    def test_evicted_removed_from_index(self):
+        CONF.position_list_max_size = 1
+        pl = position_list.PositionList()
+        pl.rx(fake.fake_gps_packet())
+        CONF.position_list_max_size = 5000
+        self.assertEqual(1, len(pl.index))
@@ -1,10 +1,17 @@
 import datetime
+import shutil
+import tempfile
 import unittest
 from unittest import mock
 
+from oslo_config import cfg
+
 from aprsd.packets import seen_list
+from aprsd.utils import sqlitestore
 from tests import fake
 
+CONF = cfg.CONF
+
 
 class TestSeenList(unittest.TestCase):
     """Unit tests for the SeenList class."""
@@ -111,3 +118,65 @@ class TestSeenList(unittest.TestCase):
         self.assertIn('TEST6', stats)
         self.assertIn('last', stats['TEST5'])
         self.assertIn('count', stats['TEST5'])
+
+    def test_save_journal(self):
+        """Test the seen list is saved to and loaded from the journal."""
+        save_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, save_location)
+        self.addCleanup(setattr, CONF, 'save_location', CONF.save_location)
+        CONF.save_location = save_location
+        CONF.set_override('enable_save', True)
+        CONF.set_override('enable_save_journal', True)
+        for name in ('enable_save', 'enable_save_journal'):
+            self.addCleanup(CONF.clear_override, name)
+
+        sl = seen_list.SeenList()
+        sl.rx(fake.fake_packet(fromcall='TEST5'))
+        sl.save()
+        sl.rx(fake.fake_packet(fromcall='TEST5'))
+        sl.rx(fake.fake_packet(fromcall='TEST6'))
+        sl.save()
+        with open(sl._journal_filename()) as fp:
+            self.assertEqual(len(fp.readlines()), 3)
+
+        seen_list.SeenList._instance = None
+        loaded = seen_list.SeenList()
+        loaded.load()
+        self.assertEqual(loaded.data, sl.data)
+        self.assertEqual(loaded.data['TEST5']['count'], 2)
+
+    def test_save_sqlite(self):
+        """Test only the recently seen callsigns are kept in memory."""
+        save_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, save_location)
+        self.addCleanup(setattr, CONF, 'save_location', CONF.save_location)
+        CONF.save_location = save_location
+        for name, value in (
+            ('enable_save', True),
+            ('save_backend', 'sqlite'),
+            ('save_cache_size', 2),
+        ):
+            CONF.set_override(name, value)
+            self.addCleanup(CONF.clear_override, name)
+        sqlitestore.SQLiteStore._instance = None
+        self.addCleanup(setattr, sqlitestore.SQLiteStore, '_instance', None)
+        self.addCleanup(lambda: sqlitestore.SQLiteStore().close())
+
+        sl = seen_list.SeenList()
+        sl.load()
+        for callsign in ('TEST1', 'TEST2', 'TEST1', 'TEST3'):
+            sl.rx(fake.fake_packet(fromcall=callsign))
+        sl.save()
+        self.assertEqual(list(sl.data), ['TEST1', 'TEST3'])
+        self.assertEqual(sqlitestore.SQLiteStore().count('seenlist'), 3)
+
+        # Heard again, so its count is looked up in the database.
+        sl.rx(fake.fake_packet(fromcall='TEST2'))
+        self.assertEqual(sl.data['TEST2']['count'], 2)
+        sl.save()
+
+        seen_list.SeenList._instance = None
+        loaded = seen_list.SeenList()
+        loaded.load()
+        self.assertEqual(list(loaded.data), ['TEST3', 'TEST2'])
+        self.assertEqual(loaded.data['TEST2']['count'], 2)
@@ -1,8 +1,17 @@
+import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
+
+from oslo_config import cfg
 
 from aprsd.packets import core, tracker
+from aprsd.utils import sqlitestore
 from tests import fake
 
+CONF = cfg.CONF
+
 
 class TestPacketTrack(unittest.TestCase):
     """Unit tests for the PacketTrack class."""
@@ -50,8 +59,8 @@ class TestPacketTrack(unittest.TestCase):
         pt.tx(packet2)
 
         keys = list(iter(pt))
-        self.assertIn('123', keys)
-        self.assertIn('456', keys)
+        self.assertIn('KMINE:123', keys)
+        self.assertIn('KMINE:456', keys)
 
     def test_keys(self):
         """Test keys() method."""
@@ -62,8 +71,8 @@ class TestPacketTrack(unittest.TestCase):
         pt.tx(packet2)
 
         keys = list(pt.keys())
-        self.assertIn('123', keys)
-        self.assertIn('456', keys)
+        self.assertIn('KMINE:123', keys)
+        self.assertIn('KMINE:456', keys)
 
     def test_items(self):
         """Test items() method."""
@@ -73,7 +82,7 @@ class TestPacketTrack(unittest.TestCase):
 
         items = list(pt.items())
         self.assertEqual(len(items), 1)
-        self.assertEqual(items[0][0], '123')
+        self.assertEqual(items[0][0], 'KMINE:123')
         self.assertEqual(items[0][1], packet)
 
     def test_values(self):
@@ -97,8 +106,8 @@ class TestPacketTrack(unittest.TestCase):
 
         pt.tx(packet)
 
-        self.assertIn('123', pt.data)
-        self.assertEqual(pt.data['123'], packet)
+        self.assertIn('KMINE:123', pt.data)
+        self.assertEqual(pt.data['KMINE:123'], packet)
         self.assertEqual(pt.total_tracked, initial_total + 1)
         self.assertEqual(packet.send_count, 0)
 
@@ -108,11 +117,15 @@ class TestPacketTrack(unittest.TestCase):
         packet = fake.fake_packet(msg_number='123')
         pt.tx(packet)
 
-        ack = fake.fake_ack_packet()
-        ack.msgNo = '123'
+        ack = fake.fake_packet(
+            fromcall=fake.FAKE_TO_CALLSIGN,
+            tocall=fake.FAKE_FROM_CALLSIGN,
+            msg_number='123',
+            response=core.PACKET_TYPE_ACK,
+        )
         pt.rx(ack)
 
-        self.assertNotIn('123', pt.data)
+        self.assertNotIn('KMINE:123', pt.data)
 
     def test_rx_reject_packet(self):
         """Test rx() with RejectPacket."""
@@ -123,10 +136,12 @@ class TestPacketTrack(unittest.TestCase):
         pt.tx(packet)
 
         # Create a proper RejectPacket
-        reject_pkt = core.RejectPacket(from_call='TEST', to_call='TEST', msgNo='123')
+        reject_pkt = core.RejectPacket(
+            from_call=fake.FAKE_TO_CALLSIGN, to_call='TEST', msgNo='123'
+        )
         pt.rx(reject_pkt)
 
-        self.assertNotIn('123', pt.data)
+        self.assertNotIn('KMINE:123', pt.data)
 
     def test_rx_piggyback_ack(self):
         """Test rx() with piggyback ACK."""
@@ -134,11 +149,11 @@ class TestPacketTrack(unittest.TestCase):
         packet = fake.fake_packet(msg_number='123')
         pt.tx(packet)
 
-        piggyback = fake.fake_packet()
+        piggyback = fake.fake_packet(fromcall=fake.FAKE_TO_CALLSIGN)
         piggyback.ackMsgNo = '123'
         pt.rx(piggyback)
 
-        self.assertNotIn('123', pt.data)
+        self.assertNotIn('KMINE:123', pt.data)
 
     def test_rx_no_match(self):
         """Test rx() with packet that doesn't match tracked packet."""
@@ -151,7 +166,7 @@ class TestPacketTrack(unittest.TestCase):
         pt.rx(ack)
 
         # Should still have original packet
-        self.assertIn('123', pt.data)
+        self.assertIn('KMINE:123', pt.data)
 
     def test_remove(self):
         """Test remove() method."""
@@ -159,8 +174,8 @@ class TestPacketTrack(unittest.TestCase):
         packet = fake.fake_packet(msg_number='123')
         pt.tx(packet)
 
-        pt.remove('123')
-        self.assertNotIn('123', pt.data)
+        pt.remove('KMINE:123')
+        self.assertNotIn('KMINE:123', pt.data)
 
     def test_remove_nonexistent(self):
         """Test remove() with nonexistent key."""
@@ -180,9 +195,9 @@ class TestPacketTrack(unittest.TestCase):
         stats = pt.stats()
         self.assertIn('total_tracked', stats)
         self.assertIn('packets', stats)
-        self.assertIn('123', stats['packets'])
-        self.assertEqual(stats['packets']['123']['send_count'], 0)
-        self.assertEqual(stats['packets']['123']['retry_count'], 3)
+        self.assertIn('KMINE:123', stats['packets'])
+        self.assertEqual(stats['packets']['KMINE:123']['send_count'], 0)
+        self.assertEqual(stats['packets']['KMINE:123']['retry_count'], 3)
 
     def test_stats_serializable(self):
         """Test stats() with serializable=True."""
@@ -202,7 +217,7 @@ class TestPacketTrack(unittest.TestCase):
         packet = fake.fake_packet(msg_number='123')
         pt.tx(packet)
 
-        result = pt.get('123')
+        result = pt.get('KMINE:123')
         self.assertEqual(result, packet)
 
         result = pt.get('nonexistent')
@@ -277,11 +292,11 @@ class TestPacketTrack(unittest.TestCase):
             msgNo='8817',
         )
         pt.tx(ack1)
-        self.assertIn('8817', pt.data)
-        self.assertEqual(pt.data['8817'].send_count, 0)
+        self.assertIn('KM6LYW-9:ack8817', pt.data)
+        self.assertEqual(pt.data['KM6LYW-9:ack8817'].send_count, 0)
 
         # Simulate ack being partially sent (scheduler incremented send_count)
-        pt.data['8817'].send_count = 2
+        pt.data['KM6LYW-9:ack8817'].send_count = 2
 
         # Second ack for the same msgNo (from a digi copy of the message)
         ack2 = core.AckPacket(
@@ -292,7 +307,7 @@ class TestPacketTrack(unittest.TestCase):
         pt.tx(ack2)
 
         # send_count must NOT be reset to 0
-        self.assertEqual(pt.data['8817'].send_count, 2)
+        self.assertEqual(pt.data['KM6LYW-9:ack8817'].send_count, 2)
         # total_tracked should not have incremented again
         self.assertEqual(pt.total_tracked, 1)
 
@@ -306,8 +321,8 @@ class TestPacketTrack(unittest.TestCase):
         )
         pt.tx(ack)
 
-        self.assertIn('100', pt.data)
-        self.assertEqual(pt.data['100'].send_count, 0)
+        self.assertIn('KM6LYW-9:ack100', pt.data)
+        self.assertEqual(pt.data['KM6LYW-9:ack100'].send_count, 0)
         self.assertEqual(pt.total_tracked, 1)
 
     def test_tx_message_packet_still_resets_on_duplicate(self):
@@ -319,13 +334,13 @@ class TestPacketTrack(unittest.TestCase):
         pt = tracker.PacketTrack()
         pkt = fake.fake_packet(msg_number='999')
         pt.tx(pkt)
-        pt.data['999'].send_count = 2
+        pt.data['KMINE:999'].send_count = 2
 
         # Re-sending the same message should reset
         pkt2 = fake.fake_packet(msg_number='999')
         pt.tx(pkt2)
 
-        self.assertEqual(pt.data['999'].send_count, 0)
+        self.assertEqual(pt.data['KMINE:999'].send_count, 0)
 
     def test_heavy_traffic_multiple_digi_paths(self):
         """Simulate heavy traffic: same message arrives via 5 digipeater paths.
@@ -347,8 +362,136 @@ class TestPacketTrack(unittest.TestCase):
 
             # After first add, simulate partial sending
             if i == 0:
-                pt.data['8817'].send_count = 1
+                pt.data['KM6LYW-9:ack8817'].send_count = 1
 
         # Only tracked once, send_count preserved from after first send
         self.assertEqual(pt.total_tracked, 1)
-        self.assertEqual(pt.data['8817'].send_count, 1)
+        self.assertEqual(pt.data['KM6LYW-9:ack8817'].send_count, 1)
+
+    def test_get_by_msgno(self):
+        """Test get() and remove() still resolve an unambiguous bare msgNo."""
+        pt = tracker.PacketTrack()
+        packet = fake.fake_packet(msg_number='123')
+        pt.tx(packet)
+
+        self.assertEqual(pt.get('123'), packet)
+        self.assertEqual(pt['123'], packet)
+        pt.remove('123')
+        self.assertEqual(len(pt), 0)
+
+    def test_same_msgno_different_peers(self):
+        """Test the same msgNo sent to two peers is tracked separately."""
+        pt = tracker.PacketTrack()
+        pkt_a = fake.fake_packet(tocall='KA', msg_number='42')
+        pkt_b = fake.fake_packet(tocall='KB', msg_number='42')
+        pt.tx(pkt_a)
+        pt.tx(pkt_b)
+        self.assertEqual(len(pt), 2)
+        # Ambiguous bare msgNo doesn't resolve.
+        self.assertIsNone(pt.get('42'))
+
+        # An ack from KA only removes the message sent to KA.
+        ack = core.AckPacket(from_call='KA', to_call='KFAKE', msgNo='42')
+        pt.rx(ack)
+        self.assertNotIn('KA:42', pt.data)
+        self.assertIn('KB:42', pt.data)
+        self.assertEqual(pt.get('42'), pkt_b)
+
+    def test_ack_from_wrong_peer_ignored(self):
+        """Test an ack from a station we didn't send to is ignored."""
+        pt = tracker.PacketTrack()
+        pt.tx(fake.fake_packet(tocall='KA', msg_number='42'))
+
+        pt.rx(core.AckPacket(from_call='KB', to_call='KFAKE', msgNo='42'))
+        self.assertIn('KA:42', pt.data)
+
+    def test_our_ack_not_removed_by_their_ack(self):
+        """Test our outgoing ack and message with the same msgNo don't collide."""
+        pt = tracker.PacketTrack()
+        msg = fake.fake_packet(tocall='KA', msg_number='42')
+        our_ack = core.AckPacket(from_call='KFAKE', to_call='KA', msgNo='42')
+        pt.tx(msg)
+        pt.tx(our_ack)
+        self.assertEqual(len(pt), 2)
+
+        pt.rx(core.AckPacket(from_call='KA', to_call='KFAKE', msgNo='42'))
+        self.assertNotIn('KA:42', pt.data)
+        self.assertIn('KA:ack42', pt.data)
+
+    def test_load_rekeys_old_data(self):
+        """Test load() re-keys packets saved under the bare msgNo."""
+        pt = tracker.PacketTrack()
+        packet = fake.fake_packet(msg_number='123')
+        with mock.patch(
+            'aprsd.utils.objectstore.ObjectStoreMixin.load',
+            side_effect=lambda: setattr(pt, 'data', {'123': packet}),
+        ):
+            pt.load()
+
+        self.assertIn('KMINE:123', pt.data)
+        self.assertEqual(pt.get('123'), packet)
+
+    def test_save_load_sqlite(self):
+        """Test the tracked packets are saved to and loaded from sqlite."""
+        save_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, save_location)
+        self.addCleanup(setattr, CONF, 'save_location', CONF.save_location)
+        CONF.save_location = save_location
+        for name, value in (
+            ('enable_save', True),
+            ('save_backend', 'sqlite'),
+        ):
+            CONF.set_override(name, value)
+            self.addCleanup(CONF.clear_override, name)
+        sqlitestore.SQLiteStore._instance = None
+        self.addCleanup(setattr, sqlitestore.SQLiteStore, '_instance', None)
+        self.addCleanup(lambda: sqlitestore.SQLiteStore().close())
+
+        pt = tracker.PacketTrack()
+        pt.load()
+        sent = fake.fake_packet(msg_number='123')
+        acked = fake.fake_packet(msg_number='124')
+        pt.tx(sent)
+        pt.tx(acked)
+        pt.save()
+        # Updated in place as it's sent again.
+        sent.send_count = 2
+        pt.rx(core.AckPacket(from_call='KMINE', to_call='KFAKE', msgNo='124'))
+        pt.save()
+
+        tracker.PacketTrack._instance = None
+        loaded = tracker.PacketTrack()
+        loaded.load()
+        self.assertEqual(list(loaded.data), ['KMINE:123'])
+        self.assertEqual(loaded.get('123').send_count, 2)
+
+    def test_save_load_not_journaled(self):
+        """Test the tracker is saved to its JSON file with the journal on."""
+        save_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, save_location)
+        self.addCleanup(setattr, CONF, 'save_location', CONF.save_location)
+        CONF.save_location = save_location
+        for name, value in (
+            ('enable_save', True),
+            ('enable_save_journal', True),
+        ):
+            CONF.set_override(name, value)
+            self.addCleanup(CONF.clear_override, name)
+
+        pt = tracker.PacketTrack()
+        pt.load()
+        sent = fake.fake_packet(msg_number='123')
+        pt.tx(sent)
+        pt.tx(fake.fake_packet(msg_number='124'))
+        pt.save()
+        sent.send_count = 2
+        pt.rx(core.AckPacket(from_call='KMINE', to_call='KFAKE', msgNo='124'))
+        pt.save()
+        self.assertFalse(os.path.exists(pt._journal_filename()))
+        self.assertTrue(os.path.exists(pt._save_filename()))
+
+        tracker.PacketTrack._instance = None
+        loaded = tracker.PacketTrack()
+        loaded.load()
+        self.assertEqual(list(loaded.data), ['KMINE:123'])
+        self.assertEqual(loaded.get('123').send_count, 2)
@@ -1,5 +1,7 @@
 import datetime
+import time
 import unittest
+from unittest import mock
 
 from oslo_config import cfg
 
@@ -195,3 +197,219 @@ class TestWatchList(unittest.TestCase):
 
         # Test with custom seconds
         self.assertFalse(wl.is_old('TEST5', seconds=3600))
+
+    def test_wildcard_rx(self):
+        """A wildcard callsign tracks every callsign it matches."""
+        CONF.watch_list.callsigns = ['KM6*', 'WB4BOR']
+        watch_list.WatchList._instance = None
+        wl = watch_list.WatchList()
+
+        self.assertTrue(wl.callsign_in_watchlist('KM6LYW-9'))
+        self.assertTrue(wl.callsign_in_watchlist('WB4BOR'))
+        self.assertFalse(wl.callsign_in_watchlist('WB4BOR-1'))
+        self.assertFalse(wl.callsign_in_watchlist('KM5ABC'))
+        self.assertIsNone(wl.last_seen('KM6LYW-9'))
+        self.assertFalse(wl.was_old_before_last_update('KM6LYW-9'))
+
+        packet = fake.fake_packet(fromcall='KM6LYW-9')
+        wl.rx(packet)
+        self.assertEqual(packet, wl.data['KM6LYW-9']['packet'])
+        self.assertIsNotNone(wl.last_seen('KM6LYW-9'))
+
+
+class TestWatchListExpiry(unittest.TestCase):
+    """The monotonic expiry heap and the stale/online events."""
+
+    def setUp(self):
+        watch_list.WatchList._instance = None
+        # data is a class attribute, don't see the other tests' entries.
+        self.addCleanup(setattr, watch_list.WatchList, 'data', {})
+        watch_list.WatchList.data = {}
+        CONF.watch_list.enabled = True
+        CONF.watch_list.callsigns = ['WB4BOR', 'KM6*']
+        CONF.watch_list.alert_time_seconds = 60
+        self.now = 1000.0
+        patcher = mock.patch.object(
+            watch_list.time, 'monotonic', side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.wl = watch_list.WatchList()
+        self.events = []
+        self.wl.subscribe(
+            lambda event, callsign, packet: self.events.append((event, callsign))
+        )
+
+    def tearDown(self):
+        watch_list.WatchList._instance = None
+        CONF.watch_list.alert_time_seconds = 300
+
+    def test_is_old(self):
+        self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+        self.now += 60
+        self.assertFalse(self.wl.is_old('WB4BOR'))
+        self.now += 1
+        self.assertTrue(self.wl.is_old('WB4BOR'))
+        self.assertFalse(self.wl.is_old('WB4BOR', seconds=120))
+        self.assertEqual('0:01:01', self.wl.age('WB4BOR'))
+
+    def test_expire_events(self):
+        self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+        self.wl.rx(fake.fake_packet(fromcall='KM6LYW'))
+        self.now += 30
+        self.wl.rx(fake.fake_packet(fromcall='KM6LYW'))
+        self.assertEqual([], self.wl.expire())
+
+        self.now += 31
+        self.assertEqual(['WB4BOR'], self.wl.expire())
+        # Already stale, no more events.
+        self.assertEqual([], self.wl.expire())
+        self.now += 30
+        self.assertEqual(['KM6LYW'], self.wl.expire())
+
+        self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+        self.assertTrue(self.wl.was_old_before_last_update('WB4BOR'))
+        self.assertEqual(
+            [
+                (watch_list.EVENT_STALE, 'WB4BOR'),
+                (watch_list.EVENT_STALE, 'KM6LYW'),
+                (watch_list.EVENT_ONLINE, 'WB4BOR'),
+            ],
+            self.events,
+        )
+
+    def test_one_deadline_per_callsign(self):
+        for _ in range(1000):
+            self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+            self.now += 0.05
+        self.assertEqual(1, len(self.wl.deadlines))
+        # The first deadline comes up, and is pushed back to the last rx.
+        self.now = 1061.0
+        self.assertEqual([], self.wl.expire())
+        self.assertEqual(1, len(self.wl.deadlines))
+        self.now = 1110.0
+        self.assertEqual(['WB4BOR'], self.wl.expire())
+        self.assertEqual([], self.wl.deadlines)
+
+        # Seen again, it gets a new deadline.
+        self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+        self.assertEqual([(1170.0, 'WB4BOR')], self.wl.deadlines)
+
+    def test_earlier_deadline_replaces(self):
+        with self.wl.lock:
+            self.wl._seen_at('WB4BOR', 1100.0)
+            self.wl._seen_at('WB4BOR', 1000.0)
+        self.assertEqual(2, len(self.wl.deadlines))
+        self.now = 1061.0
+        self.assertEqual(['WB4BOR'], self.wl.expire())
+        # The replaced entry is dropped when it comes up.
+        self.now = 1200.0
+        self.assertEqual([], self.wl.expire())
+        self.assertEqual([], self.wl.deadlines)
+
+    def test_wildcard_callsigns_bounded(self):
+        self.addCleanup(setattr, CONF.watch_list, 'max_wildcard_callsigns', 1000)
+        CONF.watch_list.max_wildcard_callsigns = 3
+        self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+        for i in range(10):
+            self.wl.rx(fake.fake_packet(fromcall=f'KM6AB{i}'))
+            self.now += 1
+        self.assertEqual(
+            {'WB4BOR', 'KM6', 'KM6AB7', 'KM6AB8', 'KM6AB9'}, set(self.wl.data)
+        )
+        self.assertEqual(4, len(self.wl.seen))
+
+        # Seen again, so KM6AB8 is dropped next.
+        self.wl.rx(fake.fake_packet(fromcall='KM6AB7'))
+        self.wl.rx(fake.fake_packet(fromcall='KM6XYZ'))
+        self.assertEqual(['KM6AB9', 'KM6AB7', 'KM6XYZ'], list(self.wl.wildcard))
+        self.assertNotIn('KM6AB8', self.wl.data)
+
+        # The dropped callsigns never go stale.
+        self.now += 120
+        self.assertCountEqual(
+            ['WB4BOR', 'KM6AB9', 'KM6AB7', 'KM6XYZ'], self.wl.expire()
+        )
+        self.assertEqual([], self.wl.deadlines)
+
+    def test_load_bounds_wildcard_callsigns(self):
+        self.addCleanup(setattr, CONF.watch_list, 'max_wildcard_callsigns', 1000)
+        CONF.watch_list.max_wildcard_callsigns = 2
+        CONF.enable_save = False
+        self.addCleanup(setattr, CONF, 'enable_save', True)
+        now = datetime.datetime.now()
+        for i, callsign in enumerate(('KM6AB1', 'KM6AB2', 'WB4BOR', 'KM6AB0')):
+            self.wl.data[callsign] = {
+                'last': now - datetime.timedelta(seconds=10 - i),
+                'packet': None,
+                'was_old_before_update': False,
+            }
+        self.wl.load()
+        self.assertEqual({'WB4BOR', 'KM6', 'KM6AB2', 'KM6AB0'}, set(self.wl.data))
+        self.assertEqual(['KM6AB2', 'KM6AB0'], list(self.wl.wildcard))
+
+    def test_unsubscribe_and_bad_listener(self):
+        self.wl.listeners.clear()
+
+        def broken(event, callsign, packet):
+            raise ValueError('broken')
+
+        self.wl.subscribe(broken)
+        self.wl.rx(fake.fake_packet(fromcall='WB4BOR'))
+        self.now += 61
+        self.assertEqual(['WB4BOR'], self.wl.expire())
+        self.wl.unsubscribe(broken)
+        self.assertEqual([], self.wl.listeners)
+
+    def test_load_seeds_monotonic(self):
+        CONF.enable_save = False
+        self.addCleanup(setattr, CONF, 'enable_save', True)
+        self.wl.data['WB4BOR'] = {
+            'last': datetime.datetime.now() - datetime.timedelta(seconds=90),
+            'packet': None,
+            'was_old_before_update': False,
+        }
+        self.wl.load()
+        self.assertAlmostEqual(910.0, self.wl.seen['WB4BOR'], delta=1)
+        self.assertTrue(self.wl.is_old('WB4BOR'))
+        self.assertEqual(['WB4BOR'], self.wl.expire())
+
+    def test_expire_speed(self):
+        wl = self.wl
+        with wl.lock:
+            for i in range(10000):
+                wl._seen_at(f'K{i}', self.now)
+        start = time.perf_counter()
+        for _ in range(100):
+            wl.expire()
+        # Nothing has expired, so this doesn't look at the callsigns.
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+
+class TestCallsignMatcher(unittest.TestCase):
+    def test_exact(self):
+        matcher = watch_list.CallsignMatcher(['WB4BOR', 'km6lyw'])
+        self.assertTrue(matcher.match('WB4BOR'))
+        self.assertTrue(matcher.match('KM6LYW'))
+        self.assertTrue(matcher.match('wb4bor'))
+        self.assertFalse(matcher.match('WB4BOR-1'))
+        self.assertFalse(matcher.match('WB4BO'))
+        self.assertFalse(matcher.match(''))
+        self.assertFalse(matcher.match(None))
+
+    def test_wildcard(self):
+        matcher = watch_list.CallsignMatcher(['KM6*', 'WB4BOR-*'])
+        self.assertTrue(matcher.match('KM6'))
+        self.assertTrue(matcher.match('KM6LYW'))
+        self.assertTrue(matcher.match('WB4BOR-12'))
+        self.assertFalse(matcher.match('WB4BOR'))
+        self.assertFalse(matcher.match('KM5LYW'))
+        self.assertFalse(matcher.match('K'))
+
+    def test_match_everything(self):
+        matcher = watch_list.CallsignMatcher(['*'])
+        self.assertTrue(matcher.match('ANYONE'))
+
+    def test_empty(self):
+        matcher = watch_list.CallsignMatcher()
+        self.assertFalse(matcher.match('WB4BOR'))
@@ -149,3 +149,49 @@ class TestWeatherPacket(unittest.TestCase):
         self.assertEqual(restored.pressure, packet.pressure)
         self.assertEqual(restored.wind_speed, packet.wind_speed)
         self.assertEqual(restored.wind_direction, packet.wind_direction)
+
+    def test_partial_weather_payload_round_trip(self):
+        """Test the payload of a report that's missing values."""
+        fields = (
+            'temperature',
+            'humidity',
+            'pressure',
+            'wind_speed',
+            'wind_direction',
+            'wind_gust',
+            'rain_1h',
+            'rain_24h',
+            'rain_since_midnight',
+        )
+        for weather, expected in (
+            ('_t068', '.../...g...t068r000p000P000h..b.....'),
+            ('_.../...g...t068h45b10132', '.../...g...t068r000p000P000h45b10132'),
+            (
+                '_180/010g015t...r001p002P003h00b.....',
+                '180/010g015t...r001p002P003h00b.....',
+            ),
+        ):
+            with self.subTest(weather=weather):
+                packet = packets.factory(
+                    aprslib.parse(f'KWX1>APRS:@092345z4903.50N/07201.75W{weather}')
+                )
+                self.assertIsInstance(packet, packets.WeatherPacket)
+                self.assertTrue(str(packet))
+                packet.prepare()
+                built = packet.payload.split('_', 1)[1]
+                self.assertEqual(expected, built)
+
+                # aprslib decodes the built weather data the same.
+                restored = packets.factory(
+                    aprslib.parse(f'KWX1>APRS:!4903.50N/07201.75W_{built}')
+                )
+                for name in fields:
+                    self.assertEqual(getattr(packet, name), getattr(restored, name))
+
+    def test_human_info_temperature(self):
+        """Test the temperature, kept in degrees C, is shown in F."""
+        packet = packets.factory(
+            aprslib.parse('KWX1>APRS:@092345z4903.50N/07201.75W_t068')
+        )
+        self.assertAlmostEqual(20.0, packet.temperature)
+        self.assertEqual('Temp 068F Rain 0.0in/24hr', packet.human_info)
@@ -0,0 +1,83 @@
+import time
+import unittest
+
+from oslo_config import cfg
+
+from aprsd.packets import core, wx_list
+from tests import fake
+
+CONF = cfg.CONF
+
+
+def wx_packet(callsign, latitude, longitude, **kwargs):
+    return core.WeatherPacket(
+        from_call=callsign,
+        to_call='APRS',
+        latitude=latitude,
+        longitude=longitude,
+        **kwargs,
+    )
+
+
+class TestWXList(unittest.TestCase):
+    """Unit tests for the WXList class."""
+
+    def setUp(self):
+        wx_list.WXList._instance = None
+        CONF.wx_list_max_size = 1000
+        CONF.wx_list_max_age = 1800
+        CONF.wx_list_max_distance = 25.0
+
+    def tearDown(self):
+        wx_list.WXList._instance = None
+        CONF.wx_list_max_size = 1000
+        CONF.wx_list_max_age = 1800
+        CONF.wx_list_max_distance = 25.0
+
+    def test_singleton_pattern(self):
+        self.assertIs(wx_list.WXList(), wx_list.WXList())
+
+    def test_rx_keeps_latest(self):
+        wxl = wx_list.WXList()
+        wxl.rx(fake.fake_gps_packet())
+        wxl.rx(wx_packet('KWX1', 10.0, 10.0, temperature=50))
+        wxl.rx(wx_packet('KWX1', 10.0, 10.0, temperature=60))
+        self.assertEqual(1, len(wxl))
+        self.assertEqual(60, wxl.get('kwx1').temperature)
+
+    def test_nearest(self):
+        wxl = wx_list.WXList()
+        wxl.rx(wx_packet('KFAR', 10.1, 10.0))
+        wxl.rx(wx_packet('KNEAR', 10.01, 10.0))
+        packet, distance = wxl.nearest(10.0, 10.0)
+        self.assertEqual('KNEAR', packet.from_call)
+        self.assertAlmostEqual(1.1, distance, places=1)
+        self.assertIsNone(wxl.nearest(20.0, 20.0))
+        self.assertIsNone(wxl.nearest(10.0, 10.0, max_distance_km=0))
+        stats = wxl.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+
+    def test_nearest_skips_stale(self):
+        wxl = wx_list.WXList()
+        wxl.rx(wx_packet('KOLD', 10.01, 10.0, timestamp=time.time() - 3600))
+        wxl.rx(wx_packet('KNEW', 10.1, 10.0))
+        packet, _ = wxl.nearest(10.0, 10.0)
+        self.assertEqual('KNEW', packet.from_call)
+        self.assertIsNone(wxl.get('KOLD'))
+
+    def test_max_size(self):
+        CONF.wx_list_max_size = 2
+        wxl = wx_list.WXList()
+        for i in range(3):
+            wxl.rx(wx_packet(f'KWX{i}', 10.0 + i, 10.0))
+        self.assertEqual(2, len(wxl))
+        self.assertIsNone(wxl.get('KWX0'))
+        self.assertNotIn('KWX0', wxl.index)
+
+    def test_flush(self):
+        wxl = wx_list.WXList()
+        wxl.rx(wx_packet('KWX1', 10.0, 10.0))
+        wxl.flush()
+        self.assertEqual(0, len(wxl))
+        self.assertIsNone(wxl.nearest(10.0, 10.0))
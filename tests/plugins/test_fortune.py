@@ -1,3 +1,6 @@
+import os
+import struct
+import tempfile
 from unittest import mock
 
 from oslo_config import cfg
@@ -9,8 +12,31 @@ from .. import fake, test_plugin
 
 CONF = cfg.CONF
 
+SHORT = ['Short one.', 'Two\nlines.', 'x' * 60]
+LONG = ['y' * 61, 'A long\n' + 'z' * 70]
+
+
+def write_fortunes(path, fortunes, dat=True, rotated=False):
+    data = b''
+    offsets = []
+    for fortune in fortunes:
+        offsets.append(len(data))
+        data += fortune.encode() + b'\n%\n'
+    offsets.append(len(data))
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    if not dat:
+        return
+    flags = 0x4 if rotated else 0
+    with open(f'{path}.dat', 'wb') as fp:
+        fp.write(
+            fortune_plugin.STRFILE_HEADER.pack(2, len(fortunes), 0, 0, flags, b'%')
+        )
+        fp.write(struct.pack(f'>{len(offsets)}I', *offsets))
+
 
 class TestFortunePlugin(test_plugin.TestPlugin):
+    @mock.patch.object(fortune_plugin, 'FORTUNE_DIRS', [])
     @mock.patch('shutil.which')
     def test_fortune_fail(self, mock_which):
         mock_which.return_value = None
@@ -20,6 +46,7 @@ class TestFortunePlugin(test_plugin.TestPlugin):
         actual = fortune.filter(packet)
         self.assertEqual(expected, actual)
 
+    @mock.patch.object(fortune_plugin, 'FORTUNE_DIRS', [])
     @mock.patch('subprocess.check_output')
     @mock.patch('shutil.which')
     def test_fortune_success(self, mock_which, mock_output):
@@ -32,3 +59,45 @@ class TestFortunePlugin(test_plugin.TestPlugin):
         packet = fake.fake_packet(message='fortune')
         actual = fortune.filter(packet)
         self.assertEqual(expected, actual)
+
+    @mock.patch('subprocess.check_output')
+    @mock.patch('shutil.which')
+    def test_fortune_from_data_files(self, mock_which, mock_output):
+        mock_which.return_value = None
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_fortunes(os.path.join(tmpdir, 'fortunes'), SHORT + LONG)
+            with mock.patch.object(fortune_plugin, 'FORTUNE_DIRS', [tmpdir]):
+                fortune = fortune_plugin.FortunePlugin()
+
+        self.assertTrue(fortune.enabled)
+        packet = fake.fake_packet(message='fortune')
+        actual = fortune.filter(packet)
+        self.assertIn(actual, ['Short one.', 'Twolines.', 'x' * 60])
+        mock_output.assert_not_called()
+
+
+class TestLoadFortunes(test_plugin.TestPlugin):
+    def test_strfile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_fortunes(os.path.join(tmpdir, 'fortunes'), LONG + SHORT)
+            fortunes = fortune_plugin.load_fortunes([tmpdir])
+        self.assertEqual(['Short one.', 'Twolines.', 'x' * 60], fortunes)
+
+    def test_strfile_rotated(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_fortunes(
+                os.path.join(tmpdir, 'fortunes'),
+                ['Uryyb jbeyq.'],
+                rotated=True,
+            )
+            fortunes = fortune_plugin.load_fortunes([tmpdir])
+        self.assertEqual(['Hello world.'], fortunes)
+
+    def test_text_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_fortunes(os.path.join(tmpdir, 'fortunes'), SHORT + LONG, dat=False)
+            os.mkdir(os.path.join(tmpdir, 'off'))
+            write_fortunes(os.path.join(tmpdir, 'off', 'rude'), ['Rude.'])
+            fortunes = fortune_plugin.load_fortunes([tmpdir, '/does/not/exist'])
+        self.assertEqual(['Short one.', 'Twolines.', 'x' * 60], fortunes)
@@ -1,3 +1,4 @@
+import time
 from unittest import mock
 
 from oslo_config import cfg
@@ -230,6 +231,32 @@ class TestNotifySeenPlugin(TestWatchListPlugin):
         self.assertEqual(fake.FAKE_FROM_CALLSIGN, actual.from_call)
         self.assertEqual(notify_callsign, actual.to_call)
         self.assertEqual(msg, actual.message_text)
-        # Verify that mark_as_new was called to prevent duplicate notifications
-        # by checking that was_old_before_update is now False
-        self.assertFalse(wl.was_old_before_last_update(fromcall))
+        # Only one notification until it comes back online again.
+        self.assertEqual(packets.NULL_MESSAGE, plugin.filter(packet))
+
+    def test_callsign_back_online_after_expire(self):
+        fromcall = 'WB4BOR'
+        self.config_and_init(
+            watchlist_enabled=True,
+            watchlist_callsigns=[fromcall],
+            watchlist_alert_time_seconds=60,
+        )
+        self.addCleanup(setattr, packets.WatchList, '_instance', None)
+        self.addCleanup(setattr, packets.WatchList, 'data', packets.WatchList.data)
+        packets.WatchList._instance = None
+        packets.WatchList.data = {}
+        plugin = notify_plugin.NotifySeenPlugin()
+        wl = packets.WatchList()
+        self.assertIn(plugin.watch_list_event, wl.listeners)
+
+        packet = fake.fake_packet(fromcall=fromcall, message='ping', msg_number=1)
+        wl.rx(packet)
+        self.assertEqual(packets.NULL_MESSAGE, plugin.filter(packet))
+
+        later = time.monotonic() + 120
+        with mock.patch('aprsd.packets.watch_list.time.monotonic', return_value=later):
+            self.assertEqual([fromcall], wl.expire())
+            wl.rx(packet)
+        actual = plugin.filter(packet)
+        self.assertIsInstance(actual, packets.MessagePacket)
+        self.assertEqual(fake.FAKE_TO_CALLSIGN, actual.to_call)
@@ -1,8 +1,12 @@
 from unittest import mock
 
+import aprslib
 from oslo_config import cfg
 
-from aprsd import conf  # noqa: F401
+from aprsd import (
+    conf,  # noqa: F401
+    packets,
+)
 from aprsd.plugins import weather as weather_plugin
 
 from .. import fake, test_plugin
@@ -104,6 +108,42 @@ class TestUSWeatherPlugin(test_plugin.TestPlugin):
         actual = wx.filter(packet)
         self.assertEqual(expected, actual)
 
+    @mock.patch('aprsd.plugin_utils.get_aprs_fi')
+    @mock.patch('aprsd.plugin_utils.get_weather_gov_for_gps')
+    def test_local_wx_station(self, mock_weather, mock_check_aprs):
+        mock_check_aprs.return_value = {
+            'entries': [{'lat': 10.05, 'lng': 11, 'lasttime': 10}],
+        }
+        CONF.aprs_fi.apiKey = 'abc123'
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+        position = 'KWX1>APRS,TCPIP*:!1000.00N/01100.00E_'
+        reports = [
+            # aprslib decodes t072 as 22.2C.
+            (
+                '180/010g015t072r001p002P003h40b10132',
+                '72F 40% Wind 10MPH@180 G15 1013.2mb Rain 0.02in/24hr '
+                '(KWX1 6km 0m ago)',
+            ),
+            # aprslib decodes s010 and g015 in m/s.
+            (
+                'c180s010g015t072p050h40b10132',
+                '72F 40% Wind 10MPH@180 G15 1013.2mb Rain 0.5in/24hr (KWX1 6km 0m ago)',
+            ),
+            ('.../...g...t...h40', '40% (KWX1 6km 0m ago)'),
+        ]
+        for report, expected in reports:
+            with self.subTest(report=report):
+                packets.WXList._instance = None
+                self.addCleanup(setattr, packets.WXList, '_instance', None)
+                packets.WXList().rx(
+                    packets.factory(aprslib.parse(position + report)),
+                )
+                wx = weather_plugin.USWeatherPlugin()
+                wx.enabled = True
+                packet = fake.fake_packet(message='weather')
+                self.assertEqual(expected, wx.filter(packet))
+        mock_weather.assert_not_called()
+
 
 class TestUSMetarPlugin(test_plugin.TestPlugin):
     def test_not_enabled_missing_aprs_fi_key(self):
@@ -87,19 +87,19 @@ class TestPacketBase(unittest.TestCase):
         )
         wx.prepare()
 
-        expected = 'KFAKE>KMINE,WIDE1-1,WIDE2-1:@221450z0.0/0.0_000/000g000t000r000p000P000h00b00000'
+        expected = 'KFAKE>KMINE,WIDE1-1,WIDE2-1:@221450z0.0/0.0_000/000g000t032r000p000P000h00b00000'
         self.assertEqual(expected, wx.raw)
         rain_location = 59
         self.assertEqual(rain_location, wx.raw.find('r000'))
 
         wx.rain_1h = 1.11
         wx.prepare()
-        expected = 'KFAKE>KMINE,WIDE1-1,WIDE2-1:@221450z0.0/0.0_000/000g000t000r111p000P000h00b00000'
+        expected = 'KFAKE>KMINE,WIDE1-1,WIDE2-1:@221450z0.0/0.0_000/000g000t032r111p000P000h00b00000'
         self.assertEqual(expected, wx.raw)
 
         wx.rain_1h = 0.01
         wx.prepare()
-        expected = 'KFAKE>KMINE,WIDE1-1,WIDE2-1:@221450z0.0/0.0_000/000g000t000r001p000P000h00b00000'
+        expected = 'KFAKE>KMINE,WIDE1-1,WIDE2-1:@221450z0.0/0.0_000/000g000t032r001p000P000h00b00000'
         self.assertEqual(expected, wx.raw)
 
     def test_beacon_factory(self):
@@ -1,3 +1,7 @@
+import asyncio
+import functools
+import threading
+import time
 import unittest
 from unittest import mock
 
@@ -214,3 +218,507 @@ class TestPluginBase(TestPlugin):
         expected = fake.FAKE_MESSAGE_TEXT
         actual = p.filter(packet)
         self.assertEqual(expected, actual)
+
+
+class TestReplyCache(TestPlugin):
+    def setUp(self) -> None:
+        super().setUp()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+        CONF.plugin_reply_cache_ttl = 600
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+
+    def _plugin_manager(self):
+        pm = aprsd_plugin.PluginManager()
+        self.plugin = fake.FakeRegexCommandPlugin()
+        pm.register_msg(self.plugin)
+        return pm
+
+    def test_cache_key(self):
+        packet = fake.fake_packet(message='  Fake   Cmd ', msg_number='12')
+        self.assertEqual(
+            aprsd_plugin.ReplyCache.cache_key(packet),
+            (fake.FAKE_FROM_CALLSIGN, 'fake cmd', '12'),
+        )
+        # No msgNo, no caching.
+        packet = fake.fake_packet(message='fake')
+        self.assertIsNone(aprsd_plugin.ReplyCache.cache_key(packet))
+
+    def test_run_replays_retransmitted_message(self):
+        pm = self._plugin_manager()
+        packet = fake.fake_packet(message='fake', msg_number='12')
+
+        with mock.patch.object(
+            self.plugin, 'process', side_effect=['first', 'second']
+        ) as mock_process:
+            results, handled = pm.run(packet)
+            self.assertEqual(['first'], results)
+            self.assertTrue(handled)
+
+            # The retransmitted copy gets the same reply without
+            # running the plugin again.
+            retransmit = fake.fake_packet(message='fake', msg_number='12')
+            self.assertEqual((['first'], True), pm.run(retransmit))
+            mock_process.assert_called_once()
+
+            # A new msgNo is a new message.
+            new_msg = fake.fake_packet(message='fake', msg_number='13')
+            self.assertEqual((['second'], True), pm.run(new_msg))
+
+        stats = aprsd_plugin.ReplyCache().stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['size'], 2)
+
+    def test_run_replays_new_reply_packets(self):
+        pm = self._plugin_manager()
+        packet = fake.fake_packet(message='fake', msg_number='12')
+        reply = packets.MessagePacket(
+            from_call=fake.FAKE_TO_CALLSIGN,
+            to_call=fake.FAKE_FROM_CALLSIGN,
+            message_text='reply',
+        )
+
+        with mock.patch.object(
+            self.plugin, 'process', return_value=[reply, 'text']
+        ) as mock_process:
+            results, _ = pm.run(packet)
+            self.assertIs(reply, results[0][0])
+            # Sent and being retried.
+            reply.prepare(create_msg_number=True)
+            reply.send_count = 2
+
+            retransmit = fake.fake_packet(message='fake', msg_number='12')
+            replayed, text = pm.run(retransmit)[0][0]
+            mock_process.assert_called_once()
+
+        self.assertEqual('text', text)
+        self.assertIsNot(reply, replayed)
+        self.assertEqual('reply', replayed.message_text)
+        self.assertIsNotNone(replayed.msgNo)
+        self.assertNotEqual(reply.msgNo, replayed.msgNo)
+        self.assertEqual(0, replayed.send_count)
+        self.assertEqual(2, reply.send_count)
+        self.assertIn(f'{{{replayed.msgNo}', replayed.raw)
+
+        # Every replay gets its own packet.
+        again = pm.run(retransmit)[0][0][0]
+        self.assertIsNot(replayed, again)
+        self.assertNotEqual(replayed.msgNo, again.msgNo)
+
+    def test_run_cache_disabled(self):
+        CONF.plugin_reply_cache_ttl = 0
+        pm = self._plugin_manager()
+        packet = fake.fake_packet(message='fake', msg_number='12')
+
+        with mock.patch.object(
+            self.plugin, 'process', side_effect=['first', 'second']
+        ) as mock_process:
+            self.assertEqual((['first'], True), pm.run(packet))
+            self.assertEqual((['second'], True), pm.run(packet))
+            self.assertEqual(2, mock_process.call_count)
+
+
+class FakeUnanchoredPlugin(aprsd_plugin.APRSDRegexCommandPluginBase):
+    version = '1.0'
+    command_regex = 'tide'
+    command_name = 'tide'
+
+    def process(self, packet):
+        return 'tide'
+
+
+class FakeBackrefPlugin(aprsd_plugin.APRSDRegexCommandPluginBase):
+    version = '1.0'
+    command_regex = r'^(x)\1'
+    command_name = 'xx'
+
+    def process(self, packet):
+        return 'xx'
+
+
+class FakeBadRegexPlugin(aprsd_plugin.APRSDRegexCommandPluginBase):
+    version = '1.0'
+    command_regex = r'^(x'
+    command_name = 'bad'
+
+    def process(self, packet):
+        return 'bad'
+
+
+class FakeOwnFilterPlugin(fake.FakeRegexCommandPlugin):
+    def filter(self, packet):
+        return 'own filter'
+
+
+class TestCommandDispatcher(TestPlugin):
+    def setUp(self) -> None:
+        super().setUp()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+
+    def _targets(self, dispatcher, message, **kwargs):
+        packet = fake.fake_packet(message=message, **kwargs)
+        return [
+            (p.__class__.__name__, matched)
+            for p, matched in dispatcher.dispatch(packet)
+        ]
+
+    def test_is_anchored(self):
+        self.assertTrue(aprsd_plugin._is_anchored(r'^([f]|[f]\s|fortune)'))
+        self.assertTrue(aprsd_plugin._is_anchored(r'^[a|b]'))
+        self.assertFalse(aprsd_plugin._is_anchored(r'^a|b'))
+        self.assertFalse(aprsd_plugin._is_anchored('tide'))
+
+    def test_dispatch(self):
+        fake_plugin = fake.FakeRegexCommandPlugin()
+        tide = FakeUnanchoredPlugin()
+        dispatcher = aprsd_plugin.CommandDispatcher([fake_plugin, tide])
+        self.assertEqual(2, len(dispatcher.indexed))
+        self.assertEqual([], dispatcher.unindexed)
+
+        self.assertEqual(
+            [('FakeRegexCommandPlugin', True)],
+            self._targets(dispatcher, 'Fortune'),
+        )
+        self.assertEqual(
+            [('FakeUnanchoredPlugin', True)],
+            self._targets(dispatcher, 'what is the TIDE'),
+        )
+        self.assertEqual(
+            [('FakeRegexCommandPlugin', True), ('FakeUnanchoredPlugin', True)],
+            self._targets(dispatcher, 'f tide'),
+        )
+        self.assertEqual([], self._targets(dispatcher, 'nothing'))
+        # Not for us.
+        self.assertEqual([], self._targets(dispatcher, 'f', tocall='notMe'))
+
+    def test_command_prefix(self):
+        prefix = aprsd_plugin._command_prefix
+        self.assertEqual(frozenset('f'), prefix(r'^([f]|[f]\s|fortune)'))
+        self.assertEqual(frozenset('mw'), prefix(r'^([m]|[W]\s|metar)'))
+        self.assertEqual(frozenset('abc'), prefix(r'^[a-c]+x'))
+        self.assertEqual(frozenset('x'), prefix(r'^(x)\1'))
+        # Unanchored, or no fixed first character.
+        self.assertIsNone(prefix('tide'))
+        self.assertIsNone(prefix(r'^a|b'))
+        self.assertIsNone(prefix(r'^\w+'))
+        self.assertIsNone(prefix(r'^[^a]'))
+        self.assertIsNone(prefix(r'^a?b'))
+        self.assertIsNone(prefix(r'^(a|)b'))
+        self.assertIsNone(prefix(r'^(?i:a)'))
+
+    def test_dispatch_only_searches_candidates(self):
+        fake_plugin = fake.FakeRegexCommandPlugin()
+        backref = FakeBackrefPlugin()
+        tide = FakeUnanchoredPlugin()
+        dispatcher = aprsd_plugin.CommandDispatcher([fake_plugin, backref, tide])
+        self.assertEqual({'f': {0}, 'x': {1}}, dispatcher.by_first_char)
+        self.assertEqual({2}, dispatcher.scanned)
+        self.assertEqual([0, 2], dispatcher.candidates('Fortune'))
+        self.assertEqual([2], dispatcher.candidates('nothing'))
+        self.assertEqual([('FakeBackrefPlugin', True)], self._targets(dispatcher, 'xx'))
+        self.assertEqual([], self._targets(dispatcher, 'xy'))
+
+    def test_dispatch_unindexed(self):
+        bad_regex = FakeBadRegexPlugin()
+        own_filter = FakeOwnFilterPlugin()
+        base = fake.FakeBaseNoThreadsPlugin()
+        dispatcher = aprsd_plugin.CommandDispatcher([bad_regex, own_filter, base])
+        self.assertEqual({}, dispatcher.indexed)
+        self.assertEqual(
+            [
+                ('FakeBadRegexPlugin', False),
+                ('FakeOwnFilterPlugin', False),
+                ('FakeBaseNoThreadsPlugin', False),
+            ],
+            self._targets(dispatcher, 'nothing'),
+        )
+
+    def test_dispatch_disabled(self):
+        disabled = fake.FakeRegexCommandPlugin()
+        disabled.enabled = False
+        tide = FakeUnanchoredPlugin()
+        dispatcher = aprsd_plugin.CommandDispatcher([tide, disabled])
+        self.assertEqual(
+            [('FakeUnanchoredPlugin', True), ('FakeRegexCommandPlugin', False)],
+            self._targets(dispatcher, 'tide'),
+        )
+        self.assertEqual(
+            [('FakeRegexCommandPlugin', False)],
+            self._targets(dispatcher, 'tide', tocall='notMe'),
+        )
+
+    def test_dispatch_non_message_packet(self):
+        dispatcher = aprsd_plugin.CommandDispatcher([fake.FakeRegexCommandPlugin()])
+        packet = fake.fake_ack_packet()
+        targets = dispatcher.dispatch(packet)
+        self.assertEqual(1, len(targets))
+        self.assertFalse(targets[0][1])
+
+    def test_run_uses_dispatcher(self):
+        pm = aprsd_plugin.PluginManager()
+        fake_plugin = fake.FakeRegexCommandPlugin()
+        tide = FakeUnanchoredPlugin()
+        pm.register_msg(fake_plugin)
+        pm.register_msg(tide)
+
+        with mock.patch.object(tide, 'filter') as mock_filter:
+            results, handled = pm.run(fake.fake_packet(message='fake'))
+            mock_filter.assert_not_called()
+        self.assertEqual([fake.FAKE_MESSAGE_TEXT], results)
+        self.assertTrue(handled)
+        self.assertEqual(1, fake_plugin.rx_count)
+        self.assertEqual(0, tide.rx_count)
+
+        results, handled = pm.run(fake.fake_packet(message='nothing'))
+        self.assertEqual([], results)
+        self.assertFalse(handled)
+
+
+class FakeSlowPlugin(aprsd_plugin.APRSDRegexCommandPluginBase):
+    version = '1.0'
+    command_regex = 'slow'
+    command_name = 'slow'
+
+    def setup(self):
+        super().setup()
+        self.release = threading.Event()
+
+    def process(self, packet):
+        self.release.wait(5)
+        return 'slow reply'
+
+
+class TestParallelPlugins(TestPlugin):
+    def setUp(self) -> None:
+        super().setUp()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+        CONF.plugin_timeout = 0.2
+        CONF.plugin_timeouts = {}
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        aprsd_plugin.PluginManager().stop()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        CONF.plugin_timeout = 30.0
+        CONF.plugin_timeouts = {}
+
+    def test_plugin_timeout_override(self):
+        pm = aprsd_plugin.PluginManager()
+        slow = FakeSlowPlugin()
+        self.assertEqual(0.2, pm._plugin_timeout(slow))
+        CONF.plugin_timeouts = {'FakeSlowPlugin': '3'}
+        self.assertEqual(3.0, pm._plugin_timeout(slow))
+        CONF.plugin_timeouts = {'tests.test_plugin.FakeSlowPlugin': '4'}
+        self.assertEqual(4.0, pm._plugin_timeout(slow))
+        CONF.plugin_timeouts = {'FakeSlowPlugin': 'bogus'}
+        self.assertEqual(0.2, pm._plugin_timeout(slow))
+
+    def test_slow_plugin_times_out(self):
+        pm = aprsd_plugin.PluginManager()
+        slow = FakeSlowPlugin()
+        fast = fake.FakeRegexCommandPlugin()
+        pm.register_msg(slow)
+        pm.register_msg(fast)
+
+        # 'f slow' matches both plugins.
+        packet = fake.fake_packet(message='f slow')
+        results, handled = pm.run(packet)
+        slow.release.set()
+
+        self.assertEqual([fake.FAKE_MESSAGE_TEXT], results)
+        self.assertTrue(handled)
+        self.assertEqual(1, slow.timeout_count)
+        self.assertEqual(0, fast.timeout_count)
+        # Partial replies aren't cached.
+        self.assertIsNone(aprsd_plugin.ReplyCache().get(packet))
+
+        stats = pm.stats()
+        fast_stats = stats['tests.fake.FakeRegexCommandPlugin']
+        self.assertEqual(0, fast_stats['timeouts'])
+        self.assertEqual(1, fast_stats['latency_ms']['count'])
+        self.assertEqual(1, stats['tests.test_plugin.FakeSlowPlugin']['timeouts'])
+
+    def test_results_in_plugin_order(self):
+        pm = aprsd_plugin.PluginManager()
+        CONF.plugin_timeout = 5
+        slow = FakeSlowPlugin()
+        fast = fake.FakeRegexCommandPlugin()
+        pm.register_msg(slow)
+        pm.register_msg(fast)
+        slow.release.set()
+
+        calls = [
+            (slow, lambda: 'first'),
+            (fast, lambda: 'second'),
+        ]
+        finished, timed_out = pm._run_plugins(calls)
+        self.assertFalse(timed_out)
+        self.assertEqual(
+            [(slow, 'first'), (fast, 'second')],
+            finished,
+        )
+
+    def test_plugin_exception(self):
+        pm = aprsd_plugin.PluginManager()
+        fast = fake.FakeRegexCommandPlugin()
+
+        def boom():
+            raise TimeoutError('backend timed out')
+
+        finished, timed_out = pm._run_plugins([(fast, boom)])
+        self.assertEqual([], finished)
+        self.assertFalse(timed_out)
+        self.assertEqual(0, fast.timeout_count)
+        self.assertEqual(1, fast.latency_count)
+
+
+class FakeAsyncPlugin(aprsd_plugin.APRSDRegexCommandPluginBase):
+    version = '1.0'
+    command_regex = '^async'
+    command_name = 'async'
+    delay = 0
+
+    def setup(self):
+        super().setup()
+        self.cancelled = False
+
+    async def process(self, packet):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return f'async {threading.current_thread().name}'
+
+
+class TestAsyncPlugins(TestPlugin):
+    def setUp(self) -> None:
+        super().setUp()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+        CONF.plugin_timeout = 5
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        aprsd_plugin.PluginManager().stop()
+        aprsd_plugin.ReplyCache._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        CONF.plugin_timeout = 30.0
+
+    def test_is_async(self):
+        self.assertTrue(FakeAsyncPlugin().is_async)
+        self.assertFalse(fake.FakeRegexCommandPlugin().is_async)
+
+    def test_run_async_plugin(self):
+        pm = aprsd_plugin.PluginManager()
+        async_plugin = FakeAsyncPlugin()
+        pm.register_msg(async_plugin)
+        pm.register_msg(fake.FakeRegexCommandPlugin())
+
+        results, handled = pm.run(fake.fake_packet(message='async'))
+        self.assertEqual(['async PluginAsyncLoop'], results)
+        self.assertTrue(handled)
+        self.assertEqual(1, async_plugin.rx_count)
+        self.assertEqual(1, async_plugin.tx_count)
+        self.assertEqual(1, async_plugin.latency_count)
+
+    def test_async_plugins_share_the_loop(self):
+        CONF.plugin_workers = 1
+        pm = aprsd_plugin.PluginManager()
+        plugins = [FakeAsyncPlugin() for _ in range(5)]
+        for p in plugins:
+            p.delay = 0.2
+
+        start = time.monotonic()
+        finished, timed_out = pm._run_plugins(
+            [
+                (p, functools.partial(p.run_command_async, fake.fake_packet()))
+                for p in plugins
+            ],
+        )
+        elapsed = time.monotonic() - start
+        CONF.plugin_workers = 8
+
+        self.assertFalse(timed_out)
+        self.assertEqual(5, len(finished))
+        # They waited concurrently, not one after the other.
+        self.assertLess(elapsed, 0.2 * 5)
+
+    def test_async_plugin_timeout_cancels(self):
+        CONF.plugin_timeout = 0.1
+        pm = aprsd_plugin.PluginManager()
+        async_plugin = FakeAsyncPlugin()
+        async_plugin.delay = 5
+        pm.register_msg(async_plugin)
+
+        results, handled = pm.run(fake.fake_packet(message='async'))
+        self.assertEqual([], results)
+        self.assertFalse(handled)
+        self.assertEqual(1, async_plugin.timeout_count)
+        for _ in range(50):
+            if async_plugin.cancelled:
+                break
+            time.sleep(0.01)
+        self.assertTrue(async_plugin.cancelled)
+
+    def test_async_plugin_filter(self):
+        # The blocking path still works for async plugins.
+        async_plugin = FakeAsyncPlugin()
+        result = async_plugin.filter(fake.fake_packet(message='async'))
+        self.assertEqual('async PluginAsyncLoop', result)
+
+
+class TestWatchListDispatch(TestPlugin):
+    def setUp(self) -> None:
+        super().setUp()
+        aprsd_plugin.PluginManager._instance = None
+        packets.WatchList._instance = None
+        CONF.watch_list.enabled = True
+        CONF.watch_list.callsigns = ['KM6*']
+        # The plugin setup sets the APRS-IS filter.
+        client_patcher = mock.patch('aprsd.plugin.APRSDClient')
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        aprsd_plugin.PluginManager().stop()
+        aprsd_plugin.PluginManager._instance = None
+        packets.WatchList._instance = None
+        CONF.watch_list.enabled = False
+        CONF.watch_list.callsigns = None
+
+    def test_run_watchlist(self):
+        pm = aprsd_plugin.PluginManager()
+        plugin = fake.FakeWatchListPlugin()
+        pm._watchlist_pm.register(plugin)
+
+        packet = fake.fake_packet(fromcall='KM6LYW-9')
+        self.assertEqual([fake.FAKE_MESSAGE_TEXT], pm.run_watchlist(packet))
+        self.assertEqual(1, plugin.rx_count)
+
+    def test_run_watchlist_skips_other_callsigns(self):
+        pm = aprsd_plugin.PluginManager()
+        plugin = fake.FakeWatchListPlugin()
+        pm._watchlist_pm.register(plugin)
+
+        with mock.patch.object(plugin, 'filter') as mock_filter:
+            self.assertEqual([], pm.run_watchlist(fake.fake_packet(fromcall='WB4BOR')))
+        mock_filter.assert_not_called()
@@ -0,0 +1,155 @@
+import os
+import unittest
+
+from oslo_config import cfg
+
+from aprsd import (
+    conf,  # noqa: F401
+    exception,
+    packets,
+    plugin_isolation,
+)
+from aprsd import plugin as aprsd_plugin
+from aprsd.packets import core
+
+from . import fake
+
+CONF = cfg.CONF
+
+
+class FakeIsolatedPlugin(aprsd_plugin.APRSDRegexCommandPluginBase):
+    version = '2.0'
+    command_regex = '^(pid|crash|packet|null|fail)'
+    command_name = 'isolated'
+
+    def process(self, packet):
+        message = packet.message_text
+        if message == 'crash':
+            os._exit(1)
+        elif message == 'packet':
+            return core.MessagePacket(
+                from_call=CONF.callsign,
+                to_call=packet.from_call,
+                message_text='a packet',
+            )
+        elif message == 'null':
+            return packets.NULL_MESSAGE
+        elif message == 'fail':
+            raise ValueError('plugin failed')
+        return ['pid', str(os.getpid())]
+
+
+PLUGIN_NAME = 'tests.test_plugin_isolation.FakeIsolatedPlugin'
+
+
+class TestIsolatedPluginPool(unittest.TestCase):
+    def setUp(self):
+        plugin_isolation.IsolatedPluginPool._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        aprsd_plugin.ReplyCache._instance = None
+        CONF.callsign = fake.FAKE_TO_CALLSIGN
+        CONF.isolated_plugins = [PLUGIN_NAME]
+        CONF.isolated_plugin_workers = 1
+        CONF.plugin_reply_cache_ttl = 0
+
+    def tearDown(self):
+        plugin_isolation.IsolatedPluginPool().stop()
+        aprsd_plugin.PluginManager().stop()
+        plugin_isolation.IsolatedPluginPool._instance = None
+        aprsd_plugin.PluginManager._instance = None
+        aprsd_plugin.ReplyCache._instance = None
+        CONF.isolated_plugins = []
+        CONF.isolated_plugin_workers = 2
+        CONF.isolated_plugin_max_calls = 1000
+        CONF.plugin_reply_cache_ttl = 600
+
+    def _pm(self):
+        pm = aprsd_plugin.PluginManager()
+        pm.setup_plugins(load_help_plugin=False, plugin_list=[PLUGIN_NAME])
+        return pm
+
+    def test_load_proxy(self):
+        pm = self._pm()
+        plugins = pm.get_message_plugins()
+        self.assertEqual(1, len(plugins))
+        proxy = plugins[0]
+        self.assertIsInstance(proxy, plugin_isolation.IsolatedRegexCommandPlugin)
+        self.assertEqual('2.0', proxy.version)
+        self.assertEqual(FakeIsolatedPlugin.command_regex, proxy.command_regex)
+        # The dispatcher can index the proxy like any regex plugin.
+        self.assertIn(proxy, pm._dispatcher.indexed.values())
+        self.assertIn(PLUGIN_NAME, pm.stats())
+
+    def test_run_in_worker(self):
+        pm = self._pm()
+        results, handled = pm.run(fake.fake_packet(message='pid'))
+        self.assertTrue(handled)
+        self.assertEqual(1, len(results))
+        name, pid = results[0]
+        self.assertEqual('pid', name)
+        self.assertNotEqual(str(os.getpid()), pid)
+
+        results, _ = pm.run(fake.fake_packet(message='packet', msg_number='2'))
+        self.assertIsInstance(results[0], core.MessagePacket)
+        self.assertEqual('a packet', results[0].message_text)
+
+        results, handled = pm.run(fake.fake_packet(message='null', msg_number='3'))
+        self.assertEqual([], results)
+        self.assertTrue(handled)
+
+        stats = plugin_isolation.IsolatedPluginPool().stats()
+        self.assertEqual(3, stats['calls'])
+        self.assertEqual(3, stats['ipc_ms']['count'])
+        self.assertEqual([PLUGIN_NAME], stats['plugins'])
+
+    def test_plugin_error(self):
+        pm = self._pm()
+        proxy = pm.get_message_plugins()[0]
+        pool = plugin_isolation.IsolatedPluginPool()
+        with self.assertRaises(exception.IsolatedPluginError):
+            pool.call(proxy, 'process', fake.fake_packet(message='fail'))
+        self.assertEqual(1, pool.stats()['errors'])
+        # The worker is still usable.
+        result = pool.call(proxy, 'process', fake.fake_packet(message='pid'))
+        self.assertEqual('pid', result[0])
+
+    def test_crash_restarts_worker(self):
+        pm = self._pm()
+        proxy = pm.get_message_plugins()[0]
+        pool = plugin_isolation.IsolatedPluginPool()
+        with self.assertRaises(exception.IsolatedPluginError):
+            pool.call(proxy, 'process', fake.fake_packet(message='crash'))
+        self.assertEqual(1, pool.stats()['crashes'])
+        # The next call waits for the restarted worker.
+        result = pool.call(proxy, 'process', fake.fake_packet(message='pid'))
+        self.assertEqual('pid', result[0])
+
+    def test_recycle_after_max_calls(self):
+        CONF.isolated_plugin_max_calls = 1
+        pm = self._pm()
+        proxy = pm.get_message_plugins()[0]
+        pool = plugin_isolation.IsolatedPluginPool()
+        first = pool.call(proxy, 'process', fake.fake_packet(message='pid'))
+        second = pool.call(proxy, 'process', fake.fake_packet(message='pid'))
+        self.assertNotEqual(first[1], second[1])
+        self.assertGreaterEqual(pool.stats()['recycles'], 1)
+
+
+class TestResultEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        packet = fake.fake_packet(message='hi')
+        for value in ['text', None, packets.NULL_MESSAGE, ['a', 'b']]:
+            self.assertEqual(
+                value,
+                plugin_isolation._decode_result(
+                    plugin_isolation._encode_result(value),
+                ),
+            )
+        decoded = plugin_isolation._decode_result(
+            plugin_isolation._encode_result([packet]),
+        )
+        self.assertEqual(packet.message_text, decoded[0].message_text)
+        self.assertIs(
+            packets.NULL_MESSAGE,
+            plugin_isolation._decode_result(packets.NULL_MESSAGE),
+        )
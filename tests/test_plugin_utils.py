@@ -0,0 +1,166 @@
+import http.server
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+from oslo_config import cfg
+
+from aprsd import (
+    conf,  # noqa: F401
+    plugin_utils,
+)
+
+CONF = cfg.CONF
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every GET with the path and a request count."""
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            count = len(server.requests)
+        if self.path.startswith('/slow'):
+            time.sleep(0.3)
+        if self.path.startswith('/error'):
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({'path': self.path, 'count': count}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPluginHTTPClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        plugin_utils.PluginHTTPClient._instance = None
+        self.server.requests.clear()
+        CONF.plugin_http_cache_ttls = {'test': '60', 'nocache': '0', 'short': '0.1'}
+
+    def tearDown(self):
+        plugin_utils.PluginHTTPClient._instance = None
+        CONF.plugin_http_cache_ttls = {
+            'aprs_fi': '60',
+            'weather_gov': '600',
+            'metar': '300',
+            'openweathermap': '600',
+        }
+
+    def test_cache_key(self):
+        key = plugin_utils.PluginHTTPClient.cache_key
+        self.assertEqual(
+            key('HTTP://Example.COM/a?b=2&a=1'),
+            key('http://example.com/a', params={'a': 1, 'b': 2}),
+        )
+        self.assertNotEqual(
+            key('http://example.com/a?a=1'), key('http://example.com/a?a=2')
+        )
+
+    def test_cached(self):
+        client = plugin_utils.PluginHTTPClient()
+        first = client.get_json('test', f'{self.base_url}/data?b=2&a=1')
+        second = client.get_json('test', f'{self.base_url}/data?a=1&b=2')
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(self.server.requests))
+
+        stats = client.stats()
+        self.assertEqual(1, stats['endpoints']['test']['hits'])
+        self.assertEqual(1, stats['endpoints']['test']['misses'])
+        self.assertEqual(1, stats['cache']['size'])
+        self.assertEqual(1, stats['sessions'])
+
+    def test_cache_disabled(self):
+        client = plugin_utils.PluginHTTPClient()
+        client.get_json('nocache', f'{self.base_url}/data')
+        client.get_json('nocache', f'{self.base_url}/data')
+        self.assertEqual(2, len(self.server.requests))
+        # The session was reused.
+        self.assertEqual(1, client.stats()['sessions'])
+
+    def test_cache_expires(self):
+        client = plugin_utils.PluginHTTPClient()
+        client.get_json('short', f'{self.base_url}/data')
+        time.sleep(0.15)
+        data = client.get_json('short', f'{self.base_url}/data')
+        self.assertEqual(2, data['count'])
+
+    def test_coalesce(self):
+        client = plugin_utils.PluginHTTPClient()
+        results = []
+
+        def fetch():
+            results.append(client.get_json('test', f'{self.base_url}/slow'))
+
+        threads = [threading.Thread(target=fetch) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(5, len(results))
+        stats = client.stats()['endpoints']['test']
+        self.assertEqual(5, stats['misses'] + stats['coalesced'] + stats['hits'])
+
+    def test_error_not_cached(self):
+        client = plugin_utils.PluginHTTPClient()
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                client.get_json('test', f'{self.base_url}/error')
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual(2, client.stats()['endpoints']['test']['errors'])
+
+    def test_get_aprs_fi(self):
+        with mock.patch.object(
+            plugin_utils.PluginHTTPClient,
+            'get_json',
+            return_value={'entries': []},
+        ) as mock_get:
+            self.assertEqual(
+                {'entries': []},
+                plugin_utils.get_aprs_fi('key', 'KFAKE'),
+            )
+            self.assertEqual('aprs_fi', mock_get.call_args[0][0])
+
+    def test_get_weather_gov_metar(self):
+        with mock.patch.object(
+            plugin_utils.PluginHTTPClient,
+            'get',
+            return_value=mock.Mock(text='{}'),
+        ) as mock_get:
+            self.assertEqual('{}', plugin_utils.get_weather_gov_metar('KPAO').text)
+            self.assertEqual('metar', mock_get.call_args[0][0])
+
+    def test_get_aprs_fi_failure(self):
+        with mock.patch.object(
+            plugin_utils.PluginHTTPClient,
+            'get_json',
+            side_effect=requests.ConnectionError('down'),
+        ):
+            with self.assertRaises(Exception) as ctx:
+                plugin_utils.get_aprs_fi('key', 'KFAKE')
+            self.assertEqual('Failed to get aprs.fi location', str(ctx.exception))
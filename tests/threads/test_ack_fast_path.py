@@ -0,0 +1,134 @@
+import queue
+import unittest
+from unittest import mock
+
+from oslo_config import cfg
+
+from aprsd.threads import ack_fast_path, rx
+from tests import fake
+
+CONF = cfg.CONF
+
+
+class TestAckFastPath(unittest.TestCase):
+    """Unit tests for the AckFastPath class."""
+
+    def setUp(self):
+        ack_fast_path.AckFastPath._instance = None
+        CONF.callsign = 'KMINE'
+        self.send_patcher = mock.patch(
+            'aprsd.threads.ack_fast_path.tx.send_priority_ack',
+        )
+        self.mock_send = self.send_patcher.start()
+        self.future = mock.MagicMock()
+        self.mock_send.return_value = self.future
+
+    def tearDown(self):
+        self.send_patcher.stop()
+        ack_fast_path.AckFastPath._instance = None
+
+    def test_singleton(self):
+        self.assertIs(ack_fast_path.AckFastPath(), ack_fast_path.AckFastPath())
+
+    def test_check_message_for_us(self):
+        fp = ack_fast_path.AckFastPath()
+        result = fp.check('KFAKE>APZ100,WIDE2-1::KMINE    :ping{123')
+
+        self.assertTrue(result)
+        self.mock_send.assert_called_once()
+        ack = self.mock_send.call_args[0][0]
+        self.assertEqual(ack.from_call, 'KMINE')
+        self.assertEqual(ack.to_call, 'KFAKE')
+        self.assertEqual(ack.msgNo, '123')
+        self.assertTrue(fp.was_acked('KFAKE', '123'))
+
+    def test_check_bytes_and_reply_ack(self):
+        fp = ack_fast_path.AckFastPath()
+        self.assertTrue(fp.check(b'KFAKE>APZ100::KMINE    :ping{AB}12'))
+        self.assertEqual(self.mock_send.call_args[0][0].msgNo, 'AB')
+
+    def test_check_not_for_us(self):
+        fp = ack_fast_path.AckFastPath()
+        self.assertFalse(fp.check('KFAKE>APZ100::KOTHER   :ping{123'))
+        self.mock_send.assert_not_called()
+
+    def test_check_no_msgno(self):
+        fp = ack_fast_path.AckFastPath()
+        self.assertFalse(fp.check('KFAKE>APZ100::KMINE    :ping'))
+        self.assertFalse(fp.check('KFAKE>APZ100::KMINE    :ack123'))
+        self.assertFalse(fp.check('KFAKE>APZ100:!3745.00N/12224.00W>'))
+        self.mock_send.assert_not_called()
+
+    def test_check_dupe(self):
+        fp = ack_fast_path.AckFastPath()
+        line = 'KFAKE>APZ100,WIDE2-1::KMINE    :ping{123'
+        self.assertTrue(fp.check(line))
+        self.assertFalse(fp.check(line))
+        self.mock_send.assert_called_once()
+        stats = fp.stats()
+        self.assertEqual(stats['acked'], 1)
+        self.assertEqual(stats['dupes'], 1)
+
+    def test_latency_recorded(self):
+        fp = ack_fast_path.AckFastPath()
+        fp.check('KFAKE>APZ100::KMINE    :ping{123')
+
+        # Run the done callback like the executor would.
+        callback = self.future.add_done_callback.call_args[0][0]
+        callback(self.future)
+
+        latency = fp.stats()['latency_ms']
+        self.assertEqual(latency['count'], 1)
+        self.assertGreaterEqual(latency['max'], latency['last'])
+
+
+class TestRXThreadAckFastPath(unittest.TestCase):
+    """Test the RX thread and processing thread use the fast path."""
+
+    def setUp(self):
+        ack_fast_path.AckFastPath._instance = None
+        CONF.callsign = 'KMINE'
+
+    def tearDown(self):
+        CONF.enable_ack_fast_path = False
+        ack_fast_path.AckFastPath._instance = None
+
+    def test_rx_thread_disabled(self):
+        CONF.enable_ack_fast_path = False
+        rx_thread = rx.APRSDRXThread(queue.Queue())
+        with mock.patch.object(ack_fast_path.AckFastPath, 'check') as mock_check:
+            rx_thread.process_packet('KFAKE>APZ100::KMINE    :ping{123')
+            mock_check.assert_not_called()
+        self.assertEqual(rx_thread.packet_queue.qsize(), 1)
+
+    def test_rx_thread_enabled(self):
+        CONF.enable_ack_fast_path = True
+        rx_thread = rx.APRSDRXThread(queue.Queue())
+        line = 'KFAKE>APZ100::KMINE    :ping{123'
+        with mock.patch.object(ack_fast_path.AckFastPath, 'check') as mock_check:
+            rx_thread.process_packet(line)
+            mock_check.assert_called_once_with(line)
+        # The line still goes through the normal pipeline.
+        self.assertEqual(rx_thread.packet_queue.get_nowait(), line)
+
+    def test_process_packet_skips_fast_path_ack(self):
+        class ConcreteProcessThread(rx.APRSDProcessPacketThread):
+            def process_our_message_packet(self, packet):
+                pass
+
+        CONF.enable_ack_fast_path = True
+        packet = fake.fake_packet(tocall='KMINE', message='ping', msg_number='123')
+        with mock.patch('aprsd.threads.rx.APRSDClient'):
+            thread = ConcreteProcessThread(queue.Queue())
+        with mock.patch('aprsd.threads.rx.tx.send') as mock_send:
+            with mock.patch.object(
+                ack_fast_path.AckFastPath, 'was_acked', return_value=True
+            ):
+                thread.process_packet(packet)
+            mock_send.assert_not_called()
+
+            with mock.patch.object(
+                ack_fast_path.AckFastPath, 'was_acked', return_value=False
+            ):
+                thread.process_packet(packet)
+            mock_send.assert_called_once()
@@ -0,0 +1,137 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from oslo_config import cfg
+
+from aprsd.threads import keyed_pool, rx
+from tests import fake
+
+CONF = cfg.CONF
+
+
+class TestKeyedWorkerPool(unittest.TestCase):
+    """Unit tests for the KeyedWorkerPool class."""
+
+    def setUp(self):
+        keyed_pool.KeyedWorkerPool._instance = None
+        CONF.packet_process_workers = 4
+
+    def tearDown(self):
+        pool = keyed_pool.KeyedWorkerPool._instance
+        if pool:
+            for worker in pool.workers:
+                worker.stop()
+            for worker in pool.workers:
+                worker.join(timeout=5)
+        keyed_pool.KeyedWorkerPool._instance = None
+        CONF.packet_process_workers = 4
+
+    def _wait_for(self, condition, timeout=5):
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_singleton(self):
+        self.assertIs(keyed_pool.KeyedWorkerPool(), keyed_pool.KeyedWorkerPool())
+
+    def test_shard_for_is_stable(self):
+        pool = keyed_pool.KeyedWorkerPool()
+        self.assertEqual(pool.shard_for('KFAKE'), pool.shard_for('kfake'))
+        shards = {pool.shard_for(f'CALL{i}') for i in range(100)}
+        self.assertEqual({0, 1, 2, 3}, shards)
+
+    def test_inline_when_size_zero(self):
+        CONF.packet_process_workers = 0
+        pool = keyed_pool.KeyedWorkerPool()
+        calls = []
+        pool.submit('KFAKE', calls.append, 1)
+        self.assertEqual([1], calls)
+        self.assertEqual([], pool.workers)
+        self.assertEqual({'size': 0, 'shards': {}}, pool.stats())
+
+    def test_order_per_key(self):
+        pool = keyed_pool.KeyedWorkerPool()
+        results = []
+        for i in range(20):
+            pool.submit('KFAKE', results.append, i)
+        self.assertTrue(self._wait_for(lambda: len(results) == 20))
+        self.assertEqual(list(range(20)), results)
+
+    def test_keys_run_in_parallel(self):
+        pool = keyed_pool.KeyedWorkerPool()
+        # Find two keys on different shards.
+        key1 = 'KFAKE'
+        key2 = next(
+            f'CALL{i}'
+            for i in range(100)
+            if pool.shard_for(f'CALL{i}') != pool.shard_for(key1)
+        )
+        release = threading.Event()
+        done = []
+        pool.submit(key1, release.wait, 5)
+        pool.submit(key2, done.append, key2)
+        # key2 isn't stuck behind the blocked key1 job.
+        self.assertTrue(self._wait_for(lambda: done == [key2], timeout=2))
+        release.set()
+
+    def test_stats(self):
+        pool = keyed_pool.KeyedWorkerPool()
+        done = threading.Event()
+        pool.submit('KFAKE', done.set)
+        self.assertTrue(done.wait(5))
+        shard = pool.workers[pool.shard_for('KFAKE')]
+        self.assertTrue(self._wait_for(lambda: shard.processed == 1))
+
+        stats = pool.stats()
+        self.assertEqual(4, stats['size'])
+        self.assertEqual(4, len(stats['shards']))
+        shard_stats = stats['shards'][shard.name]
+        self.assertEqual(0, shard_stats['queue'])
+        self.assertEqual(1, shard_stats['processed'])
+        self.assertIn('max', shard_stats['latency_ms'])
+
+    def test_job_exception(self):
+        pool = keyed_pool.KeyedWorkerPool()
+        results = []
+
+        def boom():
+            raise ValueError('boom')
+
+        pool.submit('KFAKE', boom)
+        pool.submit('KFAKE', results.append, 'after')
+        self.assertTrue(self._wait_for(lambda: results == ['after']))
+
+
+class TestPluginProcessPacketThreadSharding(unittest.TestCase):
+    def setUp(self):
+        keyed_pool.KeyedWorkerPool._instance = None
+        with mock.patch('aprsd.threads.rx.APRSDClient'):
+            self.thread = rx.APRSDPluginProcessPacketThread(packet_queue=mock.Mock())
+
+    def tearDown(self):
+        keyed_pool.KeyedWorkerPool._instance = None
+
+    def test_process_our_message_packet_submits(self):
+        packet = fake.fake_packet(message='ping')
+        with mock.patch.object(keyed_pool.KeyedWorkerPool, 'submit') as mock_submit:
+            self.thread.process_our_message_packet(packet)
+            mock_submit.assert_called_once_with(
+                packet.from_call,
+                self.thread.handle_our_message_packet,
+                packet,
+            )
+
+    def test_process_other_packet_submits(self):
+        packet = fake.fake_packet(message='ping')
+        with mock.patch.object(keyed_pool.KeyedWorkerPool, 'submit') as mock_submit:
+            self.thread.process_other_packet(packet, for_us=False)
+            mock_submit.assert_called_once_with(
+                packet.from_call,
+                self.thread.handle_other_packet,
+                packet,
+            )
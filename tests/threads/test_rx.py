@@ -2,10 +2,15 @@ import queue
 import unittest
 from unittest import mock
 
+from oslo_config import cfg
+
+from aprsd.packets import core
 from aprsd.threads import rx
 from tests import fake
 from tests.mock_client_driver import MockClientDriver
 
+CONF = cfg.CONF
+
 
 class TestAPRSDRXThread(unittest.TestCase):
     """Unit tests for the APRSDRXThread class."""
@@ -319,6 +324,30 @@ class TestAPRSDFilterThread(unittest.TestCase):
                 # Queue should be empty after get()
                 self.assertTrue(self.packet_queue.empty())
 
+    def test_loop_lazy_packet_filtered_first(self):
+        """A dropped LazyPacket isn't logged, so it's never decoded."""
+        CONF.set_override('enable_lazy_packet_decode', True)
+        self.addCleanup(CONF.clear_override, 'enable_lazy_packet_decode')
+        packet = core.factory('KM6LYW>APZ100:>status')
+        # Not return_value, mock's isinstance() checks would decode it.
+        self.mock_client.return_value.decode_packet.side_effect = lambda raw: packet
+        self.packet_queue.put(packet.raw)
+
+        with mock.patch.object(self.filter_thread, 'filter_packet', return_value=None):
+            with mock.patch.object(self.filter_thread, 'print_packet') as mock_print:
+                self.filter_thread.loop()
+                mock_print.assert_not_called()
+        self.assertFalse(packet.decoded)
+
+        self.packet_queue.put(packet.raw)
+        with mock.patch.object(
+            self.filter_thread, 'filter_packet', return_value=packet
+        ):
+            with mock.patch.object(self.filter_thread, 'print_packet') as mock_print:
+                with mock.patch('aprsd.threads.rx.collector'):
+                    self.filter_thread.loop()
+                    mock_print.assert_called_once_with(packet)
+
 
 class TestAPRSDProcessPacketThread(unittest.TestCase):
     """Unit tests for the APRSDProcessPacketThread class."""
@@ -1,3 +1,4 @@
+import threading
 import time
 import unittest
 from unittest import mock
@@ -925,6 +926,46 @@ class TestSchedulerTimingGuards(unittest.TestCase):
             scheduler.stop()
             scheduler.executor.shutdown(wait=False)
 
+    def test_priority_ack_isnt_sent_again_by_scheduler(self):
+        """A scheduler pass right after send_priority_ack doesn't resend it.
+
+        The priority send sets last_send_time only once it's sent, so
+        the scheduler has to know the send is already in flight.
+        """
+        scheduler = tx.AckSendSchedulerThread(max_workers=2)
+        release = threading.Event()
+
+        def send_direct(packet):
+            release.wait(5)
+            return True
+
+        try:
+            ack_packet = fake.fake_ack_packet()
+            with (
+                mock.patch.object(tx.collector, 'PacketCollector') as mock_collector,
+                mock.patch.object(tx, '_get_ack_scheduler', return_value=scheduler),
+                mock.patch.object(
+                    tx, '_send_direct', side_effect=send_direct
+                ) as mock_send,
+                mock.patch.object(scheduler, 'wait'),
+            ):
+                # Other tests empty the global PacketCollector.
+                mock_collector.return_value.tx.side_effect = tracker.PacketTrack().tx
+                future = tx.send_priority_ack(ack_packet)
+                self.assertIsNotNone(future)
+                scheduler.loop()
+                release.set()
+                future.result(timeout=5)
+                scheduler.executor.shutdown(wait=True)
+
+                mock_send.assert_called_once()
+                self.assertEqual(1, ack_packet.send_count)
+                self.assertEqual(set(), scheduler.in_flight)
+        finally:
+            release.set()
+            scheduler.stop()
+            scheduler.executor.shutdown(wait=False)
+
     def test_packet_scheduler_skips_recently_sent(self):
         """PacketSendSchedulerThread must not re-submit if sent recently.
 
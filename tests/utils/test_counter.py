@@ -122,3 +122,21 @@ class TestPacketCounter(unittest.TestCase):
         for value in values:
             self.assertGreaterEqual(value, 1)
             self.assertLessEqual(value, 9999)
+
+    def test_next_value_global(self):
+        """Test next_value() without a peer uses the global counter."""
+        counter = PacketCounter()
+        counter._val = 9999
+        self.assertEqual(counter.next_value(), '1')
+        self.assertEqual(counter.value, '1')
+
+    def test_next_value_per_peer(self):
+        """Test next_value() keeps a separate sequence per peer."""
+        counter = PacketCounter()
+        global_val = counter.value
+        first_a = int(counter.next_value('KA'))
+        first_b = int(counter.next_value('kb'))
+        self.assertEqual(int(counter.next_value('ka')), first_a % 9999 + 1)
+        self.assertEqual(int(counter.next_value('KB')), first_b % 9999 + 1)
+        # The global counter is untouched.
+        self.assertEqual(counter.value, global_val)
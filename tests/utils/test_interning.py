@@ -0,0 +1,73 @@
+import unittest
+
+import aprslib
+from oslo_config import cfg
+
+from aprsd.packets import core
+from aprsd.utils import interning
+
+CONF = cfg.CONF
+
+
+def new_str(value):
+    """An equal str that isn't the same object as value."""
+    return ''.join(list(value))
+
+
+class TestStringInterner(unittest.TestCase):
+    def setUp(self):
+        self.interner = interning.StringInterner()
+        self.interner.flush()
+
+    def tearDown(self):
+        CONF.clear_override('packet_intern_max_size')
+        self.interner.flush()
+
+    def test_intern(self):
+        first = new_str('KM6LYW')
+        second = new_str('KM6LYW')
+        self.assertIsNot(first, second)
+        self.assertIs(first, self.interner.intern(first))
+        self.assertIs(first, self.interner.intern(second))
+        self.assertEqual(1, len(self.interner))
+
+    def test_empty(self):
+        self.assertIsNone(self.interner.intern(None))
+        self.assertEqual('', self.interner.intern(''))
+        self.assertEqual(0, len(self.interner))
+
+    def test_bounded(self):
+        CONF.set_override('packet_intern_max_size', 3)
+        for value in ('A', 'B', 'C', 'D'):
+            self.interner.intern(new_str(value))
+        self.assertEqual(1, len(self.interner))
+        stats = self.interner.stats()
+        self.assertEqual(1, stats['resets'])
+        self.assertEqual(3, stats['max_size'])
+
+    def test_disabled(self):
+        CONF.set_override('packet_intern_max_size', 0)
+        first = new_str('KM6LYW')
+        self.assertIs(first, self.interner.intern(first))
+        self.assertIsNot(first, self.interner.intern(new_str('KM6LYW')))
+        self.assertEqual(0, len(self.interner))
+
+    def test_factory_shares_strings(self):
+        line = 'KM6LYW>APZ100,WIDE1-1,qAR,KD6ABC::WB4BOR   :Hello there{12'
+        first = core.factory(aprslib.parse(line))
+        second = core.factory(aprslib.parse(line))
+        self.assertIs(first.from_call, second.from_call)
+        self.assertIs(first.to_call, second.to_call)
+        self.assertIs(first.addresse, second.addresse)
+        self.assertIs(first.via, second.via)
+        for hop, other in zip(first.path, second.path, strict=True):
+            self.assertIs(hop, other)
+        loaded = core.factory(first.to_dict())
+        self.assertIs(first.from_call, loaded.from_call)
+
+    def test_header_shares_strings(self):
+        line = 'KM6LYW>APZ100,WIDE1-1:>I am here'
+        first = core.parse_header(new_str(line))
+        second = core.parse_header(new_str(line))
+        self.assertIs(first['from_call'], second['from_call'])
+        self.assertIs(first['path'][0], second['path'][0])
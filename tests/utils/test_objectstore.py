@@ -10,7 +10,7 @@ from unittest import mock
 from oslo_config import cfg
 
 from aprsd.packets import core
-from aprsd.utils import objectstore
+from aprsd.utils import objectstore, sqlitestore
 
 CONF = cfg.CONF
 
@@ -305,3 +305,327 @@ class TestObjectStoreMixin(unittest.TestCase):
             call_args = str(mock_log.warning.call_args)
             self.assertIn('pickle', call_args.lower())
             self.assertIn('migrate', call_args.lower())
+
+
+class JournaledStore(TestObjectStore):
+    """Test class that records its changes for the journal."""
+
+    _track_changes = True
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self._changed(key)
+
+    def delete(self, key):
+        with self.lock:
+            del self.data[key]
+            self._changed(key)
+
+
+class TestObjectStoreJournal(unittest.TestCase):
+    """Unit tests for saving an ObjectStoreMixin to a journal."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        CONF.enable_save = True
+        CONF.save_location = self.temp_dir
+        CONF.set_override('enable_save_journal', True)
+
+    def tearDown(self):
+        CONF.clear_override('enable_save_journal')
+        shutil.rmtree(self.temp_dir)
+
+    def journal_lines(self, obj):
+        with open(obj._journal_filename(), 'r') as fp:
+            return fp.read().splitlines()
+
+    def reload(self):
+        obj = JournaledStore()
+        obj.load()
+        return obj
+
+    def test_save(self):
+        """Test only the changes are appended after the first save."""
+        obj = JournaledStore()
+        obj.set('key1', 'value1')
+        obj.set('key2', 'value2')
+        obj.save()
+
+        # The first save writes the whole store.
+        with open(obj._save_filename(), 'r') as fp:
+            self.assertEqual(json.load(fp), {'key1': 'value1', 'key2': 'value2'})
+        self.assertEqual(len(self.journal_lines(obj)), 1)
+
+        obj.set('key1', 'new')
+        obj.set('key3', 'value3')
+        obj.delete('key2')
+        obj.save()
+        obj.save()
+
+        with open(obj._save_filename(), 'r') as fp:
+            self.assertEqual(json.load(fp), {'key1': 'value1', 'key2': 'value2'})
+        records = sorted(json.loads(line) for line in self.journal_lines(obj)[1:])
+        self.assertEqual(records, [['key1', 'new'], ['key2'], ['key3', 'value3']])
+
+        self.assertEqual(self.reload().data, {'key1': 'new', 'key3': 'value3'})
+
+    def test_save_load_types(self):
+        """Test datetimes and packets are restored from the journal."""
+        obj = JournaledStore()
+        obj.save()
+        now = datetime.datetime.now()
+        packet = core.MessagePacket(
+            from_call='N0CALL',
+            to_call='TEST',
+            message_text='Test message',
+        )
+        obj.set('N0CALL', {'last': now, 'count': 1})
+        obj.set('packet', packet)
+        obj.save()
+
+        obj2 = self.reload()
+        self.assertEqual(obj2.data['N0CALL'], {'last': now, 'count': 1})
+        self.assertIsInstance(obj2.data['packet'], core.MessagePacket)
+        self.assertEqual(obj2.data['packet'].message_text, 'Test message')
+
+    def test_compact(self):
+        """Test the journal is compacted once it's as big as the store."""
+        obj = JournaledStore()
+        obj.save()
+        with mock.patch.object(objectstore, 'JOURNAL_MIN_RECORDS', 3):
+            for i in range(3):
+                obj.set(f'key{i}', i)
+                obj.save()
+            self.assertEqual(len(self.journal_lines(obj)), 4)
+            obj.set('key0', 'new')
+            obj.save()
+
+        self.assertEqual(len(self.journal_lines(obj)), 1)
+        with open(obj._save_filename(), 'r') as fp:
+            self.assertEqual(json.load(fp), {'key0': 'new', 'key1': 1, 'key2': 2})
+        self.assertEqual(self.reload().data, obj.data)
+
+    def test_load_compacts(self):
+        """Test the first save after load() starts a new journal."""
+        obj = JournaledStore()
+        obj.save()
+        obj.set('key1', 'value1')
+        obj.save()
+
+        obj2 = self.reload()
+        obj2.set('key2', 'value2')
+        obj2.save()
+        self.assertEqual(len(self.journal_lines(obj2)), 1)
+        self.assertEqual(self.reload().data, {'key1': 'value1', 'key2': 'value2'})
+
+    def test_load_incomplete_record(self):
+        """Test a record cut short by a crash is skipped."""
+        obj = JournaledStore()
+        obj.save()
+        obj.set('key1', 'value1')
+        obj.save()
+        with open(obj._journal_filename(), 'a') as fp:
+            fp.write('["key2", "val')
+
+        self.assertEqual(self.reload().data, {'key1': 'value1'})
+
+    def test_load_stale_journal(self):
+        """Test a journal from before the save file was written is ignored."""
+        obj = JournaledStore()
+        obj.save()
+        obj.set('key1', 'old')
+        obj.save()
+        # A crash after the save file was replaced, before the
+        # journal was started again.
+        with open(obj._save_filename(), 'w') as fp:
+            json.dump({'key1': 'newer', 'key2': 'value2'}, fp)
+
+        self.assertEqual(self.reload().data, {'key1': 'newer', 'key2': 'value2'})
+
+    def test_save_failed(self):
+        """Test a failed journal write makes the next save compact."""
+        obj = JournaledStore()
+        obj.save()
+        obj.set('key1', 'value1')
+        with mock.patch('builtins.open', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                obj.save()
+        obj.save()
+
+        self.assertEqual(len(self.journal_lines(obj)), 1)
+        self.assertEqual(self.reload().data, {'key1': 'value1'})
+
+    def test_flush(self):
+        """Test flush() removes the journal."""
+        obj = JournaledStore()
+        obj.set('key1', 'value1')
+        obj.save()
+        obj.flush()
+
+        self.assertFalse(os.path.exists(obj._save_filename()))
+        self.assertFalse(os.path.exists(obj._journal_filename()))
+
+    def test_journal_disabled(self):
+        """Test the whole store is saved without enable_save_journal."""
+        CONF.set_override('enable_save_journal', False)
+        obj = JournaledStore()
+        obj.set('key1', 'value1')
+        obj.save()
+
+        self.assertFalse(os.path.exists(obj._journal_filename()))
+        self.assertEqual(self.reload().data, {'key1': 'value1'})
+
+    def test_not_track_changes(self):
+        """Test a store that doesn't record its changes is saved whole."""
+        obj = TestObjectStore()
+        obj.data['key1'] = 'value1'
+        obj.save()
+
+        self.assertFalse(os.path.exists(obj._journal_filename()))
+
+
+class LazyStore(JournaledStore):
+    """Test class that only keeps the recent entries in memory."""
+
+    _lazy_load = True
+
+
+class TestObjectStoreSQLite(unittest.TestCase):
+    """Unit tests for saving an ObjectStoreMixin to sqlite."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        CONF.enable_save = True
+        CONF.save_location = self.temp_dir
+        CONF.set_override('save_backend', 'sqlite')
+        sqlitestore.SQLiteStore._instance = None
+
+    def tearDown(self):
+        sqlitestore.SQLiteStore().close()
+        sqlitestore.SQLiteStore._instance = None
+        CONF.clear_override('save_backend')
+        CONF.clear_override('save_cache_size')
+        shutil.rmtree(self.temp_dir)
+
+    def rows(self, obj):
+        return dict(sqlitestore.SQLiteStore().items(obj._table()))
+
+    def test_save(self):
+        """Test only the changed entries are written."""
+        obj = JournaledStore()
+        obj.set('key1', 'value1')
+        obj.set('key2', 'value2')
+        obj.save()
+        self.assertEqual(self.rows(obj), {'key1': '"value1"', 'key2': '"value2"'})
+        self.assertFalse(os.path.exists(obj._save_filename()))
+
+        obj.set('key1', 'new')
+        obj.delete('key2')
+        with mock.patch.object(sqlitestore.SQLiteStore, 'write') as mock_write:
+            obj.save()
+        mock_write.assert_called_once_with('journaledstore', mock.ANY)
+        self.assertEqual(
+            sorted(mock_write.call_args[0][1]),
+            [('key1', '"new"'), ('key2', None)],
+        )
+
+    def test_load(self):
+        """Test the saved entries are loaded, with their types."""
+        obj = JournaledStore()
+        now = datetime.datetime.now()
+        packet = core.MessagePacket(
+            from_call='N0CALL',
+            to_call='TEST',
+            message_text='Test message',
+        )
+        obj.set('N0CALL', {'last': now, 'count': 1})
+        obj.set('packet', packet)
+        obj.save()
+        obj.delete('packet')
+        obj.save()
+
+        obj2 = JournaledStore()
+        obj2.load()
+        self.assertEqual(obj2.data, {'N0CALL': {'last': now, 'count': 1}})
+        obj2.set('key1', 'value1')
+        obj2.save()
+        self.assertEqual(len(self.rows(obj2)), 2)
+
+    def test_load_from_json(self):
+        """Test the JSON save file is moved to an empty database."""
+        CONF.set_override('save_backend', 'json')
+        obj = JournaledStore()
+        obj.set('key1', 'value1')
+        obj.save()
+        CONF.set_override('save_backend', 'sqlite')
+
+        obj2 = JournaledStore()
+        obj2.load()
+        self.assertEqual(obj2.data, {'key1': 'value1'})
+        obj2.save()
+        self.assertEqual(self.rows(obj2), {'key1': '"value1"'})
+
+    def test_save_failed(self):
+        """Test the changes that failed to be written are tried again."""
+        obj = JournaledStore()
+        obj.load()
+        obj.set('key1', 'value1')
+        with mock.patch.object(
+            sqlitestore.SQLiteStore, 'write', side_effect=OSError('disk full')
+        ):
+            with self.assertRaises(OSError):
+                obj.save()
+        obj.save()
+        self.assertEqual(self.rows(obj), {'key1': '"value1"'})
+
+    def test_flush(self):
+        """Test flush() clears the table."""
+        obj = JournaledStore()
+        obj.set('key1', 'value1')
+        obj.save()
+        obj.flush()
+        self.assertEqual(obj.data, {})
+        self.assertEqual(self.rows(obj), {})
+
+    def test_lazy_load(self):
+        """Test only save_cache_size entries are kept in memory."""
+        CONF.set_override('save_cache_size', 3)
+        obj = LazyStore()
+        obj.load()
+        for i in range(5):
+            obj.set(f'key{i}', i)
+        obj.save()
+        self.assertEqual(list(obj.data), ['key2', 'key3', 'key4'])
+        self.assertEqual(len(self.rows(obj)), 5)
+
+        with obj.lock:
+            self.assertEqual(obj._load_key('key0'), 0)
+            self.assertIsNone(obj._load_key('nope'))
+
+        obj2 = LazyStore()
+        obj2.load()
+        self.assertEqual(obj2.data, {'key2': 2, 'key3': 3, 'key4': 4})
+
+    def test_lazy_load_keeps_changes(self):
+        """Test the entries changed since the last save stay in memory."""
+        CONF.set_override('save_cache_size', 1)
+        obj = LazyStore()
+        obj.load()
+        obj.set('key0', 0)
+        obj.set('key1', 1)
+        obj.save()
+        self.assertEqual(list(obj.data), ['key1'])
+
+        with obj.lock:
+            obj.data['key0'] = 'changed'
+            obj._changed('key0')
+            obj._trim()
+        self.assertEqual(obj.data, {'key0': 'changed'})
+
+    def test_json_backend(self):
+        """Test _load_key() doesn't look in the database with json."""
+        CONF.set_override('save_backend', 'json')
+        obj = LazyStore()
+        with obj.lock:
+            self.assertIsNone(obj._load_key('key0'))
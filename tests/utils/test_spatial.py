@@ -0,0 +1,110 @@
+import random
+import time
+import unittest
+from unittest import mock
+
+from haversine import Unit, haversine
+
+from aprsd.utils import spatial
+
+
+class TestHaversine(unittest.TestCase):
+    def test_matches_haversine_package(self):
+        points = [(37.77, -122.42), (-33.87, 151.21), (51.5, -0.12), (0, 0)]
+        lats = [p[0] for p in points]
+        lons = [p[1] for p in points]
+        distances = spatial.haversine_km(40.0, -75.0, lats, lons)
+        for point, distance in zip(points, distances, strict=True):
+            expected = haversine((40.0, -75.0), point, unit=Unit.KILOMETERS)
+            self.assertAlmostEqual(expected, distance, delta=0.01)
+
+    def test_pure_python_fallback(self):
+        lats = [random.uniform(-90, 90) for _ in range(100)]
+        lons = [random.uniform(-180, 180) for _ in range(100)]
+        with mock.patch.object(spatial, 'numpy', None):
+            distances = spatial.haversine_km(10.0, 20.0, lats, lons)
+        self.assertEqual(100, len(distances))
+        self.assertAlmostEqual(
+            haversine((10.0, 20.0), (lats[0], lons[0]), unit=Unit.KILOMETERS),
+            distances[0],
+            delta=0.01,
+        )
+
+
+class TestGridIndex(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(42)
+        self.index = spatial.GridIndex()
+        self.points = {}
+        for i in range(2000):
+            lat = self.rand.uniform(-90, 90)
+            lon = self.rand.uniform(-180, 180)
+            self.points[f'K{i}'] = (lat, lon)
+            self.index.insert(f'K{i}', lat, lon)
+
+    def _brute_force(self, lat, lon):
+        return sorted(
+            (
+                (key, haversine((lat, lon), point, unit=Unit.KILOMETERS))
+                for key, point in self.points.items()
+            ),
+            key=lambda item: item[1],
+        )
+
+    def test_within_matches_brute_force(self):
+        queries = [
+            (37.0, -122.0, 500),
+            (0.0, 179.9, 800),  # across the date line
+            (89.5, 10.0, 1000),  # around the pole
+            (-45.0, -60.0, 3000),
+            (10.0, 10.0, 25000),  # everything
+        ]
+        for lat, lon, radius in queries:
+            expected = [
+                key for key, km in self._brute_force(lat, lon) if km <= radius - 0.01
+            ]
+            found = [key for key, _ in self.index.within(lat, lon, radius)]
+            for key in expected:
+                self.assertIn(key, found, (lat, lon, radius))
+
+    def test_nearest_matches_brute_force(self):
+        for _ in range(20):
+            lat = self.rand.uniform(-90, 90)
+            lon = self.rand.uniform(-180, 180)
+            expected = self._brute_force(lat, lon)[:5]
+            found = self.index.nearest(lat, lon, k=5)
+            self.assertEqual([key for key, _ in expected], [key for key, _ in found])
+
+    def test_predicate(self):
+        found = self.index.nearest(0, 0, k=3, predicate=lambda key: key.endswith('7'))
+        self.assertEqual(3, len(found))
+        for key, _ in found:
+            self.assertTrue(key.endswith('7'))
+
+    def test_move_and_remove(self):
+        index = spatial.GridIndex()
+        index.insert('K1', 10.0, 10.0)
+        index.insert('K1', -10.0, -10.0)
+        self.assertEqual(1, len(index))
+        self.assertEqual([], index.within(10.0, 10.0, 10))
+        self.assertEqual('K1', index.nearest(10.0, 10.0)[0][0])
+        index.remove('K1')
+        self.assertNotIn('K1', index)
+        self.assertEqual({}, index.cells)
+        self.assertEqual([], index.nearest(10.0, 10.0))
+
+    def test_query_speed(self):
+        index = spatial.GridIndex()
+        for i in range(20000):
+            index.insert(
+                i,
+                self.rand.uniform(25, 50),
+                self.rand.uniform(-125, -65),
+            )
+        start = time.perf_counter()
+        for _ in range(100):
+            index.within(37.0, -100.0, 20)
+            index.nearest(37.0, -100.0, k=5)
+        elapsed = (time.perf_counter() - start) / 100
+        # Well under a millisecond in practice, leave room for slow CI.
+        self.assertLess(elapsed, 0.01)
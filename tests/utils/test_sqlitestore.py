@@ -0,0 +1,96 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from oslo_config import cfg
+
+from aprsd.utils import sqlitestore
+
+CONF = cfg.CONF
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.save_location = CONF.save_location
+        CONF.save_location = self.temp_dir
+        sqlitestore.SQLiteStore._instance = None
+        self.store = sqlitestore.SQLiteStore()
+
+    def tearDown(self):
+        self.store.close()
+        sqlitestore.SQLiteStore._instance = None
+        CONF.save_location = self.save_location
+        shutil.rmtree(self.temp_dir)
+
+    def test_singleton(self):
+        self.assertIs(self.store, sqlitestore.SQLiteStore())
+
+    def test_write(self):
+        self.store.write('test', [('a', '1'), ('b', '2')])
+        self.store.write('test', [('a', '3'), ('b', None), ('c', '4')])
+
+        self.assertEqual('3', self.store.get('test', 'a'))
+        self.assertIsNone(self.store.get('test', 'b'))
+        self.assertEqual(2, self.store.count('test'))
+        self.assertEqual([('a', '3'), ('c', '4')], sorted(self.store.items('test')))
+        # Tables are separate.
+        self.assertEqual(0, self.store.count('other'))
+
+    def test_items(self):
+        for key in ('a', 'b', 'c'):
+            self.store.write('test', [(key, key)])
+        self.store.write('test', [('a', 'new')])
+
+        self.assertEqual(
+            [('b', 'b'), ('c', 'c'), ('a', 'new')],
+            self.store.items('test'),
+        )
+        self.assertEqual([('c', 'c'), ('a', 'new')], self.store.items('test', 2))
+
+    def test_write_failed(self):
+        self.store.write('test', [('a', '1')])
+        with self.assertRaises(sqlite3.Error):
+            # The second key can't be stored, so neither is written.
+            self.store.write('test', [('b', '2'), (object(), '3')])
+        self.assertEqual([('a', '1')], self.store.items('test'))
+
+    def test_clear(self):
+        self.store.write('test', [('a', '1')])
+        self.store.clear('test')
+        self.assertEqual(0, self.store.count('test'))
+
+    def test_wal(self):
+        self.store.write('test', [('a', '1')])
+        filename = os.path.join(self.temp_dir, sqlitestore.DB_FILENAME)
+        self.assertEqual(filename, self.store.filename)
+        conn = sqlite3.connect(filename)
+        self.addCleanup(conn.close)
+        self.assertEqual('wal', conn.execute('PRAGMA journal_mode').fetchone()[0])
+
+    def test_threads(self):
+        self.store.write('test', [('a', '1')])
+        results = []
+
+        def read():
+            results.append(self.store.get('test', 'a'))
+            self.store.close()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.assertEqual(['1'], results)
+
+    def test_save_location_changed(self):
+        self.store.write('test', [('a', '1')])
+        other_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_dir)
+        CONF.save_location = other_dir
+
+        self.assertIsNone(self.store.get('test', 'a'))
+        self.assertTrue(
+            os.path.exists(os.path.join(other_dir, sqlitestore.DB_FILENAME))
+        )
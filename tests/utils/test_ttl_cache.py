@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+from aprsd.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    """Unit tests for the TTLCache class."""
+
+    def test_get_set(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIn('a', cache)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('b', 'default'), 'default')
+
+    def test_expires(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        with mock.patch('aprsd.utils.ttl_cache.time.monotonic', return_value=100):
+            cache.set('a', 1)
+            cache.set('b', 2, ttl=300)
+        with mock.patch('aprsd.utils.ttl_cache.time.monotonic', return_value=200):
+            self.assertIsNone(cache.get('a'))
+            self.assertNotIn('a', cache)
+            self.assertEqual(cache.get('b'), 2)
+        with mock.patch('aprsd.utils.ttl_cache.time.monotonic', return_value=500):
+            cache.expire()
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # Touch a, so b is the least recently used.
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_stats(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('a')
+        cache.get('missing')
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.667)
+        self.assertEqual(stats['size'], 1)
+
+    def test_remove_clear(self):
+        cache = TTLCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.remove('a')
+        cache.remove('missing')
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)